@@ -0,0 +1,102 @@
+"""Keep-alive HTTP client for the Accessibility Service App."""
+
+import os
+import threading
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+# 从 .env 文件加载配置
+load_dotenv()
+DEFAULT_PHONE_IP = os.getenv("device_ip", "192.168.2.10")
+DEFAULT_PORT = 8080
+
+
+def parse_device_ip(device_id: str | None) -> str:
+    """从 device_id 中提取 IP 地址（去除端口号）。"""
+    if not device_id:
+        return DEFAULT_PHONE_IP
+    # 如果 device_id 包含端口（格式: ip:port），只取 IP 部分
+    if ":" in device_id:
+        return device_id.split(":")[0]
+    return device_id
+
+
+class AccessibilityClient:
+    """
+    HTTP client bound to one phone running the Accessibility Service App.
+
+    Requests go through a pooled `requests.Session`, so taps, screenshots and
+    pings reuse open TCP connections instead of reconnecting over Wi-Fi on
+    every call.
+
+    Args:
+        ip: IP address of the phone.
+        port: HTTP port of the Accessibility Service App.
+        pool_size: Maximum number of kept-alive connections.
+    """
+
+    def __init__(self, ip: str, port: int = DEFAULT_PORT, pool_size: int = 4):
+        self.ip = ip
+        self.port = port
+        self.base_url = f"http://{ip}:{port}"
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+
+    def get(
+        self, path: str, params: dict | None = None, timeout: float = 5, **kwargs
+    ) -> requests.Response:
+        """
+        Send a GET request to the App.
+
+        Args:
+            path: Endpoint path, optionally with a query string (e.g. "ping").
+            params: Optional query parameters.
+            timeout: Request timeout in seconds.
+            **kwargs: Extra arguments for `requests.Session.get`.
+
+        Returns:
+            The HTTP response.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        return self.session.get(url, params=params, timeout=timeout, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_clients: dict[tuple[str, int], AccessibilityClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(
+    device_id: str | None = None, port: int = DEFAULT_PORT
+) -> AccessibilityClient:
+    """
+    Get the shared client for a device, creating it on first use.
+
+    Args:
+        device_id: Device IP, optionally as 'ip:port' (the port is ignored).
+        port: HTTP port of the Accessibility Service App.
+
+    Returns:
+        The device's AccessibilityClient.
+    """
+    key = (parse_device_ip(device_id), port)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = AccessibilityClient(key[0], port)
+            _clients[key] = client
+        return client
+
+
+def close_clients() -> None:
+    """Close and forget all device clients."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
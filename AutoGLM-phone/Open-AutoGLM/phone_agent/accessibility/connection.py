@@ -2,16 +2,16 @@
 
 import time
 import requests
-import os
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
-from dotenv import load_dotenv
 
-# 从 .env 文件加载配置
-load_dotenv()
-DEFAULT_PHONE_IP = os.getenv("device_ip", "192.168.2.10")
-DEFAULT_PORT = 8080
+from phone_agent.accessibility.client import (
+    DEFAULT_PHONE_IP,
+    DEFAULT_PORT,
+    get_client,
+    parse_device_ip,
+)
 
 class ConnectionType(Enum):
     """Type of connection (kept for compatibility)."""
@@ -42,12 +42,7 @@ class ADBConnection:
     @staticmethod
     def _parse_device_ip(device_id: str | None) -> str:
         """从 device_id 中提取 IP 地址（去除端口号）。"""
-        if not device_id:
-            return DEFAULT_PHONE_IP
-        # 如果 device_id 包含端口（格式: ip:port），只取 IP 部分
-        if ':' in device_id:
-            return device_id.split(':')[0]
-        return device_id
+        return parse_device_ip(device_id)
 
     def _get_base_url(self, ip: str = None):
         target = ip if ip else self.current_ip
@@ -66,8 +61,7 @@ class ADBConnection:
         try:
             # 假设你的 Android App 有一个 /ping 接口用于检测存活
             # 如果没有，用 /info/current_package 也可以
-            url = f"{self._get_base_url(ip)}/ping"
-            resp = requests.get(url, timeout=timeout)
+            resp = get_client(ip, self.port).get("ping", timeout=timeout)
             
             if resp.status_code == 200:
                 return True, f"Connected to {ip}"
@@ -1,42 +1,27 @@
 """Device control utilities via Accessibility Service (HTTP)."""
 
-import time
-import requests
-import os
-from typing import Optional
 import urllib.parse
-from dotenv import load_dotenv
-from phone_agent.config.apps import APP_PACKAGES
+from phone_agent.accessibility.client import DEFAULT_PHONE_IP, get_client
+from phone_agent.config.apps import APP_PACKAGES, PACKAGE_APP_NAMES
 from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.tracing import traced_sleep
 
-# 从 .env 文件加载配置
-load_dotenv()
-PHONE_IP = os.getenv("device_ip", "192.168.2.10")
+PHONE_IP = DEFAULT_PHONE_IP
 BASE_URL = f"http://{PHONE_IP}:8080"
 
-def _parse_device_ip(device_id: str | None) -> str:
-    """从 device_id 中提取 IP 地址（去除端口号）。"""
-    if not device_id:
-        return PHONE_IP
-    # 如果 device_id 包含端口（格式: ip:port），只取 IP 部分
-    if ':' in device_id:
-        return device_id.split(':')[0]
-    return device_id
-
 def _send_cmd(endpoint: str, params: dict, device_id: str | None = None, delay: float | None = None):
-    # 1. 确定目标 IP（解析 device_id，去除端口）
-    target_ip = _parse_device_ip(device_id)
+    # 1. 取目标设备的长连接客户端（device_id 可为 ip 或 ip:port）
+    client = get_client(device_id)
     
     # 2. 🚨 关键修复：手动构建 URL 以确保中文被编码
     # requests 库通常会自动处理，但为了排除万一，我们手动拼装
     query_string = urllib.parse.urlencode(params)
-    url = f"http://{target_ip}:8080/{endpoint}?{query_string}"
     
     try:
-        # print(f"📡 Sending: {url}") # 调试用
+        # print(f"📡 Sending: {endpoint}?{query_string}") # 调试用
         
         # 注意：这里不再传 params=params，而是直接请求拼装好的 URL
-        response = requests.get(url, timeout=5)
+        response = client.get(f"{endpoint}?{query_string}", timeout=5)
         
         # 3. 检查响应，如果非 200，打印出来
         if response.status_code != 200:
@@ -45,21 +30,21 @@ def _send_cmd(endpoint: str, params: dict, device_id: str | None = None, delay:
     except Exception as e:
         print(f"❌ Command Failed: {e}")
     
-    time.sleep(delay if delay is not None else 0.5)
+    traced_sleep(delay if delay is not None else 0.5)
 
 def get_current_app(device_id: str | None = None) -> str:
     """
     通过 HTTP 询问 App：现在谁在前台？
     """
     try:
-        resp = requests.get(f"{BASE_URL}/info/current_package", timeout=2)
+        resp = get_client(device_id).get("info/current_package", timeout=2)
         if resp.status_code == 200:
             current_pkg = resp.text.strip() # 比如 "com.tencent.mm"
             
-            # 反向查找 App 名字
-            for app_name, package in APP_PACKAGES.items():
-                if package == current_pkg:
-                    return app_name
+            # 反向查找 App 名字（预建索引，O(1)）
+            app_name = PACKAGE_APP_NAMES.get(current_pkg)
+            if app_name:
+                return app_name
     except:
         pass
     return "System Home"
@@ -68,7 +53,7 @@ def tap(
     x: int, y: int, device_id: str | None = None, delay: float | None = None
 ) -> None:
     _send_cmd("action", {"type": "tap", "x": x, "y": y}, 
-              delay, TIMING_CONFIG.device.default_tap_delay)
+              device_id, delay if delay is not None else TIMING_CONFIG.device.default_tap_delay)
 
 def double_tap(
     x: int, y: int, device_id: str | None = None, delay: float | None = None
@@ -76,14 +61,14 @@ def double_tap(
     # 既然是无障碍，建议直接发一个 "double_tap" 指令给手机，
     # 让手机自己处理两次点击，比网络来回两次更稳。
     _send_cmd("action", {"type": "double_tap", "x": x, "y": y}, 
-              delay, TIMING_CONFIG.device.default_double_tap_delay)
+              device_id, delay if delay is not None else TIMING_CONFIG.device.default_double_tap_delay)
 
 def long_press(
     x: int, y: int, duration_ms: int = 1000, device_id: str | None = None, delay: float | None = None
 ) -> None:
     # 无障碍服务可以直接处理长按
     _send_cmd("action", {"type": "long_press", "x": x, "y": y, "duration": duration_ms}, 
-              delay, TIMING_CONFIG.device.default_long_press_delay)
+              device_id, delay if delay is not None else TIMING_CONFIG.device.default_long_press_delay)
 
 def swipe(
     start_x: int, start_y: int, end_x: int, end_y: int,
@@ -97,15 +82,15 @@ def swipe(
         "x1": start_x, "y1": start_y, 
         "x2": end_x, "y2": end_y, 
         "duration": duration_ms
-    }, delay, TIMING_CONFIG.device.default_swipe_delay)
+    }, device_id, delay if delay is not None else TIMING_CONFIG.device.default_swipe_delay)
 
 def back(device_id: str | None = None, delay: float | None = None) -> None:
     _send_cmd("action", {"type": "global", "code": "back"}, 
-              delay, TIMING_CONFIG.device.default_back_delay)
+              device_id, delay if delay is not None else TIMING_CONFIG.device.default_back_delay)
 
 def home(device_id: str | None = None, delay: float | None = None) -> None:
     _send_cmd("action", {"type": "global", "code": "home"}, 
-              delay, TIMING_CONFIG.device.default_home_delay)
+              device_id, delay if delay is not None else TIMING_CONFIG.device.default_home_delay)
 
 def launch_app(
     app_name: str, device_id: str | None = None, delay: float | None = None
@@ -118,5 +103,5 @@ def launch_app(
     # 这一步很关键：Android App 收到这个请求后，
     # 会调用 context.startActivity(...) 来启动应用
     _send_cmd("action", {"type": "launch", "package": package}, 
-              delay, TIMING_CONFIG.device.default_launch_delay)
+              device_id, delay if delay is not None else TIMING_CONFIG.device.default_launch_delay)
     return True
\ No newline at end of file
@@ -1,23 +1,12 @@
 import requests
 import time
-import os
 from typing import Optional
-from dotenv import load_dotenv
 
-# 从 .env 文件加载配置
-load_dotenv()
-DEVICE_IP = os.getenv("device_ip", "192.168.2.10")
+from phone_agent.accessibility.client import DEFAULT_PHONE_IP, DEFAULT_PORT, get_client
 
-PORT = 8080
+DEVICE_IP = DEFAULT_PHONE_IP
 
-def _parse_device_ip(device_id: str | None) -> str:
-    """从 device_id 中提取 IP 地址（去除端口号）。"""
-    if not device_id:
-        return DEVICE_IP
-    # 如果 device_id 包含端口（格式: ip:port），只取 IP 部分
-    if ':' in device_id:
-        return device_id.split(':')[0]
-    return device_id
+PORT = DEFAULT_PORT
 
 def type_text(text: str, device_ip: str = DEVICE_IP, timeout: int = 5) -> bool:
     """
@@ -35,9 +24,6 @@ def type_text(text: str, device_ip: str = DEVICE_IP, timeout: int = 5) -> bool:
         print("❌ Error: Input text cannot be empty.")
         return False
 
-    # 构造请求 URL
-    url = f"http://{device_ip}:{PORT}/action"
-    
     # 构造参数
     # requests 库非常智能，它会自动把中文转成 URL 编码
     # 例如："你好" -> "%E4%BD%A0%E5%A5%BD"
@@ -50,7 +36,7 @@ def type_text(text: str, device_ip: str = DEVICE_IP, timeout: int = 5) -> bool:
         print(f"⌨️ Sending input command: '{text}' to {device_ip}...")
         
         # 发送 GET 请求
-        response = requests.get(url, params=params, timeout=timeout)
+        response = get_client(device_ip, PORT).get("action", params=params, timeout=timeout)
         
         # 检查响应
         if response.status_code == 200:
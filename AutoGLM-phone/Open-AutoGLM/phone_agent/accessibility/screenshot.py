@@ -1,95 +1,121 @@
 """Screenshot utilities via Accessibility Service (HTTP)."""
 
-import base64
-import requests
-import os
-from dataclasses import dataclass
-from io import BytesIO
-from typing import Tuple
-from dotenv import load_dotenv
-
-from PIL import Image
-
-# 从 .env 文件加载配置
-load_dotenv()
-PHONE_IP = os.getenv("device_ip", "192.168.2.10")
+from phone_agent.accessibility.client import DEFAULT_PHONE_IP, get_client
+from phone_agent.screenshot import Screenshot, create_fallback_screenshot
+
+PHONE_IP = DEFAULT_PHONE_IP
 BASE_URL = f"http://{PHONE_IP}:8080"
 
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
-
-def _parse_device_ip(device_id: str | None) -> str:
-    """从 device_id 中提取 IP 地址（去除端口号）。"""
-    if not device_id:
-        return PHONE_IP
-    # 如果 device_id 包含端口（格式: ip:port），只取 IP 部分
-    if ':' in device_id:
-        return device_id.split(':')[0]
-    return device_id
+# 优先请求二进制图片（省去 Base64 膨胀和大 JSON 解析），旧版 App 仍返回 JSON
+ACCEPT_HEADER = "image/png, image/jpeg;q=0.9, application/json;q=0.5"
+CHUNK_SIZE = 64 * 1024
 
 def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
     """
     Capture a screenshot from the Accessibility Service App via HTTP.
+
+    The App may answer with the encoded image itself (`image/png` or
+    `image/jpeg`, size in `X-Width`/`X-Height` headers) or with the legacy
+    JSON body carrying a base64 string. Binary bodies are streamed straight
+    into memory.
     
     Args:
         device_id: 设备标识，格式可以是 'ip' 或 'ip:port'，会自动提取 IP 部分。
+        timeout: Timeout in seconds for the request.
     """
-    # 解析 device_id，只取 IP 部分
-    target_ip = _parse_device_ip(device_id)
-    target_url = f"http://{target_ip}:8080/screenshot"
+    # 取目标设备的长连接客户端（自动提取 IP 部分）
+    client = get_client(device_id)
 
     try:
-        # 1. 发送请求给 Android App
-        response = requests.get(target_url, timeout=timeout)
-        
-        # 2. 解析 Android 返回的 JSON 数据
-        # 假设 Android 端返回格式: 
-        # { "status": "success", "base64": "...", "width": 1080, "height": 2400 }
-        # 或者 { "status": "sensitive" }
-        if response.status_code == 200:
-            data = response.json()
-            
-            # 处理敏感页面（Android 端截不到图的情况）
-            if data.get("status") == "sensitive":
-                return _create_fallback_screenshot(is_sensitive=True)
+        # 1. 发送请求给 Android App（流式读取响应体）
+        response = client.get(
+            "screenshot",
+            timeout=timeout,
+            headers={"Accept": ACCEPT_HEADER},
+            stream=True,
+        )
+
+        with response:
+            content_type = response.headers.get("Content-Type", "").split(";")[0]
+
+            # 2a. 二进制图片: 响应体就是图片本身
+            # 敏感页面用 X-Status: sensitive 标记（也可以继续返回 JSON）
+            if response.status_code == 200 and content_type.startswith("image/"):
+                if response.headers.get("X-Status") == "sensitive":
+                    return _create_fallback_screenshot(is_sensitive=True)
+                return _read_binary_screenshot(response, content_type)
+
+            # 2b. 解析 Android 返回的 JSON 数据（旧格式，兜底）
+            # 假设 Android 端返回格式: 
+            # { "status": "success", "base64": "...", "width": 1080, "height": 2400 }
+            # 或者 { "status": "sensitive" }
+            if response.status_code == 200:
+                data = response.json()
                 
-            if data.get("status") == "success":
-                return Screenshot(
-                    base64_data=data["base64"],
-                    width=data["width"],
-                    height=data["height"],
-                    is_sensitive=False
-                )
-        
-        # 如果状态码不对，或者 JSON 解析失败，返回黑屏兜底
-        print(f"Screenshot failed, status code: {response.status_code}")
-        try:
-            print(f"Server Error Message: {response.text}") 
-        except:
-            pass
-        return _create_fallback_screenshot(is_sensitive=False)
+                # 处理敏感页面（Android 端截不到图的情况）
+                if data.get("status") == "sensitive":
+                    return _create_fallback_screenshot(is_sensitive=True)
+                    
+                if data.get("status") == "success":
+                    return Screenshot.from_base64(
+                        data["base64"],
+                        width=data["width"],
+                        height=data["height"],
+                    )
+            
+            # 如果状态码不对，或者 JSON 解析失败，返回黑屏兜底
+            print(f"Screenshot failed, status code: {response.status_code}")
+            try:
+                print(f"Server Error Message: {response.text}") 
+            except:
+                pass
+            return _create_fallback_screenshot(is_sensitive=False)
 
     except Exception as e:
         print(f"Screenshot connection error: {e}")
         return _create_fallback_screenshot(is_sensitive=False)
 
-def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
-    """Create a black fallback image when screenshot fails."""
-    default_width, default_height = 1080, 2400
+def _read_binary_screenshot(response, content_type: str) -> Screenshot:
+    """
+    Stream an `image/*` response body into a Screenshot.
 
-    black_img = Image.new("RGB", (default_width, default_height), color="black")
-    buffered = BytesIO()
-    black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    Args:
+        response: Streaming HTTP response with an image body.
+        content_type: MIME type of the body.
+
+    Returns:
+        Screenshot wrapping the received bytes.
+    """
+    length = int(response.headers.get("Content-Length") or 0)
+    buffer = bytearray()
+    if length:
+        # 预分配后整体写入，避免多次扩容
+        buffer = bytearray(length)
+        view = memoryview(buffer)
+        offset = 0
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            view[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        if offset != length:
+            raise ValueError(f"truncated screenshot: {offset}/{length} bytes")
+    else:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            buffer += chunk
+    data = bytes(buffer)
+
+    width = response.headers.get("X-Width")
+    height = response.headers.get("X-Height")
+    if not (width and height):
+        # 没有尺寸头时从图片头部读取（不解码像素）
+        return Screenshot.from_bytes(data)
 
     return Screenshot(
-        base64_data=base64_data,
-        width=default_width,
-        height=default_height,
-        is_sensitive=is_sensitive,
-    )
\ No newline at end of file
+        data=data,
+        width=int(width),
+        height=int(height),
+        mime_type=content_type,
+    )
+
+def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
+    """Create a black fallback image when screenshot fails."""
+    return create_fallback_screenshot(is_sensitive, width=1080, height=2400)
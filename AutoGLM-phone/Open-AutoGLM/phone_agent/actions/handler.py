@@ -3,12 +3,13 @@
 import ast
 import re
 import subprocess
-import time
 from dataclasses import dataclass
 from typing import Any, Callable
 
 from phone_agent.config.timing import TIMING_CONFIG
-from phone_agent.device_factory import get_device_factory
+from phone_agent.device_factory import DeviceFactory, get_device_factory
+from phone_agent.settle import wait_for_screen_settle
+from phone_agent.tracing import get_tracer, traced, traced_sleep
 
 
 @dataclass
@@ -30,6 +31,8 @@ class ActionHandler:
         confirmation_callback: Optional callback for sensitive action confirmation.
             Should return True to proceed, False to cancel.
         takeover_callback: Optional callback for takeover requests (login, captcha).
+        device_factory: Factory driving the device. Defaults to the global one,
+            looked up on every action.
     """
 
     def __init__(
@@ -37,11 +40,14 @@ class ActionHandler:
         device_id: str | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        device_factory: DeviceFactory | None = None,
     ):
         self.device_id = device_id
+        self.device_factory = device_factory
         self.confirmation_callback = confirmation_callback or self._default_confirmation
         self.takeover_callback = takeover_callback or self._default_takeover
 
+    @traced("action.execute")
     def execute(
         self, action: dict[str, Any], screen_width: int, screen_height: int
     ) -> ActionResult:
@@ -57,6 +63,10 @@ class ActionHandler:
             ActionResult indicating success and whether to finish.
         """
         action_type = action.get("_metadata")
+        get_tracer().annotate(action=action.get("action") or action_type)
+
+        # Any executed action (even Wait or Take_over) may change the foreground app
+        self._get_device_factory().invalidate_observation(self.device_id)
 
         if action_type == "finish":
             return ActionResult(
@@ -111,7 +121,13 @@ class ActionHandler:
     def _convert_relative_to_absolute(
         self, element: list[int], screen_width: int, screen_height: int
     ) -> tuple[int, int]:
-        """Convert relative coordinates (0-1000) to absolute pixels."""
+        """
+        Convert relative coordinates (0-1000) to absolute pixels.
+
+        The width/height are those of the device screenshot, not of the
+        (possibly downscaled) image sent to the model, so taps always land on
+        true device pixels.
+        """
         x = int(element[0] / 1000 * screen_width)
         y = int(element[1] / 1000 * screen_height)
         return x, y
@@ -122,9 +138,12 @@ class ActionHandler:
         if not app_name:
             return ActionResult(False, False, "No app name specified")
 
-        device_factory = get_device_factory()
-        success = device_factory.launch_app(app_name, self.device_id)
+        device_factory = self._get_device_factory()
+        success = device_factory.launch_app(
+            app_name, self.device_id, delay=self._device_delay()
+        )
         if success:
+            self._wait_for_settle(TIMING_CONFIG.device.default_launch_delay)
             return ActionResult(True, False)
         return ActionResult(False, False, f"App not found: {app_name}")
 
@@ -145,20 +164,24 @@ class ActionHandler:
                     message="User cancelled sensitive operation",
                 )
 
-        device_factory = get_device_factory()
-        device_factory.tap(x, y, self.device_id)
+        device_factory = self._get_device_factory()
+        device_factory.tap(x, y, self.device_id, delay=self._device_delay())
+        self._wait_for_settle(TIMING_CONFIG.device.default_tap_delay)
         return ActionResult(True, False)
 
     def _handle_type(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle text input action."""
         text = action.get("text", "")
-        device_factory = get_device_factory()
+        device_factory = self._get_device_factory()
         
         # 直接调用无障碍输入接口
         device_factory.type_text(text, self.device_id)
         
         # 只需要极短的等待（0.5s - 1s），让手机完成粘贴动作
-        time.sleep(1.0) 
+        if TIMING_CONFIG.settle.enabled:
+            self._wait_for_settle(TIMING_CONFIG.action.text_input_delay)
+        else:
+            traced_sleep(TIMING_CONFIG.action.text_input_delay)
         
         return ActionResult(True, False)
 
@@ -173,20 +196,30 @@ class ActionHandler:
         start_x, start_y = self._convert_relative_to_absolute(start, width, height)
         end_x, end_y = self._convert_relative_to_absolute(end, width, height)
 
-        device_factory = get_device_factory()
-        device_factory.swipe(start_x, start_y, end_x, end_y, device_id=self.device_id)
+        device_factory = self._get_device_factory()
+        device_factory.swipe(
+            start_x,
+            start_y,
+            end_x,
+            end_y,
+            device_id=self.device_id,
+            delay=self._device_delay(),
+        )
+        self._wait_for_settle(TIMING_CONFIG.device.default_swipe_delay)
         return ActionResult(True, False)
 
     def _handle_back(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle back button action."""
-        device_factory = get_device_factory()
-        device_factory.back(self.device_id)
+        device_factory = self._get_device_factory()
+        device_factory.back(self.device_id, delay=self._device_delay())
+        self._wait_for_settle(TIMING_CONFIG.device.default_back_delay)
         return ActionResult(True, False)
 
     def _handle_home(self, action: dict, width: int, height: int) -> ActionResult:
         """Handle home button action."""
-        device_factory = get_device_factory()
-        device_factory.home(self.device_id)
+        device_factory = self._get_device_factory()
+        device_factory.home(self.device_id, delay=self._device_delay())
+        self._wait_for_settle(TIMING_CONFIG.device.default_home_delay)
         return ActionResult(True, False)
 
     def _handle_double_tap(self, action: dict, width: int, height: int) -> ActionResult:
@@ -196,8 +229,9 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        device_factory = get_device_factory()
-        device_factory.double_tap(x, y, self.device_id)
+        device_factory = self._get_device_factory()
+        device_factory.double_tap(x, y, self.device_id, delay=self._device_delay())
+        self._wait_for_settle(TIMING_CONFIG.device.default_double_tap_delay)
         return ActionResult(True, False)
 
     def _handle_long_press(self, action: dict, width: int, height: int) -> ActionResult:
@@ -207,8 +241,11 @@ class ActionHandler:
             return ActionResult(False, False, "No element coordinates")
 
         x, y = self._convert_relative_to_absolute(element, width, height)
-        device_factory = get_device_factory()
-        device_factory.long_press(x, y, device_id=self.device_id)
+        device_factory = self._get_device_factory()
+        device_factory.long_press(
+            x, y, device_id=self.device_id, delay=self._device_delay()
+        )
+        self._wait_for_settle(TIMING_CONFIG.device.default_long_press_delay)
         return ActionResult(True, False)
 
     def _handle_wait(self, action: dict, width: int, height: int) -> ActionResult:
@@ -219,7 +256,7 @@ class ActionHandler:
         except ValueError:
             duration = 1.0
 
-        time.sleep(duration)
+        traced_sleep(duration, "action.wait")
         return ActionResult(True, False)
 
     def _handle_takeover(self, action: dict, width: int, height: int) -> ActionResult:
@@ -245,12 +282,43 @@ class ActionHandler:
         # This action signals that user input is needed
         return ActionResult(True, False, message="User interaction required")
 
+    def _get_device_factory(self) -> DeviceFactory:
+        """Get the factory of this handler's device."""
+        return self.device_factory or get_device_factory()
+
+    def _device_delay(self) -> float | None:
+        """
+        Get the delay to pass to device operations.
+
+        Returns 0 in adaptive settle mode (the wait happens in _wait_for_settle),
+        otherwise None so the device uses its configured fixed delay.
+        """
+        return 0.0 if TIMING_CONFIG.settle.enabled else None
+
+    def _wait_for_settle(self, max_wait: float) -> None:
+        """Wait until the screen is stable, bounded by the fixed delay it replaces."""
+        if not TIMING_CONFIG.settle.enabled:
+            return
+
+        device_factory = self._get_device_factory()
+        tracer = get_tracer()
+        with tracer.span("settle", max_wait=max_wait):
+            settled = wait_for_screen_settle(
+                lambda: device_factory.get_settle_frame(self.device_id),
+                max_wait,
+                TIMING_CONFIG.settle,
+            )
+            tracer.annotate(settled=settled)
+        if settled:
+            # The last full frame polled (if any) is the next observation
+            device_factory.keep_settled_screenshot(self.device_id)
+
     def _send_keyevent(self, keycode: str) -> None:
         """Send a keyevent to the device."""
-        from phone_agent.device_factory import DeviceType, get_device_factory
+        from phone_agent.device_factory import DeviceType
         from phone_agent.hdc.connection import _run_hdc_command
 
-        device_factory = get_device_factory()
+        device_factory = self._get_device_factory()
 
         # Handle HDC devices with HarmonyOS-specific keyEvent command
         if device_factory.device_type == DeviceType.HDC:
@@ -299,13 +367,11 @@ class ActionHandler:
                         text=True,
                     )
         else:
-            # ADB devices use standard input keyevent command
-            cmd_prefix = ["adb", "-s", self.device_id] if self.device_id else ["adb"]
-            subprocess.run(
-                cmd_prefix + ["shell", "input", "keyevent", keycode],
-                capture_output=True,
-                text=True,
-            )
+            # ADB devices use standard input keyevent command over the
+            # persistent shell session
+            from phone_agent.adb.shell import run_shell
+
+            run_shell(["input", "keyevent", keycode], self.device_id)
 
     @staticmethod
     def _default_confirmation(message: str) -> bool:
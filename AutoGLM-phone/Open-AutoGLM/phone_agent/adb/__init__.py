@@ -23,11 +23,26 @@ from phone_agent.adb.input import (
     restore_keyboard,
     type_text,
 )
-from phone_agent.adb.screenshot import get_screenshot
+from phone_agent.adb.screenshot import (
+    get_screenshot,
+    get_screenshot_mode,
+    get_settle_frame,
+    set_screenshot_mode,
+)
+from phone_agent.adb.shell import ADBShellSession, close_shell_sessions, run_shell
+from phone_agent.adb.socket_client import (
+    ADBServerError,
+    ADBSocketClient,
+    set_adb_server,
+    set_adb_transport,
+)
 
 __all__ = [
     # Screenshot
     "get_screenshot",
+    "set_screenshot_mode",
+    "get_screenshot_mode",
+    "get_settle_frame",
     # Input
     "type_text",
     "clear_text",
@@ -42,6 +57,15 @@ __all__ = [
     "double_tap",
     "long_press",
     "launch_app",
+    # Transport
+    "ADBSocketClient",
+    "ADBServerError",
+    "set_adb_transport",
+    "set_adb_server",
+    # Shell sessions
+    "ADBShellSession",
+    "run_shell",
+    "close_shell_sessions",
     # Connection management
     "ADBConnection",
     "DeviceInfo",
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+from phone_agent.adb.socket_client import get_socket_client, use_socket_transport
 from phone_agent.config.timing import TIMING_CONFIG
 
 
@@ -73,14 +74,16 @@ class ADBConnection:
             address = f"{address}:5555"  # Default ADB port
 
         try:
-            result = subprocess.run(
-                [self.adb_path, "connect", address],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
-
-            output = result.stdout + result.stderr
+            if use_socket_transport():
+                output = get_socket_client().connect(address, timeout)
+            else:
+                result = subprocess.run(
+                    [self.adb_path, "connect", address],
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout,
+                )
+                output = result.stdout + result.stderr
 
             if "connected" in output.lower():
                 return True, f"Connected to {address}"
@@ -89,7 +92,7 @@ class ADBConnection:
             else:
                 return False, output.strip()
 
-        except subprocess.TimeoutExpired:
+        except (subprocess.TimeoutExpired, TimeoutError):
             return False, f"Connection timeout after {timeout}s"
         except Exception as e:
             return False, f"Connection error: {e}"
@@ -105,6 +108,10 @@ class ADBConnection:
             Tuple of (success, message).
         """
         try:
+            if use_socket_transport():
+                output = get_socket_client().disconnect(address)
+                return True, output.strip() or "Disconnected"
+
             cmd = [self.adb_path, "disconnect"]
             if address:
                 cmd.append(address)
@@ -125,15 +132,19 @@ class ADBConnection:
             List of DeviceInfo objects.
         """
         try:
-            result = subprocess.run(
-                [self.adb_path, "devices", "-l"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
+            if use_socket_transport():
+                lines = get_socket_client().devices().strip().split("\n")
+            else:
+                result = subprocess.run(
+                    [self.adb_path, "devices", "-l"],
+                    capture_output=True,
+                    text=True,
+                    timeout=5,
+                )
+                lines = result.stdout.strip().split("\n")[1:]  # Skip header
 
             devices = []
-            for line in result.stdout.strip().split("\n")[1:]:  # Skip header
+            for line in lines:
                 if not line.strip():
                     continue
 
@@ -1,43 +1,59 @@
 """Device control utilities for Android automation."""
 
 import os
-import subprocess
-import time
+import re
 from typing import List, Optional, Tuple
 
-from phone_agent.config.apps import APP_PACKAGES
+from phone_agent.adb.shell import run_shell
+from phone_agent.config.apps import APP_PACKAGES, PACKAGE_APP_NAMES
 from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.tracing import traced_sleep
+
+# Focus lines look like "mCurrentFocus=Window{... u0 com.tencent.mm/.ui.LauncherUI}"
+FOCUS_QUERY = "dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'"
+_COMPONENT_PATTERN = re.compile(r"([A-Za-z][\w]*(?:\.[\w]+)+)/")
 
 
 def get_current_app(device_id: str | None = None) -> str:
     """
     Get the currently focused app name.
 
+    Only the focus lines of `dumpsys window` are fetched (filtered on the
+    device), and the first recognized package wins.
+
     Args:
         device_id: Optional ADB device ID for multi-device setups.
 
     Returns:
-        The app name if recognized, otherwise "System Home".
+        The app name if recognized, otherwise "System Home" (also when no
+        focus line matched or the query timed out).
     """
-    adb_prefix = _get_adb_prefix(device_id)
-
-    result = subprocess.run(
-        adb_prefix + ["shell", "dumpsys", "window"], capture_output=True, text=True, encoding="utf-8"
-    )
-    output = result.stdout
-    if not output:
-        raise ValueError("No output from dumpsys window")
+    output = run_shell(FOCUS_QUERY, device_id)
 
     # Parse window focus info
     for line in output.split("\n"):
         if "mCurrentFocus" in line or "mFocusedApp" in line:
-            for app_name, package in APP_PACKAGES.items():
-                if package in line:
-                    return app_name
+            app_name = _match_app_name(line)
+            if app_name:
+                return app_name
 
     return "System Home"
 
 
+def _match_app_name(line: str) -> str | None:
+    """Find the app of a focus line: exact package lookup, then substring scan."""
+    for package in _COMPONENT_PATTERN.findall(line):
+        app_name = PACKAGE_APP_NAMES.get(package)
+        if app_name:
+            return app_name
+
+    # Unusual formats (no "package/activity" component): scan the line
+    for app_name, package in APP_PACKAGES.items():
+        if package in line:
+            return app_name
+    return None
+
+
 def tap(
     x: int, y: int, device_id: str | None = None, delay: float | None = None
 ) -> None:
@@ -53,12 +69,8 @@ def tap(
     if delay is None:
         delay = TIMING_CONFIG.device.default_tap_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(["input", "tap", str(x), str(y)], device_id)
+    traced_sleep(delay)
 
 
 def double_tap(
@@ -76,16 +88,10 @@ def double_tap(
     if delay is None:
         delay = TIMING_CONFIG.device.default_double_tap_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
-    time.sleep(TIMING_CONFIG.device.double_tap_interval)
-    subprocess.run(
-        adb_prefix + ["shell", "input", "tap", str(x), str(y)], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(["input", "tap", str(x), str(y)], device_id)
+    traced_sleep(TIMING_CONFIG.device.double_tap_interval)
+    run_shell(["input", "tap", str(x), str(y)], device_id)
+    traced_sleep(delay)
 
 
 def long_press(
@@ -108,14 +114,11 @@ def long_press(
     if delay is None:
         delay = TIMING_CONFIG.device.default_long_press_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix
-        + ["shell", "input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
-        capture_output=True,
+    run_shell(
+        ["input", "swipe", str(x), str(y), str(x), str(y), str(duration_ms)],
+        device_id,
     )
-    time.sleep(delay)
+    traced_sleep(delay)
 
 
 def swipe(
@@ -142,18 +145,14 @@ def swipe(
     if delay is None:
         delay = TIMING_CONFIG.device.default_swipe_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
     if duration_ms is None:
         # Calculate duration based on distance
         dist_sq = (start_x - end_x) ** 2 + (start_y - end_y) ** 2
         duration_ms = int(dist_sq / 1000)
         duration_ms = max(1000, min(duration_ms, 2000))  # Clamp between 1000-2000ms
 
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
+    run_shell(
+        [
             "input",
             "swipe",
             str(start_x),
@@ -162,9 +161,9 @@ def swipe(
             str(end_y),
             str(duration_ms),
         ],
-        capture_output=True,
+        device_id,
     )
-    time.sleep(delay)
+    traced_sleep(delay)
 
 
 def back(device_id: str | None = None, delay: float | None = None) -> None:
@@ -178,12 +177,8 @@ def back(device_id: str | None = None, delay: float | None = None) -> None:
     if delay is None:
         delay = TIMING_CONFIG.device.default_back_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "4"], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(["input", "keyevent", "4"], device_id)
+    traced_sleep(delay)
 
 
 def home(device_id: str | None = None, delay: float | None = None) -> None:
@@ -197,12 +192,8 @@ def home(device_id: str | None = None, delay: float | None = None) -> None:
     if delay is None:
         delay = TIMING_CONFIG.device.default_home_delay
 
-    adb_prefix = _get_adb_prefix(device_id)
-
-    subprocess.run(
-        adb_prefix + ["shell", "input", "keyevent", "KEYCODE_HOME"], capture_output=True
-    )
-    time.sleep(delay)
+    run_shell(["input", "keyevent", "KEYCODE_HOME"], device_id)
+    traced_sleep(delay)
 
 
 def launch_app(
@@ -225,28 +216,11 @@ def launch_app(
     if app_name not in APP_PACKAGES:
         return False
 
-    adb_prefix = _get_adb_prefix(device_id)
     package = APP_PACKAGES[app_name]
 
-    subprocess.run(
-        adb_prefix
-        + [
-            "shell",
-            "monkey",
-            "-p",
-            package,
-            "-c",
-            "android.intent.category.LAUNCHER",
-            "1",
-        ],
-        capture_output=True,
+    run_shell(
+        ["monkey", "-p", package, "-c", "android.intent.category.LAUNCHER", "1"],
+        device_id,
     )
-    time.sleep(delay)
+    traced_sleep(delay)
     return True
-
-
-def _get_adb_prefix(device_id: str | None) -> list:
-    """Get ADB command prefix with optional device specifier."""
-    if device_id:
-        return ["adb", "-s", device_id]
-    return ["adb"]
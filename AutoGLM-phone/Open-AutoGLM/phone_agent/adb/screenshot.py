@@ -1,25 +1,93 @@
 """Screenshot utilities for capturing Android device screen."""
 
-import base64
 import os
+import struct
 import subprocess
 import tempfile
 import uuid
-from dataclasses import dataclass
-from io import BytesIO
-from typing import Tuple
 
+import numpy as np
 from PIL import Image
 
+from phone_agent.adb.socket_client import get_socket_client, use_socket_transport
+from phone_agent.screenshot import (
+    RemoteCaptureFiles,
+    Screenshot,
+    create_fallback_screenshot,
+)
 
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
+# Capture modes:
+# - "exec-out": stream `screencap -p` straight from an `adb exec-out` pipe into memory
+# - "pull": write the PNG to the device, `adb pull` it and re-open it from disk
+# - "raw": stream the raw framebuffer (no PNG compression on the phone) and
+#   convert it with NumPy on the host
+SCREENSHOT_MODES = ("exec-out", "pull", "raw")
 
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
+_SCREENSHOT_MODE = os.getenv("PHONE_AGENT_ADB_SCREENSHOT_MODE", "exec-out").lower()
+
+# Per-device overrides of the capture mode, keyed by device ID
+_DEVICE_SCREENSHOT_MODES: dict[str, str] = {}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# On-device files of pull-mode captures
+_REMOTE_FILES = RemoteCaptureFiles("/sdcard", ".png")
+
+# Android PixelFormat values emitted by `screencap` -> bytes per pixel
+_RAW_FORMAT_RGBA_8888 = 1
+_RAW_FORMAT_RGBX_8888 = 2
+_RAW_FORMAT_RGB_888 = 3
+_RAW_FORMAT_RGB_565 = 4
+_RAW_FORMAT_BGRA_8888 = 5
+_RAW_BYTES_PER_PIXEL = {
+    _RAW_FORMAT_RGBA_8888: 4,
+    _RAW_FORMAT_RGBX_8888: 4,
+    _RAW_FORMAT_RGB_888: 3,
+    _RAW_FORMAT_RGB_565: 2,
+    _RAW_FORMAT_BGRA_8888: 4,
+}
+
+# Approximate long edge of the frames compared while waiting for the screen to settle
+_SETTLE_FRAME_EDGE = 256
+
+
+def set_screenshot_mode(mode: str, device_id: str | None = None) -> None:
+    """
+    Set the ADB screenshot capture mode.
+
+    Args:
+        mode: One of SCREENSHOT_MODES ("exec-out", "pull" or "raw").
+        device_id: Device to configure. If None, sets the default for all
+            devices without an override.
+
+    Raises:
+        ValueError: If the mode is not supported.
+    """
+    global _SCREENSHOT_MODE
+    mode = mode.lower()
+    if mode not in SCREENSHOT_MODES:
+        raise ValueError(
+            f"Unknown screenshot mode: {mode} (expected one of {SCREENSHOT_MODES})"
+        )
+    if device_id:
+        _DEVICE_SCREENSHOT_MODES[device_id] = mode
+    else:
+        _SCREENSHOT_MODE = mode
+
+
+def get_screenshot_mode(device_id: str | None = None) -> str:
+    """
+    Get the ADB screenshot capture mode used for a device.
+
+    Args:
+        device_id: Optional ADB device ID.
+
+    Returns:
+        The device's override if set, otherwise the default mode.
+    """
+    if device_id and device_id in _DEVICE_SCREENSHOT_MODES:
+        return _DEVICE_SCREENSHOT_MODES[device_id]
+    return _SCREENSHOT_MODE
 
 
 def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
@@ -37,13 +105,157 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
         If the screenshot fails (e.g., on sensitive screens like payment pages),
         a black fallback image is returned with is_sensitive=True.
     """
+    mode = get_screenshot_mode(device_id)
+    if mode == "pull":
+        return _get_screenshot_pull(device_id, timeout)
+    if mode == "raw":
+        return _get_screenshot_raw(device_id, timeout)
+    return _get_screenshot_exec_out(device_id, timeout)
+
+
+def _get_screenshot_exec_out(device_id: str | None, timeout: int) -> Screenshot:
+    """
+    Capture a screenshot by reading `screencap -p` output from an exec-out pipe.
+
+    No file is written on the device and nothing touches the host disk.
+    """
+    try:
+        png_data, stderr = _exec_out(["screencap", "-p"], device_id, timeout)
+
+        # Check for screenshot failure (sensitive screen). On secure windows
+        # screencap prints an error instead of image data.
+        if not png_data.startswith(PNG_SIGNATURE):
+            output = (png_data + stderr).decode("utf-8", errors="replace")
+            if "Status: -1" in output or "Failed" in output:
+                return _create_fallback_screenshot(is_sensitive=True)
+            return _create_fallback_screenshot(is_sensitive=False)
+
+        # Keep the PNG exactly as the device encoded it
+        return Screenshot.from_bytes(png_data)
+
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return _create_fallback_screenshot(is_sensitive=False)
+
+
+def _get_screenshot_raw(device_id: str | None, timeout: int) -> Screenshot:
+    """
+    Capture a screenshot by reading the raw framebuffer from `screencap`.
+
+    The phone skips PNG compression entirely; the pixels are converted with
+    NumPy and encoded on the host, which is much faster on low-end devices.
+    Falls back to the PNG path if the raw output cannot be parsed.
+    """
+    try:
+        raw_data, stderr = _exec_out(["screencap"], device_id, timeout)
+        if len(raw_data) < 12:
+            output = (raw_data + stderr).decode("utf-8", errors="replace")
+            if "Status: -1" in output or "Failed" in output:
+                return _create_fallback_screenshot(is_sensitive=True)
+            return _create_fallback_screenshot(is_sensitive=False)
+
+        return Screenshot.from_image(_decode_raw_framebuffer(raw_data))
+
+    except ValueError as e:
+        print(f"Raw screenshot unsupported, using PNG capture: {e}")
+        return _get_screenshot_exec_out(device_id, timeout)
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return _create_fallback_screenshot(is_sensitive=False)
+
+
+def get_settle_frame(
+    device_id: str | None = None, timeout: int = 10
+) -> Image.Image | None:
+    """
+    Capture a cheap low-resolution frame for screen-settle detection.
+
+    Reads the raw framebuffer (no PNG compression on the phone) and keeps every
+    n-th pixel, so no full-size image is built on the host either.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Timeout in seconds for the capture.
+
+    Returns:
+        A small RGB image, or None if the raw capture failed (e.g. on a
+        sensitive screen) and a regular screenshot should be used instead.
+    """
+    try:
+        raw_data, _ = _exec_out(["screencap"], device_id, timeout)
+        width, height = struct.unpack_from("<II", raw_data, 0)
+        step = max(1, max(width, height) // _SETTLE_FRAME_EDGE)
+        return _decode_raw_framebuffer(raw_data, step)
+    except Exception:
+        return None
+
+
+def _decode_raw_framebuffer(raw_data: bytes, step: int = 1) -> Image.Image:
+    """
+    Convert raw `screencap` output into an RGB image.
+
+    The output starts with a little-endian header of width, height and pixel
+    format (plus a color space field since Android 9), followed by the pixels.
+
+    Args:
+        raw_data: Raw `screencap` output.
+        step: Keep every `step`-th pixel in both directions (1 = full size).
+
+    Returns:
+        The frame as an RGB PIL image.
+
+    Raises:
+        ValueError: If the header or pixel format is not understood.
+    """
+    width, height, pixel_format = struct.unpack_from("<III", raw_data, 0)
+    bytes_per_pixel = _RAW_BYTES_PER_PIXEL.get(pixel_format)
+    if bytes_per_pixel is None:
+        raise ValueError(f"unsupported pixel format {pixel_format}")
+
+    pixel_bytes = width * height * bytes_per_pixel
+    header_size = len(raw_data) - pixel_bytes
+    if header_size not in (12, 16):
+        raise ValueError(
+            f"unexpected size {len(raw_data)} for {width}x{height} "
+            f"format {pixel_format}"
+        )
+
+    pixels = np.frombuffer(
+        raw_data, dtype=np.uint8, count=pixel_bytes, offset=header_size
+    )
+
+    if pixel_format == _RAW_FORMAT_RGB_565:
+        packed = pixels.view("<u2").reshape(height, width)[::step, ::step]
+        packed = packed.astype(np.uint16)
+        rgb = np.empty((*packed.shape, 3), dtype=np.uint8)
+        rgb[..., 0] = ((packed >> 11) & 0x1F) * 255 // 31
+        rgb[..., 1] = ((packed >> 5) & 0x3F) * 255 // 63
+        rgb[..., 2] = (packed & 0x1F) * 255 // 31
+    else:
+        frame = pixels.reshape(height, width, bytes_per_pixel)[::step, ::step]
+        if pixel_format == _RAW_FORMAT_BGRA_8888:
+            rgb = frame[..., 2::-1]
+        else:
+            rgb = frame[..., :3]
+
+    return Image.fromarray(np.ascontiguousarray(rgb))
+
+
+def _get_screenshot_pull(device_id: str | None, timeout: int) -> Screenshot:
+    """Capture a screenshot via a temporary file on the device and `adb pull`."""
     temp_path = os.path.join(tempfile.gettempdir(), f"screenshot_{uuid.uuid4()}.png")
     adb_prefix = _get_adb_prefix(device_id)
 
+    if use_socket_transport():
+        return _get_screenshot_pull_socket(device_id, timeout)
+
+    # Unique per capture, so concurrent captures never read each other's file
+    remote_path = _REMOTE_FILES.new_path()
+    command = _REMOTE_FILES.capture_command(device_id, f"screencap -p {remote_path}")
     try:
         # Execute screenshot command
         result = subprocess.run(
-            adb_prefix + ["shell", "screencap", "-p", "/sdcard/tmp.png"],
+            adb_prefix + ["shell", command],
             capture_output=True,
             text=True,
             timeout=timeout,
@@ -56,35 +268,74 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
 
         # Pull screenshot to local temp path
         subprocess.run(
-            adb_prefix + ["pull", "/sdcard/tmp.png", temp_path],
+            adb_prefix + ["pull", remote_path, temp_path],
             capture_output=True,
             text=True,
             timeout=5,
         )
+        _REMOTE_FILES.mark_pulled(device_id, remote_path)
 
         if not os.path.exists(temp_path):
             return _create_fallback_screenshot(is_sensitive=False)
 
-        # Read and encode image
-        img = Image.open(temp_path)
-        width, height = img.size
-
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        # Read image bytes as-is (no decode / re-encode)
+        with open(temp_path, "rb") as f:
+            screenshot = Screenshot.from_bytes(f.read())
 
         # Cleanup
         os.remove(temp_path)
 
-        return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
+        return screenshot
+
+    except Exception as e:
+        print(f"Screenshot error: {e}")
+        return _create_fallback_screenshot(is_sensitive=False)
+
+
+def _get_screenshot_pull_socket(device_id: str | None, timeout: int) -> Screenshot:
+    """Pull-mode capture over the adb server socket; the file is read in memory."""
+    client = get_socket_client()
+    remote_path = _REMOTE_FILES.new_path()
+    command = _REMOTE_FILES.capture_command(device_id, f"screencap -p {remote_path}")
+
+    try:
+        output = client.shell(command, device_id, timeout).decode(
+            "utf-8", errors="replace"
         )
+        if "Status: -1" in output or "Failed" in output:
+            return _create_fallback_screenshot(is_sensitive=True)
+
+        try:
+            data = client.pull(remote_path, device_id, 5)
+        finally:
+            _REMOTE_FILES.mark_pulled(device_id, remote_path)
+        return Screenshot.from_bytes(data)
 
     except Exception as e:
         print(f"Screenshot error: {e}")
         return _create_fallback_screenshot(is_sensitive=False)
 
 
+def _exec_out(
+    command: list[str], device_id: str | None, timeout: int
+) -> tuple[bytes, bytes]:
+    """
+    Run a binary-safe command on the device.
+
+    Returns:
+        Tuple of (stdout, stderr). With the socket transport stderr is empty.
+    """
+    if use_socket_transport():
+        return get_socket_client().exec_out(command, device_id, timeout), b""
+
+    result = subprocess.run(
+        _get_adb_prefix(device_id) + ["exec-out", *command],
+        capture_output=True,
+        timeout=timeout,
+    )
+    return result.stdout, result.stderr
+
+
 def _get_adb_prefix(device_id: str | None) -> list:
     """Get ADB command prefix with optional device specifier."""
     if device_id:
@@ -94,16 +345,4 @@ def _get_adb_prefix(device_id: str | None) -> list:
 
 def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
     """Create a black fallback image when screenshot fails."""
-    default_width, default_height = 1080, 2400
-
-    black_img = Image.new("RGB", (default_width, default_height), color="black")
-    buffered = BytesIO()
-    black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-    return Screenshot(
-        base64_data=base64_data,
-        width=default_width,
-        height=default_height,
-        is_sensitive=is_sensitive,
-    )
+    return create_fallback_screenshot(is_sensitive, width=1080, height=2400)
@@ -0,0 +1,246 @@
+"""Persistent ADB shell sessions for low-latency device commands."""
+
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+
+from phone_agent.adb.socket_client import (
+    ADBServerError,
+    get_socket_client,
+    use_socket_transport,
+)
+
+# Set PHONE_AGENT_ADB_PERSISTENT_SHELL=0 to spawn one `adb shell` per command
+PERSISTENT_SHELL_ENABLED = os.getenv(
+    "PHONE_AGENT_ADB_PERSISTENT_SHELL", "true"
+).lower() in ("true", "1", "yes")
+
+
+class ADBShellSession:
+    """
+    A long-lived `adb shell` process for one device.
+
+    Commands are written to the shell's stdin, each followed by an `echo` of
+    a unique sentinel carrying the exit status, and the output is read back
+    up to that sentinel. This avoids spawning an adb process and setting up
+    a new transport for every tap or keyevent.
+
+    The session restarts automatically if the shell process has died. A
+    command that times out kills the session, since the shell state is then
+    unknown; the next command starts a fresh one.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+        adb_path: Path to the adb executable.
+    """
+
+    def __init__(self, device_id: str | None = None, adb_path: str = "adb"):
+        self.device_id = device_id
+        self.adb_path = adb_path
+        self._process: subprocess.Popen | None = None
+        self._lines: queue.Queue[bytes | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._sentinel = f"__PHONE_AGENT_{uuid.uuid4().hex}__"
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the shell process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def run(self, command: list[str] | str, timeout: float = 10) -> tuple[int, str]:
+        """
+        Run a command in the shell and wait for it to finish.
+
+        Args:
+            command: Command as an argument list (quoted for the device shell)
+                or as a raw shell string.
+            timeout: Timeout in seconds.
+
+        Returns:
+            Tuple of (exit status, combined stdout and stderr).
+
+        Raises:
+            subprocess.TimeoutExpired: If the command did not finish in time.
+            RuntimeError: If the shell exited while running the command.
+        """
+        if not isinstance(command, str):
+            command = shlex.join(command)
+
+        with self._lock:
+            try:
+                self._write(command)
+            except OSError:
+                # The shell died since the last command; nothing ran yet, so
+                # restarting and sending it again is safe
+                self._close()
+                self._write(command)
+            return self._read_result(command, timeout)
+
+    def close(self) -> None:
+        """Terminate the shell process."""
+        with self._lock:
+            self._close()
+
+    def _start(self) -> None:
+        """Start the shell process and its stdout reader thread."""
+        cmd = [self.adb_path]
+        if self.device_id:
+            cmd += ["-s", self.device_id]
+        cmd.append("shell")
+
+        self._lines = queue.Queue()
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        )
+        threading.Thread(
+            target=self._pump_output,
+            args=(self._process.stdout, self._lines),
+            daemon=True,
+        ).start()
+
+    @staticmethod
+    def _pump_output(stream, lines: queue.Queue) -> None:
+        """Forward shell output lines to the queue; None marks EOF."""
+        for line in iter(stream.readline, b""):
+            lines.put(line)
+        lines.put(None)
+
+    def _write(self, command: str) -> None:
+        """Send a command followed by the sentinel echo."""
+        if not self.is_alive:
+            self._close()
+            self._start()
+        # Commands must not read the session's stdin, or they would swallow
+        # the sentinel. The group keeps redirections valid for pipelines.
+        script = f"{{ {command}\n}} </dev/null 2>&1; echo {self._sentinel}$?\n"
+        self._process.stdin.write(script.encode("utf-8"))
+        self._process.stdin.flush()
+
+    def _read_result(self, command: str, timeout: float) -> tuple[int, str]:
+        """Collect output lines until the sentinel line."""
+        deadline = time.monotonic() + timeout
+        output = []
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise queue.Empty
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                self._close()
+                raise subprocess.TimeoutExpired(command, timeout) from None
+
+            if line is None:
+                self._close()
+                raise RuntimeError(
+                    f"adb shell exited while running: {command}\n{b''.join(output)}"
+                )
+
+            index = line.find(self._sentinel.encode())
+            if index >= 0:
+                # Output without a trailing newline ends up on the sentinel line
+                output.append(line[:index])
+                status = line[index + len(self._sentinel) :].strip()
+                text = b"".join(output).decode("utf-8", errors="replace")
+                return int(status or -1), text
+            output.append(line)
+
+    def _close(self) -> None:
+        """Terminate the shell process without taking the lock."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        process.kill()
+        process.wait()
+
+
+_sessions: dict[str | None, ADBShellSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_shell_session(device_id: str | None = None) -> ADBShellSession:
+    """
+    Get the shared shell session for a device, creating it on first use.
+
+    Args:
+        device_id: Optional ADB device ID for multi-device setups.
+
+    Returns:
+        The device's ADBShellSession.
+    """
+    with _sessions_lock:
+        session = _sessions.get(device_id)
+        if session is None:
+            session = ADBShellSession(device_id)
+            _sessions[device_id] = session
+        return session
+
+
+def close_shell_sessions() -> None:
+    """Terminate all shell sessions."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def run_shell(
+    command: list[str] | str, device_id: str | None = None, timeout: float = 10
+) -> str:
+    """
+    Run a shell command on the device.
+
+    Uses the adb server socket when the socket transport is selected,
+    otherwise the device's persistent shell session. Falls back to a one-off
+    `adb shell` process when neither is available. A command that fails
+    mid-way is not re-sent, so input events are never delivered twice.
+
+    Args:
+        command: Command arguments, e.g. ["input", "tap", "100", "200"], or a
+            raw shell string (pipes allowed) interpreted on the device.
+        device_id: Optional ADB device ID for multi-device setups.
+        timeout: Timeout in seconds.
+
+    Returns:
+        Combined stdout and stderr of the command.
+    """
+    if use_socket_transport():
+        try:
+            output = get_socket_client().shell(command, device_id, timeout)
+            return output.decode("utf-8", errors="replace")
+        except TimeoutError as e:
+            print(f"adb shell command failed: {e}")
+            return ""
+        except (OSError, ADBServerError) as e:
+            print(f"adb server request failed, falling back to adb shell: {e}")
+    elif PERSISTENT_SHELL_ENABLED:
+        try:
+            _, output = get_shell_session(device_id).run(command, timeout)
+            return output
+        except OSError as e:
+            print(f"Persistent adb shell failed, falling back to adb shell: {e}")
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"adb shell command failed: {e}")
+            return ""
+
+    if not isinstance(command, str):
+        command = shlex.join(command)
+    adb_prefix = ["adb", "-s", device_id] if device_id else ["adb"]
+    result = subprocess.run(
+        adb_prefix + ["shell", command],
+        capture_output=True,
+        timeout=timeout,
+    )
+    return (result.stdout + result.stderr).decode("utf-8", errors="replace")
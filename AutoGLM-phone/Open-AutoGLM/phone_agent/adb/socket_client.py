@@ -0,0 +1,303 @@
+"""In-process client for the ADB server's smart-socket protocol."""
+
+import os
+import shlex
+import socket
+import struct
+import threading
+import time
+
+ADB_TRANSPORTS = ("subprocess", "socket")
+
+# "subprocess" runs the adb executable per command; "socket" talks to the
+# running adb server (localhost:5037) directly from Python
+_ADB_TRANSPORT = os.getenv("PHONE_AGENT_ADB_TRANSPORT", "subprocess").lower()
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037"))
+
+# Maximum payload of one sync DATA packet
+SYNC_DATA_MAX = 64 * 1024
+
+
+class ADBServerError(Exception):
+    """The adb server answered a request with FAIL or broke the protocol."""
+
+
+def set_adb_transport(transport: str) -> None:
+    """
+    Select how the ADB backend talks to devices.
+
+    Args:
+        transport: One of ADB_TRANSPORTS ("subprocess" or "socket").
+
+    Raises:
+        ValueError: If the transport is not supported.
+    """
+    global _ADB_TRANSPORT
+    transport = transport.lower()
+    if transport not in ADB_TRANSPORTS:
+        raise ValueError(
+            f"Unknown ADB transport: {transport} (expected one of {ADB_TRANSPORTS})"
+        )
+    _ADB_TRANSPORT = transport
+
+
+def use_socket_transport() -> bool:
+    """Whether ADB commands should go through the in-process socket client."""
+    return _ADB_TRANSPORT == "socket"
+
+
+class ADBSocketClient:
+    """
+    Talks to the adb server over its smart-socket protocol.
+
+    Every request opens one TCP connection to the server, so no adb process
+    is forked per command and any number of devices can be driven from one
+    host. Supports the host services (`host:devices-l`, `host:connect`,
+    `host:disconnect`) and, after `host:transport`, the device services
+    `shell:`, `exec:` and `sync:` (pull/push).
+
+    Args:
+        host: Address of the adb server.
+        port: Port of the adb server.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+
+    def devices(self, timeout: float = 5) -> str:
+        """
+        List devices known to the server.
+
+        Returns:
+            The `adb devices -l` lines, without the header.
+        """
+        with self._open(timeout) as sock:
+            self._request(sock, "host:devices-l")
+            return self._read_string(sock)
+
+    def connect(self, address: str, timeout: float = 10) -> str:
+        """
+        Connect the server to a device over TCP/IP.
+
+        Returns:
+            The server's message, e.g. "connected to 192.168.1.100:5555".
+        """
+        with self._open(timeout) as sock:
+            self._request(sock, f"host:connect:{address}")
+            return self._read_string(sock)
+
+    def disconnect(self, address: str | None = None, timeout: float = 5) -> str:
+        """
+        Disconnect a TCP/IP device, or all of them if no address is given.
+
+        Returns:
+            The server's message.
+        """
+        with self._open(timeout) as sock:
+            self._request(sock, f"host:disconnect:{address or ''}")
+            return self._read_string(sock)
+
+    def shell(
+        self,
+        command: list[str] | str,
+        device_id: str | None = None,
+        timeout: float = 10,
+    ) -> bytes:
+        """
+        Run a shell command on the device.
+
+        Args:
+            command: Command as an argument list or a shell string.
+            device_id: Device serial. If None, uses the only connected device.
+            timeout: Socket timeout in seconds.
+
+        Returns:
+            Combined stdout and stderr of the command.
+        """
+        return self._run_service("shell", command, device_id, timeout)
+
+    def exec_out(
+        self,
+        command: list[str] | str,
+        device_id: str | None = None,
+        timeout: float = 10,
+    ) -> bytes:
+        """
+        Run a command without a shell or line translation (binary-safe).
+
+        Args:
+            command: Command as an argument list or a string.
+            device_id: Device serial. If None, uses the only connected device.
+            timeout: Socket timeout in seconds.
+
+        Returns:
+            Raw stdout of the command.
+        """
+        return self._run_service("exec", command, device_id, timeout)
+
+    def pull(
+        self, remote_path: str, device_id: str | None = None, timeout: float = 10
+    ) -> bytes:
+        """
+        Read a file from the device with the sync protocol.
+
+        Args:
+            remote_path: Path on the device.
+            device_id: Device serial. If None, uses the only connected device.
+            timeout: Socket timeout in seconds.
+
+        Returns:
+            The file content.
+        """
+        with self._open_transport(device_id, timeout) as sock:
+            self._request(sock, "sync:")
+            self._sync_send(sock, b"RECV", remote_path.encode("utf-8"))
+
+            chunks = []
+            while True:
+                packet_id, length = struct.unpack("<4sI", self._recv_exactly(sock, 8))
+                if packet_id == b"DATA":
+                    chunks.append(self._recv_exactly(sock, length))
+                elif packet_id == b"DONE":
+                    break
+                elif packet_id == b"FAIL":
+                    message = self._recv_exactly(sock, length).decode(
+                        "utf-8", "replace"
+                    )
+                    raise ADBServerError(f"pull {remote_path} failed: {message}")
+                else:
+                    raise ADBServerError(f"unexpected sync packet {packet_id!r}")
+
+            self._sync_send(sock, b"QUIT", b"")
+            return b"".join(chunks)
+
+    def push(
+        self,
+        data: bytes,
+        remote_path: str,
+        device_id: str | None = None,
+        mode: int = 0o644,
+        timeout: float = 10,
+    ) -> None:
+        """
+        Write a file to the device with the sync protocol.
+
+        Args:
+            data: File content.
+            remote_path: Path on the device.
+            device_id: Device serial. If None, uses the only connected device.
+            mode: Unix permission bits of the file.
+            timeout: Socket timeout in seconds.
+        """
+        with self._open_transport(device_id, timeout) as sock:
+            self._request(sock, "sync:")
+            self._sync_send(sock, b"SEND", f"{remote_path},{mode}".encode("utf-8"))
+            for offset in range(0, len(data), SYNC_DATA_MAX):
+                self._sync_send(sock, b"DATA", data[offset : offset + SYNC_DATA_MAX])
+            # DONE carries the file modification time
+            sock.sendall(struct.pack("<4sI", b"DONE", int(time.time())))
+
+            packet_id, length = struct.unpack("<4sI", self._recv_exactly(sock, 8))
+            if packet_id == b"FAIL":
+                message = self._recv_exactly(sock, length).decode("utf-8", "replace")
+                raise ADBServerError(f"push {remote_path} failed: {message}")
+            if packet_id != b"OKAY":
+                raise ADBServerError(f"unexpected sync packet {packet_id!r}")
+
+            self._sync_send(sock, b"QUIT", b"")
+
+    def _run_service(
+        self,
+        service: str,
+        command: list[str] | str,
+        device_id: str | None,
+        timeout: float,
+    ) -> bytes:
+        """Run a `shell:`/`exec:` service and read its output until EOF."""
+        if not isinstance(command, str):
+            command = shlex.join(command)
+
+        with self._open_transport(device_id, timeout) as sock:
+            self._request(sock, f"{service}:{command}")
+            chunks = []
+            while chunk := sock.recv(SYNC_DATA_MAX):
+                chunks.append(chunk)
+            return b"".join(chunks)
+
+    def _open(self, timeout: float) -> socket.socket:
+        """Open a connection to the adb server."""
+        return socket.create_connection((self.host, self.port), timeout=timeout)
+
+    def _open_transport(self, device_id: str | None, timeout: float) -> socket.socket:
+        """Open a connection bound to a device for device services."""
+        sock = self._open(timeout)
+        try:
+            if device_id:
+                self._request(sock, f"host:transport:{device_id}")
+            else:
+                self._request(sock, "host:transport-any")
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _request(self, sock: socket.socket, service: str) -> None:
+        """Send a length-prefixed request and wait for OKAY."""
+        payload = service.encode("utf-8")
+        sock.sendall(b"%04x" % len(payload) + payload)
+        status = self._recv_exactly(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise ADBServerError(self._read_string(sock))
+        raise ADBServerError(f"unexpected response {status!r} to {service}")
+
+    def _read_string(self, sock: socket.socket) -> str:
+        """Read a hex-length-prefixed string."""
+        length = int(self._recv_exactly(sock, 4), 16)
+        return self._recv_exactly(sock, length).decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _sync_send(sock: socket.socket, packet_id: bytes, payload: bytes) -> None:
+        """Send one sync packet: id, little-endian length, payload."""
+        sock.sendall(struct.pack("<4sI", packet_id, len(payload)) + payload)
+
+    @staticmethod
+    def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+        """Read exactly `size` bytes or fail."""
+        buffer = bytearray()
+        while len(buffer) < size:
+            chunk = sock.recv(size - len(buffer))
+            if not chunk:
+                raise ADBServerError("adb server closed the connection")
+            buffer += chunk
+        return bytes(buffer)
+
+
+_client: ADBSocketClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_socket_client() -> ADBSocketClient:
+    """Get the shared ADBSocketClient instance."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ADBSocketClient()
+        return _client
+
+
+def set_adb_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    """
+    Point the shared socket client at an adb server.
+
+    Args:
+        host: Address of the adb server.
+        port: Port of the adb server, e.g. of a stand-in used for benchmarks.
+    """
+    global _client
+    with _client_lock:
+        _client = ADBSocketClient(host, port)
@@ -7,10 +7,22 @@ from typing import Any, Callable
 
 from phone_agent.actions import ActionHandler
 from phone_agent.actions.handler import do, finish, parse_action
-from phone_agent.config import get_messages, get_system_prompt
-from phone_agent.device_factory import get_device_factory
+from phone_agent.config import (
+    ContextConfig,
+    ModelImageConfig,
+    get_context_config,
+    get_image_config,
+    get_messages,
+    get_system_prompt,
+)
+from phone_agent.context import ConversationContext
+from phone_agent.device_factory import DeviceFactory, get_device_factory
+from phone_agent.lease import Lease, device_lease
 from phone_agent.model import ModelClient, ModelConfig
 from phone_agent.model.client import MessageBuilder
+from phone_agent.observation import new_observe_executor, observe_screen
+from phone_agent.screenshot import prepare_model_image
+from phone_agent.tracing import TRACE_DIR, get_tracer, new_task_id
 
 
 @dataclass
@@ -22,10 +34,17 @@ class AgentConfig:
     lang: str = "cn"
     system_prompt: str | None = None
     verbose: bool = True
+    image_config: ModelImageConfig | None = None  # Model-facing screenshot encoding
+    observation_timeout: float = 15.0  # Deadline for screenshot + current app
+    context_config: ContextConfig | None = None  # Token budget of the history
 
     def __post_init__(self):
         if self.system_prompt is None:
             self.system_prompt = get_system_prompt(self.lang)
+        if self.image_config is None:
+            self.image_config = get_image_config()
+        if self.context_config is None:
+            self.context_config = get_context_config()
 
 
 @dataclass
@@ -51,6 +70,9 @@ class PhoneAgent:
         agent_config: Configuration for the agent behavior.
         confirmation_callback: Optional callback for sensitive action confirmation.
         takeover_callback: Optional callback for takeover requests.
+        device_factory: Factory driving this agent's device. Defaults to the
+            global factory (see set_device_type), so agents on different
+            device types can run side by side in one process.
 
     Example:
         >>> from phone_agent import PhoneAgent
@@ -67,19 +89,24 @@ class PhoneAgent:
         agent_config: AgentConfig | None = None,
         confirmation_callback: Callable[[str], bool] | None = None,
         takeover_callback: Callable[[str], None] | None = None,
+        device_factory: DeviceFactory | None = None,
     ):
         self.model_config = model_config or ModelConfig()
         self.agent_config = agent_config or AgentConfig()
+        self.device_factory = device_factory
 
         self.model_client = ModelClient(self.model_config)
         self.action_handler = ActionHandler(
             device_id=self.agent_config.device_id,
             confirmation_callback=confirmation_callback,
             takeover_callback=takeover_callback,
+            device_factory=device_factory,
         )
 
-        self._context: list[dict[str, Any]] = []
+        self._context = self._new_context()
         self._step_count = 0
+        self._observe_executor = new_observe_executor()
+        self._lease: Lease | None = None
 
     def run(self, task: str) -> str:
         """
@@ -90,10 +117,29 @@ class PhoneAgent:
 
         Returns:
             Final message from the agent.
+
+        Raises:
+            LeaseTimeoutError: If another task kept the device busy for longer
+                than PHONE_AGENT_LEASE_WAIT seconds.
+            LeaseLostError: If the device lease was lost during the task; the
+                task stops before its next step.
         """
-        self._context = []
-        self._step_count = 0
+        self.reset()
 
+        tracer = get_tracer()
+        task_id = new_task_id()
+        device_factory = self.device_factory or get_device_factory()
+        lease_key = device_factory.get_lease_key(self.agent_config.device_id)
+        try:
+            with tracer.task(task_id), device_lease(lease_key) as lease:
+                self._lease = lease
+                return self._run_steps(task)
+        finally:
+            self._lease = None
+            tracer.export_task(task_id, TRACE_DIR)
+
+    def _run_steps(self, task: str) -> str:
+        """Run steps until the task is finished or max steps are reached."""
         # First step with user prompt
         result = self._execute_step(task, is_first=True)
 
@@ -130,42 +176,61 @@ class PhoneAgent:
 
     def reset(self) -> None:
         """Reset the agent state for a new task."""
-        self._context = []
+        self._context = self._new_context()
         self._step_count = 0
+        # Cached observations only span one task; the phone may have moved since
+        device_factory = self.device_factory or get_device_factory()
+        device_factory.invalidate_observation(self.agent_config.device_id)
+
+    def _new_context(self) -> ConversationContext:
+        """Create an empty conversation context."""
+        return ConversationContext(
+            self.agent_config.system_prompt, self.agent_config.context_config
+        )
 
     def _execute_step(
         self, user_prompt: str | None = None, is_first: bool = False
     ) -> StepResult:
         """Execute a single step of the agent loop."""
+        if self._lease is not None:
+            self._lease.check()
         self._step_count += 1
+        with get_tracer().step(self._step_count):
+            return self._run_step(user_prompt, is_first)
+
+    def _run_step(self, user_prompt: str | None, is_first: bool) -> StepResult:
+        """Observe the screen, query the model and execute its action."""
+        tracer = get_tracer()
+
+        # Capture current screen state (screenshot and app query in parallel)
+        device_factory = self.device_factory or get_device_factory()
+        device_id = self.agent_config.device_id
+        with tracer.span("agent.observe"):
+            screenshot, current_app = observe_screen(
+                lambda: device_factory.get_screenshot(device_id),
+                lambda: device_factory.get_current_app(device_id),
+                self.agent_config.observation_timeout,
+                executor=self._observe_executor,
+            )
 
-        # Capture current screen state
-        device_factory = get_device_factory()
-        screenshot = device_factory.get_screenshot(self.agent_config.device_id)
-        current_app = device_factory.get_current_app(self.agent_config.device_id)
+        # Encode the image sent to the model; actions keep using the device size
+        with tracer.span("agent.encode_image"):
+            model_image = prepare_model_image(
+                screenshot, self.agent_config.image_config
+            )
 
         # Build messages
+        screen_info = MessageBuilder.build_screen_info(current_app)
         if is_first:
-            self._context.append(
-                MessageBuilder.create_system_message(self.agent_config.system_prompt)
-            )
-
-            screen_info = MessageBuilder.build_screen_info(current_app)
-            text_content = f"{user_prompt}\n\n{screen_info}"
-
-            self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
+            self._context.add_observation(
+                f"{user_prompt}\n\n{screen_info}",
+                model_image,
+                current_app,
+                task=user_prompt,
             )
         else:
-            screen_info = MessageBuilder.build_screen_info(current_app)
-            text_content = f"** Screen Info **\n\n{screen_info}"
-
-            self._context.append(
-                MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
-                )
+            self._context.add_observation(
+                f"** Screen Info **\n\n{screen_info}", model_image, current_app
             )
 
         # Get model response
@@ -174,7 +239,7 @@ class PhoneAgent:
             print("\n" + "=" * 50)
             print(f"💭 {msgs['thinking']}:")
             print("-" * 50)
-            response = self.model_client.request(self._context)
+            response = self.model_client.request(self._context.build())
         except Exception as e:
             if self.agent_config.verbose:
                 traceback.print_exc()
@@ -192,6 +257,7 @@ class PhoneAgent:
         except ValueError:
             if self.agent_config.verbose:
                 traceback.print_exc()
+            tracer.annotate(parse_error=True)
             action = finish(message=response.action)
 
         if self.agent_config.verbose:
@@ -201,9 +267,6 @@ class PhoneAgent:
             print(json.dumps(action, ensure_ascii=False, indent=2))
             print("=" * 50 + "\n")
 
-        # Remove image from context to save space
-        self._context[-1] = MessageBuilder.remove_images_from_message(self._context[-1])
-
         # Execute action
         try:
             result = self.action_handler.execute(
@@ -216,12 +279,8 @@ class PhoneAgent:
                 finish(message=str(e)), screenshot.width, screenshot.height
             )
 
-        # Add assistant response to context
-        self._context.append(
-            MessageBuilder.create_assistant_message(
-                f"<think>{response.thinking}</think><answer>{response.action}</answer>"
-            )
-        )
+        # Add assistant response to context (older screenshots are dropped)
+        self._context.add_reply(response.thinking, response.action)
 
         # Check if finished
         finished = action.get("_metadata") == "finish" or result.should_finish
@@ -245,7 +304,7 @@ class PhoneAgent:
     @property
     def context(self) -> list[dict[str, Any]]:
         """Get the current conversation context."""
-        return self._context.copy()
+        return self._context.build()
 
     @property
     def step_count(self) -> int:
@@ -7,9 +7,16 @@ from typing import Any, Callable
 
 from phone_agent.actions.handler import do, finish, parse_action
 from phone_agent.actions.handler_ios import IOSActionHandler
-from phone_agent.config import get_messages, get_system_prompt
+from phone_agent.config import (
+    ModelImageConfig,
+    get_image_config,
+    get_messages,
+    get_system_prompt,
+)
 from phone_agent.model import ModelClient, ModelConfig
 from phone_agent.model.client import MessageBuilder
+from phone_agent.observation import new_observe_executor, observe_screen
+from phone_agent.screenshot import prepare_model_image
 from phone_agent.xctest import XCTestConnection, get_current_app, get_screenshot
 
 
@@ -24,10 +31,14 @@ class IOSAgentConfig:
     lang: str = "cn"
     system_prompt: str | None = None
     verbose: bool = True
+    image_config: ModelImageConfig | None = None  # Model-facing screenshot encoding
+    observation_timeout: float = 15.0  # Deadline for screenshot + current app
 
     def __post_init__(self):
         if self.system_prompt is None:
             self.system_prompt = get_system_prompt(self.lang)
+        if self.image_config is None:
+            self.image_config = get_image_config()
 
 
 @dataclass
@@ -98,6 +109,7 @@ class IOSPhoneAgent:
 
         self._context: list[dict[str, Any]] = []
         self._step_count = 0
+        self._observe_executor = new_observe_executor()
 
     def run(self, task: str) -> str:
         """
@@ -157,16 +169,25 @@ class IOSPhoneAgent:
         """Execute a single step of the agent loop."""
         self._step_count += 1
 
-        # Capture current screen state
-        screenshot = get_screenshot(
-            wda_url=self.agent_config.wda_url,
-            session_id=self.agent_config.session_id,
-            device_id=self.agent_config.device_id,
-        )
-        current_app = get_current_app(
-            wda_url=self.agent_config.wda_url, session_id=self.agent_config.session_id
+        # Capture current screen state (screenshot and app query in parallel)
+        screenshot, current_app = observe_screen(
+            lambda: get_screenshot(
+                wda_url=self.agent_config.wda_url,
+                session_id=self.agent_config.session_id,
+                device_id=self.agent_config.device_id,
+            ),
+            lambda: get_current_app(
+                wda_url=self.agent_config.wda_url,
+                session_id=self.agent_config.session_id,
+            ),
+            self.agent_config.observation_timeout,
+            fallback_size=(1179, 2556),
+            executor=self._observe_executor,
         )
 
+        # Encode the image sent to the model; actions keep using the device size
+        model_image = prepare_model_image(screenshot, self.agent_config.image_config)
+
         # Build messages
         if is_first:
             self._context.append(
@@ -178,7 +199,7 @@ class IOSPhoneAgent:
 
             self._context.append(
                 MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
+                    text=text_content, screenshot=model_image
                 )
             )
         else:
@@ -187,7 +208,7 @@ class IOSPhoneAgent:
 
             self._context.append(
                 MessageBuilder.create_user_message(
-                    text=text_content, image_base64=screenshot.base64_data
+                    text=text_content, screenshot=model_image
                 )
             )
 
@@ -2,7 +2,19 @@
 
 from phone_agent.config.apps import APP_PACKAGES
 from phone_agent.config.apps_ios import APP_PACKAGES_IOS
+from phone_agent.config.context import (
+    CONTEXT_CONFIG,
+    ContextConfig,
+    get_context_config,
+    update_context_config,
+)
 from phone_agent.config.i18n import get_message, get_messages
+from phone_agent.config.image import (
+    IMAGE_CONFIG,
+    ModelImageConfig,
+    get_image_config,
+    update_image_config,
+)
 from phone_agent.config.prompts_en import SYSTEM_PROMPT as SYSTEM_PROMPT_EN
 from phone_agent.config.prompts_zh import SYSTEM_PROMPT as SYSTEM_PROMPT_ZH
 from phone_agent.config.timing import (
@@ -10,6 +22,7 @@ from phone_agent.config.timing import (
     ActionTimingConfig,
     ConnectionTimingConfig,
     DeviceTimingConfig,
+    SettleTimingConfig,
     TimingConfig,
     get_timing_config,
     update_timing_config,
@@ -48,6 +61,15 @@ __all__ = [
     "ActionTimingConfig",
     "DeviceTimingConfig",
     "ConnectionTimingConfig",
+    "SettleTimingConfig",
     "get_timing_config",
     "update_timing_config",
+    "IMAGE_CONFIG",
+    "ModelImageConfig",
+    "get_image_config",
+    "update_image_config",
+    "CONTEXT_CONFIG",
+    "ContextConfig",
+    "get_context_config",
+    "update_context_config",
 ]
@@ -187,6 +187,12 @@ APP_PACKAGES: dict[str, str] = {
     "WhatsApp": "com.whatsapp",
 }
 
+# Reverse index (package -> app name), built once. When several names share
+# a package, the first one listed above wins.
+PACKAGE_APP_NAMES: dict[str, str] = {}
+for _app_name, _package in APP_PACKAGES.items():
+    PACKAGE_APP_NAMES.setdefault(_package, _app_name)
+
 
 def get_package_name(app_name: str) -> str | None:
     """
@@ -211,10 +217,7 @@ def get_app_name(package_name: str) -> str | None:
     Returns:
         The display name of the app, or None if not found.
     """
-    for name, package in APP_PACKAGES.items():
-        if package == package_name:
-            return name
-    return None
+    return PACKAGE_APP_NAMES.get(package_name)
 
 
 def list_supported_apps() -> list[str]:
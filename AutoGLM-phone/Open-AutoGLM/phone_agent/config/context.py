@@ -0,0 +1,138 @@
+"""Configuration of the conversation context sent to the model.
+
+By default the agent keeps every turn's thinking and screen info for the
+whole task. Setting a token budget makes it compress older turns into a
+compact action log once the prompt text outgrows the budget.
+
+Only the current screenshot is sent by default. Keeping earlier screenshots
+opens a sliding window of history images: each is downscaled and recompressed
+once it stops being the current screen, and the oldest are evicted to stay
+within the image count, memory and token caps. Users can customize these
+values by modifying this file or by setting environment variables.
+"""
+
+import os
+from dataclasses import dataclass
+
+from phone_agent.config.image import ModelImageConfig
+
+# Which history screenshot is evicted first when a cap is exceeded:
+# "oldest" slides the window; "keep_first" pins the task's first screenshot
+# (when the window holds at least two) and slides the rest
+EVICTION_POLICIES = ("oldest", "keep_first")
+
+
+@dataclass
+class ContextConfig:
+    """Configuration of the agent's conversation context."""
+
+    max_tokens: int = 0  # Budget for the prompt text in tokens (0 = no budget)
+    keep_turns: int = 4  # Latest turns kept in full when older ones are compressed
+    keep_screenshots: int = 0  # Earlier screenshots kept besides the current one
+    history_image_max_edge: int = 768  # Long edge of kept earlier screenshots
+    history_image_quality: int = 60  # JPEG quality of kept earlier screenshots
+    history_max_bytes: int = 2_000_000  # Memory cap of earlier screenshots (0 = none)
+    history_max_tokens: int = 4000  # Image token cap of earlier screenshots (0 = none)
+    history_eviction: str = "oldest"  # One of EVICTION_POLICIES
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.max_tokens = int(
+            os.getenv("PHONE_AGENT_CONTEXT_MAX_TOKENS", self.max_tokens)
+        )
+        self.keep_turns = int(
+            os.getenv("PHONE_AGENT_CONTEXT_KEEP_TURNS", self.keep_turns)
+        )
+        self.keep_screenshots = int(
+            os.getenv("PHONE_AGENT_CONTEXT_KEEP_SCREENSHOTS", self.keep_screenshots)
+        )
+        self.history_image_max_edge = int(
+            os.getenv(
+                "PHONE_AGENT_CONTEXT_HISTORY_IMAGE_MAX_EDGE",
+                self.history_image_max_edge,
+            )
+        )
+        self.history_image_quality = int(
+            os.getenv(
+                "PHONE_AGENT_CONTEXT_HISTORY_IMAGE_QUALITY",
+                self.history_image_quality,
+            )
+        )
+        self.history_max_bytes = int(
+            os.getenv("PHONE_AGENT_CONTEXT_HISTORY_MAX_BYTES", self.history_max_bytes)
+        )
+        self.history_max_tokens = int(
+            os.getenv("PHONE_AGENT_CONTEXT_HISTORY_MAX_TOKENS", self.history_max_tokens)
+        )
+        self.history_eviction = os.getenv(
+            "PHONE_AGENT_CONTEXT_HISTORY_EVICTION", self.history_eviction
+        ).lower()
+
+        if self.history_eviction not in EVICTION_POLICIES:
+            raise ValueError(
+                f"Unknown eviction policy: {self.history_eviction} "
+                f"(expected one of {EVICTION_POLICIES})"
+            )
+        self.keep_turns = max(1, self.keep_turns)
+        self.keep_screenshots = max(0, self.keep_screenshots)
+        self.history_image_quality = max(1, min(self.history_image_quality, 100))
+
+    @property
+    def is_bounded(self) -> bool:
+        """Whether older turns are compressed to stay within a budget."""
+        return self.max_tokens > 0
+
+    @property
+    def history_image_config(self) -> ModelImageConfig:
+        """Encoding of kept earlier screenshots (JPEG, downscaled)."""
+        config = ModelImageConfig()
+        # Set after construction: the PHONE_AGENT_IMAGE_* variables configure
+        # the current screenshot, not the history
+        config.format = "jpeg"
+        config.quality = self.history_image_quality
+        config.max_long_edge = self.history_image_max_edge
+        return config
+
+
+# Global context configuration instance
+CONTEXT_CONFIG = ContextConfig()
+
+
+def get_context_config() -> ContextConfig:
+    """
+    Get the global context configuration.
+
+    Returns:
+        The global ContextConfig instance.
+    """
+    return CONTEXT_CONFIG
+
+
+def update_context_config(config: ContextConfig) -> None:
+    """
+    Update the global context configuration.
+
+    Args:
+        config: New context configuration.
+
+    Example:
+        >>> from phone_agent.config.context import update_context_config, ContextConfig
+        >>> update_context_config(ContextConfig(max_tokens=6000, keep_turns=3))
+    """
+    CONTEXT_CONFIG.max_tokens = config.max_tokens
+    CONTEXT_CONFIG.keep_turns = config.keep_turns
+    CONTEXT_CONFIG.keep_screenshots = config.keep_screenshots
+    CONTEXT_CONFIG.history_image_max_edge = config.history_image_max_edge
+    CONTEXT_CONFIG.history_image_quality = config.history_image_quality
+    CONTEXT_CONFIG.history_max_bytes = config.history_max_bytes
+    CONTEXT_CONFIG.history_max_tokens = config.history_max_tokens
+    CONTEXT_CONFIG.history_eviction = config.history_eviction
+
+
+__all__ = [
+    "EVICTION_POLICIES",
+    "ContextConfig",
+    "CONTEXT_CONFIG",
+    "get_context_config",
+    "update_context_config",
+]
@@ -0,0 +1,81 @@
+"""Image configuration for screenshots sent to the model.
+
+This module controls how screenshots are encoded before they are uploaded to the
+model endpoint. Users can customize these values by modifying this file or by
+setting environment variables.
+"""
+
+import os
+from dataclasses import dataclass
+
+# Supported model-facing image formats. "original" sends the device's bytes as-is.
+IMAGE_FORMATS = ("original", "png", "jpeg", "webp")
+
+
+@dataclass
+class ModelImageConfig:
+    """Configuration for the screenshot image sent to the model."""
+
+    format: str = "original"  # One of IMAGE_FORMATS
+    quality: int = 85  # Quality for lossy formats (JPEG / WebP), 1-100
+    max_long_edge: int = 0  # Downscale so the long edge fits this size (0 = no limit)
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.format = os.getenv("PHONE_AGENT_IMAGE_FORMAT", self.format).lower()
+        self.quality = int(os.getenv("PHONE_AGENT_IMAGE_QUALITY", self.quality))
+        self.max_long_edge = int(
+            os.getenv("PHONE_AGENT_IMAGE_MAX_EDGE", self.max_long_edge)
+        )
+
+        if self.format == "jpg":
+            self.format = "jpeg"
+        if self.format not in IMAGE_FORMATS:
+            raise ValueError(
+                f"Unknown image format: {self.format} (expected one of {IMAGE_FORMATS})"
+            )
+        self.quality = max(1, min(self.quality, 100))
+
+    @property
+    def is_passthrough(self) -> bool:
+        """Whether screenshots are sent to the model unchanged."""
+        return self.format == "original" and self.max_long_edge <= 0
+
+
+# Global image configuration instance
+IMAGE_CONFIG = ModelImageConfig()
+
+
+def get_image_config() -> ModelImageConfig:
+    """
+    Get the global model image configuration.
+
+    Returns:
+        The global ModelImageConfig instance.
+    """
+    return IMAGE_CONFIG
+
+
+def update_image_config(config: ModelImageConfig) -> None:
+    """
+    Update the global model image configuration.
+
+    Args:
+        config: New model image configuration.
+
+    Example:
+        >>> from phone_agent.config.image import update_image_config, ModelImageConfig
+        >>> update_image_config(ModelImageConfig(format="jpeg", quality=80, max_long_edge=1280))
+    """
+    IMAGE_CONFIG.format = config.format
+    IMAGE_CONFIG.quality = config.quality
+    IMAGE_CONFIG.max_long_edge = config.max_long_edge
+
+
+__all__ = [
+    "IMAGE_FORMATS",
+    "ModelImageConfig",
+    "IMAGE_CONFIG",
+    "get_image_config",
+    "update_image_config",
+]
@@ -96,6 +96,43 @@ class ConnectionTimingConfig:
         )
 
 
+@dataclass
+class SettleTimingConfig:
+    """
+    Configuration for adaptive "wait until the screen is stable" mode.
+
+    When enabled, the fixed post-action delays above become upper bounds: after
+    an action the screen is polled with cheap downsampled frames and the wait
+    ends as soon as consecutive frames stop changing.
+    """
+
+    enabled: bool = False  # Use adaptive waiting instead of fixed sleeps
+    min_wait: float = 0.15  # Minimum wait before the first poll (screen reaction time)
+    poll_interval: float = 0.1  # Interval between polls
+    stable_polls: int = 2  # Consecutive unchanged frames required to finish
+    diff_threshold: float = 0.005  # Mean abs pixel difference (0-1) seen as static
+    sample_size: int = 64  # Long edge of the downsampled comparison frame
+
+    def __post_init__(self):
+        """Load values from environment variables if present."""
+        self.enabled = os.getenv(
+            "PHONE_AGENT_ADAPTIVE_WAIT", str(self.enabled)
+        ).lower() in ("true", "1", "yes")
+        self.min_wait = float(os.getenv("PHONE_AGENT_SETTLE_MIN_WAIT", self.min_wait))
+        self.poll_interval = float(
+            os.getenv("PHONE_AGENT_SETTLE_POLL_INTERVAL", self.poll_interval)
+        )
+        self.stable_polls = int(
+            os.getenv("PHONE_AGENT_SETTLE_STABLE_POLLS", self.stable_polls)
+        )
+        self.diff_threshold = float(
+            os.getenv("PHONE_AGENT_SETTLE_DIFF_THRESHOLD", self.diff_threshold)
+        )
+        self.sample_size = int(
+            os.getenv("PHONE_AGENT_SETTLE_SAMPLE_SIZE", self.sample_size)
+        )
+
+
 @dataclass
 class TimingConfig:
     """Master timing configuration combining all timing settings."""
@@ -103,12 +140,14 @@ class TimingConfig:
     action: ActionTimingConfig
     device: DeviceTimingConfig
     connection: ConnectionTimingConfig
+    settle: SettleTimingConfig
 
     def __init__(self):
         """Initialize all timing configurations."""
         self.action = ActionTimingConfig()
         self.device = DeviceTimingConfig()
         self.connection = ConnectionTimingConfig()
+        self.settle = SettleTimingConfig()
 
 
 # Global timing configuration instance
@@ -130,6 +169,7 @@ def update_timing_config(
     action: ActionTimingConfig | None = None,
     device: DeviceTimingConfig | None = None,
     connection: ConnectionTimingConfig | None = None,
+    settle: SettleTimingConfig | None = None,
 ) -> None:
     """
     Update the global timing configuration.
@@ -138,6 +178,7 @@ def update_timing_config(
         action: New action timing configuration.
         device: New device timing configuration.
         connection: New connection timing configuration.
+        settle: New adaptive settle configuration.
 
     Example:
         >>> from phone_agent.config.timing import update_timing_config, ActionTimingConfig
@@ -154,12 +195,15 @@ def update_timing_config(
         TIMING_CONFIG.device = device
     if connection is not None:
         TIMING_CONFIG.connection = connection
+    if settle is not None:
+        TIMING_CONFIG.settle = settle
 
 
 __all__ = [
     "ActionTimingConfig",
     "DeviceTimingConfig",
     "ConnectionTimingConfig",
+    "SettleTimingConfig",
     "TimingConfig",
     "TIMING_CONFIG",
     "get_timing_config",
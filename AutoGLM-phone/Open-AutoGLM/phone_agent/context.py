@@ -0,0 +1,234 @@
+"""Token-budgeted conversation context for the agent.
+
+The context holds the system prompt and one turn per step: the screen info
+(with its screenshot) sent to the model and the model's reply. With a token
+budget (see ContextConfig), older turns are compressed into a compact action
+log once the prompt text exceeds the budget, keeping the latest turns in
+full. Compression removes a batch of turns at a time, so the prompt prefix
+stays unchanged (and cacheable by the server) between compressions.
+
+Earlier screenshots form a bounded window: when a screen stops being the
+current one it is recompressed to a small JPEG (if the window keeps any
+screenshots at all), and history screenshots are evicted until the window
+fits its image count, memory and token caps.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any
+
+from phone_agent.config.context import ContextConfig, get_context_config
+from phone_agent.model.client import MessageBuilder
+from phone_agent.screenshot import Screenshot, prepare_model_image
+from phone_agent.tracing import get_tracer
+
+# Longest action text kept per entry of the action log
+MAX_LOGGED_ACTION_CHARS = 200
+
+# Pixels per side of the square a vision encoder turns into one token
+# (14-pixel patches merged 2x2, as in GLM-4V / Qwen2-VL)
+IMAGE_TOKEN_PIXELS = 28
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens of a text.
+
+    CJK characters count as one token each and other text as four characters
+    per token, which is close enough for budgeting without a tokenizer.
+    """
+    cjk = sum(1 for char in text if ord(char) >= 0x2E80)
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_image_tokens(screenshot: Screenshot) -> int:
+    """Roughly estimate the number of tokens of an image input."""
+    return math.ceil(screenshot.width / IMAGE_TOKEN_PIXELS) * math.ceil(
+        screenshot.height / IMAGE_TOKEN_PIXELS
+    )
+
+
+@dataclass
+class Turn:
+    """One step of the conversation."""
+
+    step: int
+    text: str  # Text of the user message (task and/or screen info)
+    screenshot: Screenshot | None = None  # Model-facing screenshot, if kept
+    app: str | None = None  # Foreground app when the screen was observed
+    reply: str | None = None  # Assistant message, once the model answered
+    action: str | None = None  # Action part of the reply
+
+    def log_entry(self) -> str:
+        """Describe the turn as one line of the action log."""
+        action = " ".join((self.action or "(no reply)").split())
+        if len(action) > MAX_LOGGED_ACTION_CHARS:
+            action = action[: MAX_LOGGED_ACTION_CHARS - 3] + "..."
+        app = f"[{self.app}] " if self.app else ""
+        return f"{self.step}. {app}{action}"
+
+
+class ConversationContext:
+    """
+    The messages sent to the model, kept within a token budget.
+
+    Args:
+        system_prompt: System prompt, always kept.
+        config: Context configuration. Defaults to the global one.
+
+    Example:
+        >>> context = ConversationContext("You are a phone agent.")
+        >>> context.add_observation("打开微信\\n\\n{...}", screenshot, "System Home",
+        ...                         task="打开微信")
+        >>> response = model_client.request(context.build())
+        >>> context.add_reply(response.thinking, response.action)
+    """
+
+    def __init__(self, system_prompt: str, config: ContextConfig | None = None):
+        self.system_prompt = system_prompt
+        self.config = config or get_context_config()
+        self.task: str | None = None
+        self.turns: list[Turn] = []
+        # Compressed turns, oldest first, and how many were dropped from it
+        self.action_log: list[str] = []
+        self.omitted_steps = 0
+
+    def __len__(self) -> int:
+        """Number of steps so far, compressed ones included."""
+        return len(self.action_log) + self.omitted_steps + len(self.turns)
+
+    def add_observation(
+        self,
+        text: str,
+        screenshot: Screenshot | None = None,
+        app: str | None = None,
+        task: str | None = None,
+    ) -> None:
+        """
+        Start a turn with what the agent sees.
+
+        Args:
+            text: Text of the user message.
+            screenshot: Screenshot sent with it.
+            app: Current foreground app, shown in the action log.
+            task: The task, on the first turn; kept even after compression.
+        """
+        if task is not None:
+            self.task = task
+        if self.turns:
+            self._retire_screenshot(self.turns[-1])
+        self.turns.append(Turn(len(self) + 1, text, screenshot, app))
+        self._compress()
+        self._evict_screenshots()
+
+    def add_reply(self, thinking: str, action: str) -> None:
+        """Finish the current turn with the model's reply."""
+        turn = self.turns[-1]
+        turn.reply = f"<think>{thinking}</think><answer>{action}</answer>"
+        turn.action = action
+
+    def build(self) -> list[dict[str, Any]]:
+        """Get the messages for the next model request."""
+        messages = [MessageBuilder.create_system_message(self.system_prompt)]
+        summary = self._summary()
+        for index, turn in enumerate(self.turns):
+            text = turn.text
+            if index == 0 and summary:
+                text = f"{summary}\n\n{text}"
+            messages.append(
+                MessageBuilder.create_user_message(
+                    text=text, screenshot=turn.screenshot
+                )
+            )
+            if turn.reply is not None:
+                messages.append(MessageBuilder.create_assistant_message(turn.reply))
+        return messages
+
+    def estimate_tokens(self) -> int:
+        """Estimate the tokens of the prompt text (images excluded)."""
+        total = estimate_tokens(self.system_prompt) + estimate_tokens(self._summary())
+        for turn in self.turns:
+            total += estimate_tokens(turn.text) + estimate_tokens(turn.reply or "")
+        return total
+
+    def _summary(self) -> str:
+        """Task and action log standing in for the compressed turns."""
+        if not self.action_log and not self.omitted_steps:
+            return ""
+        lines = [self.task or "", "", "** Previous Steps **"]
+        if self.omitted_steps:
+            lines.append(f"({self.omitted_steps} earlier steps omitted)")
+        lines.extend(self.action_log)
+        return "\n".join(lines).strip()
+
+    def history_screenshots(self) -> list[Screenshot]:
+        """Earlier screenshots still sent with the prompt, oldest first."""
+        return [t.screenshot for t in self.turns[:-1] if t.screenshot is not None]
+
+    def history_usage(self) -> tuple[int, int]:
+        """Get the memory (bytes) and estimated tokens of the history images."""
+        history = self.history_screenshots()
+        return (
+            sum(len(s.data) for s in history),
+            sum(estimate_image_tokens(s) for s in history),
+        )
+
+    def _retire_screenshot(self, turn: Turn) -> None:
+        """Shrink the screenshot of a turn that is no longer the current one."""
+        if turn.screenshot is None:
+            return
+        if self.config.keep_screenshots <= 0:
+            turn.screenshot = None
+            return
+        with get_tracer().span("context.shrink_image"):
+            turn.screenshot = prepare_model_image(
+                turn.screenshot, self.config.history_image_config
+            )
+
+    def _evict_screenshots(self) -> None:
+        """Drop history screenshots until the window fits all of its caps."""
+        config = self.config
+        turns = [t for t in self.turns[:-1] if t.screenshot is not None]
+        memory, tokens = self.history_usage()
+        while turns and (
+            len(turns) > config.keep_screenshots
+            or 0 < config.history_max_bytes < memory
+            or 0 < config.history_max_tokens < tokens
+        ):
+            victim = turns[0]
+            if (
+                config.history_eviction == "keep_first"
+                and victim.step == 1
+                and len(turns) > 1
+                and config.keep_screenshots > 1
+            ):
+                victim = turns[1]
+            turns.remove(victim)
+            memory -= len(victim.screenshot.data)
+            tokens -= estimate_image_tokens(victim.screenshot)
+            victim.screenshot = None
+
+    def _compress(self) -> None:
+        """Compress older turns into the action log while over budget."""
+        if not self.config.is_bounded:
+            return
+        budget = self.config.max_tokens
+        if self.estimate_tokens() <= budget:
+            return
+
+        # Compress a batch down to the latest full turns
+        self._compress_turns(len(self.turns) - self.config.keep_turns)
+        # Still too long: shorten the log, then give up older full turns
+        while self.estimate_tokens() > budget and self.action_log:
+            self.action_log.pop(0)
+            self.omitted_steps += 1
+        while self.estimate_tokens() > budget and len(self.turns) > 1:
+            self._compress_turns(1)
+            while self.estimate_tokens() > budget and self.action_log:
+                self.action_log.pop(0)
+                self.omitted_steps += 1
+
+    def _compress_turns(self, count: int) -> None:
+        """Move the oldest turns into the action log, never the current one."""
+        for _ in range(min(count, len(self.turns) - 1)):
+            self.action_log.append(self.turns.pop(0).log_entry())
@@ -1,7 +1,16 @@
 """Device factory for selecting ADB or HDC based on device type."""
 
+import re
 from enum import Enum
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from phone_agent.tracing import traced
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+    from phone_agent.frame_source import FrameSource
+    from phone_agent.screenshot import Screenshot
 
 
 class DeviceType(Enum):
@@ -11,6 +20,12 @@ class DeviceType(Enum):
     HDC = "hdc"
     IOS = "ios"
     ACCESSIBILITY = "accessibility"
+    SIMULATED = "simulated"  # Replays recorded screens, for offline load tests
+
+
+# Network serial of a device reached over TCP, e.g. "192.168.1.5:5555"
+_NETWORK_SERIAL = re.compile(r"^(?P<host>[^:\s]+):\d+$")
+
 
 class DeviceFactory:
     """
@@ -28,6 +43,14 @@ class DeviceFactory:
         """
         self.device_type = device_type
         self._module = None
+        # Optional source of screenshots from a live mirroring stream (scrcpy)
+        self.screenshot_provider: "FrameSource | None" = None
+        # Foreground app per device, valid until the next action
+        self._current_app_cache: dict[str | None, str] = {}
+        # Last full screenshot polled while waiting for the screen to settle,
+        # and the settled one the next get_screenshot() returns (per device)
+        self._settle_screenshots: dict[str | None, "Screenshot"] = {}
+        self._settled_screenshots: dict[str | None, "Screenshot"] = {}
 
     @property
     def module(self):
@@ -45,30 +68,123 @@ class DeviceFactory:
                 from phone_agent import accessibility
 
                 self._module = accessibility
+            elif self.device_type == DeviceType.SIMULATED:
+                from phone_agent import simulated
+
+                self._module = simulated
             else:
                 raise ValueError(f"Unknown device type: {self.device_type}")
         return self._module
 
+    @traced("device.screenshot")
     def get_screenshot(self, device_id: str | None = None, timeout: int = 10):
-        """Get screenshot from device."""
-        return self.module.get_screenshot(device_id, timeout)
+        """Get screenshot from device, preferring a fresh mirroring frame."""
+        screenshot = self._settled_screenshots.pop(device_id, None)
+        if screenshot is not None:
+            return screenshot
+
+        provider = self.screenshot_provider
+        if provider is None or not provider.serves(device_id):
+            return self.module.get_screenshot(device_id, timeout)
+
+        screenshot = provider.get_screenshot()
+        if screenshot is None:
+            screenshot = self.module.get_screenshot(device_id, timeout)
+            if provider.device_size is None and not screenshot.is_sensitive:
+                # Learn the real screen size; streams are often downscaled
+                provider.device_size = (screenshot.width, screenshot.height)
+        return screenshot
+
+    @traced("device.settle_frame")
+    def get_settle_frame(
+        self, device_id: str | None = None, timeout: int = 10
+    ) -> "Image.Image | Screenshot":
+        """
+        Get a frame to compare while waiting for the screen to settle.
 
-    def get_current_app(self, device_id: str | None = None) -> str:
-        """Get current app name."""
-        return self.module.get_current_app(device_id)
+        Uses the cheapest source available: the mirroring stream's newest
+        frame, then the backend's low-resolution capture (`get_settle_frame`
+        of the device module, e.g. the raw framebuffer over ADB). Otherwise a
+        full screenshot is taken and kept, so keep_settled_screenshot() can
+        hand it to the next observation instead of capturing again.
+
+        Args:
+            device_id: Optional device ID.
+            timeout: Timeout in seconds for a device capture.
 
+        Returns:
+            A (possibly downscaled) image or a full screenshot.
+        """
+        provider = self.screenshot_provider
+        if provider is not None and provider.serves(device_id):
+            image = provider.get_latest_image()
+            if image is not None:
+                return image
+
+        capture = getattr(self.module, "get_settle_frame", None)
+        if capture is not None:
+            image = capture(device_id, timeout)
+            if image is not None:
+                return image
+
+        screenshot = self.module.get_screenshot(device_id, timeout)
+        self._settle_screenshots[device_id] = screenshot
+        return screenshot
+
+    def keep_settled_screenshot(self, device_id: str | None = None) -> None:
+        """
+        Reuse the last full screenshot polled by settle detection.
+
+        Call once the screen settled: the next get_screenshot() returns that
+        frame instead of capturing again, unless another action happens first.
+        """
+        screenshot = self._settle_screenshots.pop(device_id, None)
+        if screenshot is not None:
+            self._settled_screenshots[device_id] = screenshot
+
+    def _mark_action(self, device_id: str | None) -> None:
+        """Invalidate state observed before an action (frames, current app)."""
+        self.invalidate_observation(device_id)
+        provider = self.screenshot_provider
+        if provider is not None and provider.serves(device_id):
+            provider.mark_action()
+
+    @traced("device.current_app")
+    def get_current_app(self, device_id: str | None = None) -> str:
+        """Get current app name, cached until the next action on the device."""
+        app_name = self._current_app_cache.get(device_id)
+        if app_name is None:
+            app_name = self.module.get_current_app(device_id)
+            self._current_app_cache[device_id] = app_name
+        return app_name
+
+    def invalidate_current_app(self, device_id: str | None = None) -> None:
+        """Forget the cached current app of a device."""
+        self._current_app_cache.pop(device_id, None)
+
+    def invalidate_observation(self, device_id: str | None = None) -> None:
+        """Forget the cached current app and settled screenshot of a device."""
+        self.invalidate_current_app(device_id)
+        self._settle_screenshots.pop(device_id, None)
+        self._settled_screenshots.pop(device_id, None)
+
+    @traced("device.tap")
     def tap(
         self, x: int, y: int, device_id: str | None = None, delay: float | None = None
     ):
         """Tap at coordinates."""
+        self._mark_action(device_id)
         return self.module.tap(x, y, device_id, delay)
 
+    @traced("device.double_tap")
     def double_tap(
         self, x: int, y: int, device_id: str | None = None, delay: float | None = None
     ):
         """Double tap at coordinates."""
+        self._mark_action(device_id)
         return self.module.double_tap(x, y, device_id, delay)
 
+    @traced("device.long_press")
     def long_press(
         self,
         x: int,
@@ -78,8 +194,10 @@ class DeviceFactory:
         delay: float | None = None,
     ):
         """Long press at coordinates."""
+        self._mark_action(device_id)
         return self.module.long_press(x, y, duration_ms, device_id, delay)
 
+    @traced("device.swipe")
     def swipe(
         self,
         start_x: int,
@@ -91,36 +209,49 @@ class DeviceFactory:
         delay: float | None = None,
     ):
         """Swipe from start to end."""
+        self._mark_action(device_id)
         return self.module.swipe(
             start_x, start_y, end_x, end_y, duration_ms, device_id, delay
         )
 
+    @traced("device.back")
     def back(self, device_id: str | None = None, delay: float | None = None):
         """Press back button."""
+        self._mark_action(device_id)
         return self.module.back(device_id, delay)
 
+    @traced("device.home")
     def home(self, device_id: str | None = None, delay: float | None = None):
         """Press home button."""
+        self._mark_action(device_id)
         return self.module.home(device_id, delay)
 
+    @traced("device.launch_app")
     def launch_app(
         self, app_name: str, device_id: str | None = None, delay: float | None = None
     ) -> bool:
         """Launch an app."""
+        self._mark_action(device_id)
         return self.module.launch_app(app_name, device_id, delay)
 
+    @traced("device.type_text")
     def type_text(self, text: str, device_id: str | None = None):
         """Type text."""
+        self._mark_action(device_id)
         return self.module.type_text(text, device_id)
 
+    @traced("device.clear_text")
     def clear_text(self, device_id: str | None = None):
         """Clear text."""
+        self._mark_action(device_id)
         return self.module.clear_text(device_id)
 
+    @traced("device.detect_keyboard")
     def detect_and_set_adb_keyboard(self, device_id: str | None = None) -> str:
         """Detect and set keyboard."""
         return self.module.detect_and_set_adb_keyboard(device_id)
 
+    @traced("device.restore_keyboard")
     def restore_keyboard(self, ime: str, device_id: str | None = None):
         """Restore keyboard."""
         return self.module.restore_keyboard(ime, device_id)
@@ -129,6 +260,40 @@ class DeviceFactory:
         """List connected devices."""
         return self.module.list_devices()
 
+    def get_lease_key(self, device_id: str | None = None) -> str | None:
+        """
+        Get the key a task leases the device under (see phone_agent.lease).
+
+        Different callers name the same phone differently: the web server
+        passes "ip:port", the accessibility executor a bare IP, and CLI users
+        often nothing at all. The key names the phone itself, so all of them
+        wait for each other: a network device is keyed by its IP (whatever
+        port or backend reaches it) and an omitted device ID resolves to the
+        serial of the only connected device.
+
+        Returns:
+            The lease key, or None if the default device cannot be resolved
+            (no device or several connected).
+        """
+        if self.device_type == DeviceType.ACCESSIBILITY:
+            from phone_agent.accessibility.client import parse_device_ip
+
+            return parse_device_ip(device_id)
+
+        if device_id is None and self.device_type in (DeviceType.ADB, DeviceType.HDC):
+            try:
+                devices = [d for d in self.list_devices() if d.status == "device"]
+            except Exception:
+                devices = []
+            if len(devices) != 1:
+                return None
+            device_id = devices[0].device_id
+
+        if device_id is None:
+            return None
+        match = _NETWORK_SERIAL.match(device_id)
+        return match.group("host") if match else device_id
+
     def get_connection_class(self):
         """Get the connection class (ADBConnection or HDCConnection)."""
         if self.device_type == DeviceType.ADB:
@@ -156,11 +321,26 @@ def set_device_type(device_type: DeviceType):
     """
     Set the global device type.
 
+    The screenshot provider of the previous factory, if any, is kept.
+
     Args:
         device_type: The device type to use (ADB or HDC).
     """
     global _device_factory
+    provider = _device_factory.screenshot_provider if _device_factory else None
     _device_factory = DeviceFactory(device_type)
+    _device_factory.screenshot_provider = provider
+
+
+def set_screenshot_provider(provider: "FrameSource | None"):
+    """
+    Serve screenshots from a live mirroring stream when its frames are fresh.
+
+    Args:
+        provider: Frame source fed by the mirroring client, or None to always
+            capture screenshots from the device.
+    """
+    get_device_factory().screenshot_provider = provider
 
 
 def get_device_factory() -> DeviceFactory:
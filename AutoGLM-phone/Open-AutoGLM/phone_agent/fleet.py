@@ -0,0 +1,328 @@
+"""Run tasks on a fleet of devices, one agent per device, from a shared queue."""
+
+import argparse
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable
+
+from phone_agent.agent import AgentConfig, PhoneAgent
+from phone_agent.device_factory import DeviceFactory, DeviceType
+from phone_agent.model import ModelConfig
+
+
+@dataclass
+class FleetDevice:
+    """
+    One device of the fleet.
+
+    Attributes:
+        device_id: Device ID (ADB serial, HDC connect key or accessibility
+            address).
+        device_type: Backend driving the device.
+    """
+
+    device_id: str
+    device_type: DeviceType = DeviceType.ADB
+
+    @classmethod
+    def parse(cls, spec: str) -> "FleetDevice":
+        """
+        Parse a device spec of the form "[type:]device_id".
+
+        Example:
+            >>> FleetDevice.parse("hdc:FMR0").device_type
+            <DeviceType.HDC: 'hdc'>
+        """
+        device_type, sep, device_id = spec.partition(":")
+        types = {t.value: t for t in DeviceType if t != DeviceType.IOS}
+        if sep and device_type in types:
+            return cls(device_id, types[device_type])
+        return cls(spec)
+
+
+@dataclass
+class FleetTaskResult:
+    """Outcome of one task run by the fleet."""
+
+    task: str
+    device_id: str
+    message: str | None
+    steps: int
+    duration: float
+    error: str | None = None
+
+
+@dataclass
+class DeviceStats:
+    """Work done by one device of the fleet."""
+
+    device_id: str
+    device_type: DeviceType
+    tasks: int = 0
+    failures: int = 0
+    steps: int = 0
+    busy_seconds: float = 0.0
+
+
+class FleetRunner:
+    """
+    Drive many devices concurrently from one process.
+
+    Each device gets its own DeviceFactory and PhoneAgent, so ADB, HDC and
+    accessibility devices can be mixed freely. Worker threads (one per device)
+    pull tasks from a shared queue until the fleet is stopped.
+
+    Args:
+        devices: Devices of the fleet.
+        model_config: Model configuration shared by all agents.
+        agent_config: Agent configuration template; device_id is set per device.
+        confirmation_callback: Optional callback for sensitive action confirmation.
+        takeover_callback: Optional callback for takeover requests.
+
+    Example:
+        >>> runner = FleetRunner(
+        ...     [FleetDevice("emulator-5554"), FleetDevice("FMR0", DeviceType.HDC)],
+        ...     ModelConfig(base_url="http://localhost:8000/v1"),
+        ... )
+        >>> results = runner.run(["打开微信", "打开设置", "打开淘宝"])
+        >>> runner.print_report()
+    """
+
+    def __init__(
+        self,
+        devices: list[FleetDevice],
+        model_config: ModelConfig | None = None,
+        agent_config: AgentConfig | None = None,
+        confirmation_callback: Callable[[str], bool] | None = None,
+        takeover_callback: Callable[[str], None] | None = None,
+    ):
+        if not devices:
+            raise ValueError("A fleet needs at least one device")
+        ids = [device.device_id for device in devices]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Duplicate device IDs in fleet: {ids}")
+
+        self.devices = devices
+        self.model_config = model_config or ModelConfig()
+        self.agent_config = agent_config or AgentConfig()
+        self.confirmation_callback = confirmation_callback
+        self.takeover_callback = takeover_callback
+
+        self.results: list[FleetTaskResult] = []
+        self._stats = {
+            device.device_id: DeviceStats(device.device_id, device.device_type)
+            for device in devices
+        }
+        self._tasks: queue.Queue[str | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._started_at: float | None = None
+        self._stopped_at: float | None = None
+
+    def create_agent(self, device: FleetDevice) -> PhoneAgent:
+        """Create the agent of a device, with its own device factory."""
+        agent = PhoneAgent(
+            model_config=self.model_config,
+            agent_config=replace(self.agent_config, device_id=device.device_id),
+            confirmation_callback=self.confirmation_callback,
+            takeover_callback=self.takeover_callback,
+            device_factory=DeviceFactory(device.device_type),
+        )
+        if not self.agent_config.verbose:
+            # Interleaved streams from many devices are unreadable
+            agent.model_client.stream_callback = lambda event, text: None
+        return agent
+
+    def start(self) -> None:
+        """Start one worker thread per device."""
+        if self._threads:
+            raise RuntimeError("Fleet is already running")
+        self._started_at = time.perf_counter()
+        self._stopped_at = None
+        for device in self.devices:
+            thread = threading.Thread(
+                target=self._worker,
+                args=(device,),
+                name=f"fleet-{device.device_id}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, task: str) -> None:
+        """Queue a task for the next free device."""
+        self._tasks.put(task)
+
+    def stop(self) -> None:
+        """Wait for the queued tasks to finish, then stop the workers."""
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._stopped_at = time.perf_counter()
+
+    def run(self, tasks: list[str]) -> list[FleetTaskResult]:
+        """
+        Run tasks on the fleet and wait for all of them.
+
+        Args:
+            tasks: Natural language task descriptions.
+
+        Returns:
+            Results of this run, in completion order.
+        """
+        first = len(self.results)
+        self.start()
+        for task in tasks:
+            self.submit(task)
+        self.stop()
+        return self.results[first:]
+
+    def get_stats(self) -> list[DeviceStats]:
+        """Get the work done by each device so far."""
+        with self._lock:
+            return [replace(stats) for stats in self._stats.values()]
+
+    def elapsed(self) -> float:
+        """Wall time the fleet has been running, in seconds."""
+        if self._started_at is None:
+            return 0.0
+        end = self._stopped_at or time.perf_counter()
+        return end - self._started_at
+
+    def print_report(self) -> None:
+        """Print per-device throughput."""
+        elapsed = max(self.elapsed(), 1e-9)
+        print(
+            f"{'device':<24}{'type':<15}{'tasks':>6}{'failed':>7}{'steps':>7}"
+            f"{'tasks/min':>11}{'steps/s':>9}{'busy':>7}"
+        )
+        print("-" * 86)
+        for stats in self.get_stats():
+            print(
+                f"{stats.device_id:<24}{stats.device_type.value:<15}"
+                f"{stats.tasks:>6}{stats.failures:>7}{stats.steps:>7}"
+                f"{stats.tasks / elapsed * 60:>11.2f}"
+                f"{stats.steps / elapsed:>9.2f}"
+                f"{stats.busy_seconds / elapsed:>7.0%}"
+            )
+        print(f"\nWall time: {elapsed:.1f}s")
+
+    def _worker(self, device: FleetDevice) -> None:
+        """Run queued tasks on one device until a stop sentinel arrives."""
+        agent = self.create_agent(device)
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+
+            start = time.perf_counter()
+            message, error = None, None
+            try:
+                message = agent.run(task)
+            except Exception as e:
+                error = str(e)
+                print(f"Task failed on {device.device_id}: {e}")
+            duration = time.perf_counter() - start
+
+            result = FleetTaskResult(
+                task=task,
+                device_id=device.device_id,
+                message=message,
+                steps=agent.step_count,
+                duration=duration,
+                error=error,
+            )
+            with self._lock:
+                self.results.append(result)
+                stats = self._stats[device.device_id]
+                stats.tasks += 1
+                stats.failures += error is not None
+                stats.steps += agent.step_count
+                stats.busy_seconds += duration
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run tasks on several devices at once",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python -m phone_agent.fleet --device emulator-5554 --device hdc:FMR0 \\
+      --task "打开微信" --task "打开设置"
+  python -m phone_agent.fleet --device adb:R5CT1 \\
+      --device accessibility:192.168.1.20:8080 --tasks-file tasks.txt
+
+Device specs are "[type:]device_id" with type adb (default), hdc,
+accessibility or simulated. A tasks file has one task per line.
+        """,
+    )
+    parser.add_argument(
+        "--device",
+        action="append",
+        required=True,
+        help="Device spec, repeat for each device",
+    )
+    parser.add_argument("--task", action="append", default=[], help="Task to run")
+    parser.add_argument("--tasks-file", help="File with one task per line")
+    parser.add_argument(
+        "--base-url",
+        default=os.getenv("PHONE_AGENT_BASE_URL", "http://localhost:8000/v1"),
+        help="Model API base URL",
+    )
+    parser.add_argument(
+        "--model",
+        default=os.getenv("PHONE_AGENT_MODEL", "autoglm-phone-9b"),
+        help="Model name",
+    )
+    parser.add_argument(
+        "--apikey", default=os.getenv("PHONE_AGENT_API_KEY", "EMPTY"), help="API key"
+    )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=int(os.getenv("PHONE_AGENT_MAX_STEPS", "100")),
+        help="Maximum steps per task",
+    )
+    parser.add_argument(
+        "--lang",
+        choices=["cn", "en"],
+        default=os.getenv("PHONE_AGENT_LANG", "cn"),
+        help="Language for system prompt",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Print each agent's steps"
+    )
+    args = parser.parse_args()
+
+    tasks = list(args.task)
+    if args.tasks_file:
+        with open(args.tasks_file, encoding="utf-8") as f:
+            tasks.extend(line.strip() for line in f if line.strip())
+    if not tasks:
+        parser.error("no tasks given (use --task or --tasks-file)")
+
+    runner = FleetRunner(
+        [FleetDevice.parse(spec) for spec in args.device],
+        ModelConfig(
+            base_url=args.base_url,
+            model_name=args.model,
+            api_key=args.apikey,
+            lang=args.lang,
+        ),
+        AgentConfig(max_steps=args.max_steps, lang=args.lang, verbose=args.verbose),
+    )
+    for result in runner.run(tasks):
+        outcome = result.error or result.message
+        print(f"[{result.device_id}] {result.task}: {outcome}")
+    print()
+    runner.print_report()
+
+
+if __name__ == "__main__":
+    main()
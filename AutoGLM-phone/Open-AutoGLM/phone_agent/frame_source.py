@@ -0,0 +1,136 @@
+"""Serve agent screenshots from an already running screen-mirroring stream."""
+
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from phone_agent.screenshot import Screenshot
+
+
+class FrameSource:
+    """
+    Screenshot provider backed by decoded video frames (e.g. scrcpy).
+
+    The mirroring client pushes every decoded frame into `push_frame()`; the
+    device factory asks `get_screenshot()` before falling back to a device
+    capture. Frames are only kept by reference when they arrive; conversion to
+    a `Screenshot` happens once per request.
+
+    A frame is considered fresh when it was received at least `min_frame_lag`
+    seconds after the last action was issued, so the agent never sees the
+    screen from before its own tap. Mirroring streams only send frames when the
+    screen changes, so if no fresh frame arrives within `max_wait` the caller
+    falls back to a regular screenshot.
+
+    Args:
+        device_id: Device the stream belongs to. If None, serves any device.
+        device_size: Real screen size (width, height) in pixels. Actions map the
+            model's relative coordinates onto the screenshot size, and streams
+            are often downscaled (e.g. scrcpy `max_width`). If None, no frames
+            are served until the size is learned from a device screenshot.
+        bgr: Whether pushed frames are BGR (scrcpy/OpenCV) rather than RGB.
+        min_frame_lag: Seconds after an action before a frame counts as fresh.
+        max_wait: Seconds to wait for a fresh frame before giving up.
+    """
+
+    def __init__(
+        self,
+        device_id: str | None = None,
+        device_size: tuple[int, int] | None = None,
+        bgr: bool = True,
+        min_frame_lag: float = 0.1,
+        max_wait: float = 0.3,
+    ):
+        self.device_id = device_id
+        self.device_size = device_size
+        self.bgr = bgr
+        self.min_frame_lag = min_frame_lag
+        self.max_wait = max_wait
+        self._condition = threading.Condition()
+        self._frame: np.ndarray | None = None
+        self._frame_time = 0.0
+        self._last_action_time = 0.0
+
+    def serves(self, device_id: str | None) -> bool:
+        """Whether this source mirrors the given device."""
+        return (
+            self.device_id is None or device_id is None or device_id == self.device_id
+        )
+
+    def push_frame(self, frame: np.ndarray | None) -> None:
+        """
+        Store the newest decoded frame. Can be used directly as a frame listener.
+
+        Args:
+            frame: Decoded frame as an HxWx3 uint8 array. None is ignored.
+        """
+        if frame is None:
+            return
+        with self._condition:
+            self._frame = frame
+            self._frame_time = time.monotonic()
+            self._condition.notify_all()
+
+    def mark_action(self) -> None:
+        """Record that an action was just sent, invalidating older frames."""
+        with self._condition:
+            self._last_action_time = time.monotonic()
+
+    def reset(self) -> None:
+        """Drop the current frame, e.g. when the mirroring stream stops."""
+        with self._condition:
+            self._frame = None
+            self._frame_time = 0.0
+
+    def get_latest_image(self) -> Image.Image | None:
+        """
+        Get the newest frame as an image, without waiting for a fresh one.
+
+        Used to poll for screen changes: the stream only sends frames when the
+        screen changes, so the newest frame is the current screen.
+
+        Returns:
+            The newest frame (at stream resolution), or None if there is none.
+        """
+        with self._condition:
+            frame = self._frame
+        if frame is None:
+            return None
+        if self.bgr:
+            frame = frame[:, :, ::-1]
+        return Image.fromarray(np.ascontiguousarray(frame))
+
+    def get_screenshot(self) -> Screenshot | None:
+        """
+        Get a screenshot from the newest fresh frame.
+
+        Returns:
+            Screenshot of the newest frame, or None if no fresh frame arrived in
+            time and the caller should capture from the device instead.
+        """
+        if self.device_size is None:
+            return None
+
+        with self._condition:
+            not_before = self._last_action_time + self.min_frame_lag
+            deadline = time.monotonic() + self.max_wait
+            while self._frame is None or self._frame_time < not_before:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            frame = self._frame
+
+        if self.bgr:
+            frame = frame[:, :, ::-1]
+        image = Image.fromarray(np.ascontiguousarray(frame))
+
+        # Report the device size in the frame's orientation
+        long_edge, short_edge = max(self.device_size), min(self.device_size)
+        if image.width >= image.height:
+            width, height = long_edge, short_edge
+        else:
+            width, height = short_edge, long_edge
+        return Screenshot.from_image(image, width=width, height=height)
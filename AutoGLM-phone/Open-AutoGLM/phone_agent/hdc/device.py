@@ -1,47 +1,76 @@
 """Device control utilities for HarmonyOS automation."""
 
 import os
+import re
 import subprocess
-import time
 from typing import List, Optional, Tuple
 
-from phone_agent.config.apps_harmonyos import APP_ABILITIES, APP_PACKAGES
+from phone_agent.config.apps_harmonyos import (
+    APP_ABILITIES,
+    APP_PACKAGES,
+    PACKAGE_APP_NAMES,
+)
 from phone_agent.config.timing import TIMING_CONFIG
 from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.tracing import traced_sleep
+
+FOCUS_QUERY = "hidumper -s WindowManagerService -a -a | grep -iE 'focused|current'"
+_BUNDLE_PATTERN = re.compile(r"[A-Za-z][\w]*(?:\.[\w]+)+")
 
 
 def get_current_app(device_id: str | None = None) -> str:
     """
     Get the currently focused app name.
 
+    Only the focus lines of the window manager dump are fetched (filtered on
+    the device), and the first recognized bundle wins.
+
     Args:
         device_id: Optional HDC device ID for multi-device setups.
 
     Returns:
-        The app name if recognized, otherwise "System Home".
+        The app name if recognized, otherwise "System Home" (also when no
+        focus line matched).
+
+    Raises:
+        ValueError: If the query itself failed.
     """
     hdc_prefix = _get_hdc_prefix(device_id)
 
     result = _run_hdc_command(
-        hdc_prefix + ["shell", "hidumper", "-s", "WindowManagerService", "-a", "-a"],
+        hdc_prefix + ["shell", FOCUS_QUERY],
         capture_output=True,
         text=True,
         encoding="utf-8"
     )
     output = result.stdout
-    if not output:
-        raise ValueError("No output from hidumper")
+    # grep exits 1 when nothing matched; anything else is a failed query
+    if result.returncode > 1 or (not output and result.stderr.strip()):
+        raise ValueError(f"hidumper query failed: {result.stderr.strip()}")
 
     # Parse window focus info
     for line in output.split("\n"):
         if "focused" in line.lower() or "current" in line.lower():
-            for app_name, package in APP_PACKAGES.items():
-                if package in line:
-                    return app_name
+            app_name = _match_app_name(line)
+            if app_name:
+                return app_name
 
     return "System Home"
 
 
+def _match_app_name(line: str) -> str | None:
+    """Find the app of a focus line: exact bundle lookup, then substring scan."""
+    for bundle in _BUNDLE_PATTERN.findall(line):
+        app_name = PACKAGE_APP_NAMES.get(bundle)
+        if app_name:
+            return app_name
+
+    for app_name, package in APP_PACKAGES.items():
+        if package in line:
+            return app_name
+    return None
+
+
 def tap(
     x: int, y: int, device_id: str | None = None, delay: float | None = None
 ) -> None:
@@ -64,7 +93,7 @@ def tap(
         hdc_prefix + ["shell", "uitest", "uiInput", "click", str(x), str(y)],
         capture_output=True
     )
-    time.sleep(delay)
+    traced_sleep(delay)
 
 
 def double_tap(
@@ -89,7 +118,7 @@ def double_tap(
         hdc_prefix + ["shell", "uitest", "uiInput", "doubleClick", str(x), str(y)],
         capture_output=True
     )
-    time.sleep(delay)
+    traced_sleep(delay)
 
 
 def long_press(
@@ -120,7 +149,7 @@ def long_press(
         hdc_prefix + ["shell", "uitest", "uiInput", "longClick", str(x), str(y)],
         capture_output=True,
     )
-    time.sleep(delay)
+    traced_sleep(delay)
 
 
 def swipe(
@@ -172,7 +201,7 @@ def swipe(
         ],
         capture_output=True,
     )
-    time.sleep(delay)
+    traced_sleep(delay)
 
 
 def back(device_id: str | None = None, delay: float | None = None) -> None:
@@ -193,7 +222,7 @@ def back(device_id: str | None = None, delay: float | None = None) -> None:
         hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Back"],
         capture_output=True
     )
-    time.sleep(delay)
+    traced_sleep(delay)
 
 
 def home(device_id: str | None = None, delay: float | None = None) -> None:
@@ -214,7 +243,7 @@ def home(device_id: str | None = None, delay: float | None = None) -> None:
         hdc_prefix + ["shell", "uitest", "uiInput", "keyEvent", "Home"],
         capture_output=True
     )
-    time.sleep(delay)
+    traced_sleep(delay)
 
 
 def launch_app(
@@ -261,7 +290,7 @@ def launch_app(
         ],
         capture_output=True,
     )
-    time.sleep(delay)
+    traced_sleep(delay)
     return True
 
 
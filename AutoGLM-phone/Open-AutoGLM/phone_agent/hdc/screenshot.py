@@ -1,26 +1,19 @@
 """Screenshot utilities for capturing HarmonyOS device screen."""
 
-import base64
 import os
 import subprocess
 import tempfile
 import uuid
-from dataclasses import dataclass
-from io import BytesIO
-from typing import Tuple
 
-from PIL import Image
 from phone_agent.hdc.connection import _run_hdc_command
+from phone_agent.screenshot import (
+    RemoteCaptureFiles,
+    Screenshot,
+    create_fallback_screenshot,
+)
 
-
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
-
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
+# On-device files of captures (HDC only writes JPEG screenshots)
+_REMOTE_FILES = RemoteCaptureFiles("/data/local/tmp", ".jpeg")
 
 
 def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
@@ -44,11 +37,15 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
     try:
         # Execute screenshot command
         # HarmonyOS HDC only supports JPEG format
-        remote_path = "/data/local/tmp/tmp_screenshot.jpeg"
+        # Unique per capture, so concurrent captures never read each other's file
+        remote_path = _REMOTE_FILES.new_path()
+        command = _REMOTE_FILES.capture_command(
+            device_id, f"screenshot {remote_path}"
+        )
 
         # Try method 1: hdc shell screenshot (newer HarmonyOS versions)
         result = _run_hdc_command(
-            hdc_prefix + ["shell", "screenshot", remote_path],
+            hdc_prefix + ["shell", command],
             capture_output=True,
             text=True,
             timeout=timeout,
@@ -76,25 +73,20 @@ def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screensho
             text=True,
             timeout=5,
         )
+        _REMOTE_FILES.mark_pulled(device_id, remote_path)
 
         if not os.path.exists(temp_path):
             return _create_fallback_screenshot(is_sensitive=False)
 
-        # Read JPEG image and convert to PNG for model inference
-        # PIL automatically detects the image format from file content
-        img = Image.open(temp_path)
-        width, height = img.size
-
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        # Keep the JPEG as-is; the model accepts it directly, so there is no
+        # need to convert it to PNG
+        with open(temp_path, "rb") as f:
+            screenshot = Screenshot.from_bytes(f.read())
 
         # Cleanup
         os.remove(temp_path)
 
-        return Screenshot(
-            base64_data=base64_data, width=width, height=height, is_sensitive=False
-        )
+        return screenshot
 
     except Exception as e:
         print(f"Screenshot error: {e}")
@@ -110,16 +102,4 @@ def _get_hdc_prefix(device_id: str | None) -> list:
 
 def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
     """Create a black fallback image when screenshot fails."""
-    default_width, default_height = 1080, 2400
-
-    black_img = Image.new("RGB", (default_width, default_height), color="black")
-    buffered = BytesIO()
-    black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-    return Screenshot(
-        base64_data=base64_data,
-        width=default_width,
-        height=default_height,
-        is_sensitive=is_sensitive,
-    )
+    return create_fallback_screenshot(is_sensitive, width=1080, height=2400)
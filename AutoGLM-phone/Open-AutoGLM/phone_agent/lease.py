@@ -0,0 +1,349 @@
+"""Cross-process device leases, so only one task drives a phone at a time.
+
+The web server, `main.py` and the desktop executor may all try to drive the
+same phone. Every `PhoneAgent.run` leases its device for the duration of the
+task; other tasks for the same device, in this or any other process on the
+host, wait in a first-come first-served queue. Leases live in a SQLite
+database (PHONE_AGENT_LEASE_PATH) and are kept alive by a heartbeat thread;
+a lease whose holder stops heartbeating (e.g. a crashed process) expires
+after PHONE_AGENT_LEASE_TTL seconds, and a task whose lease was lost stops
+before its next step. Set PHONE_AGENT_LEASE=0 to disable.
+
+Callers lease a phone under the key DeviceFactory.get_lease_key gives, so
+"ip:port", a bare IP and an omitted device ID all name the same phone.
+"""
+
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from phone_agent.tracing import get_tracer
+
+LEASES_ENABLED = os.getenv("PHONE_AGENT_LEASE", "true").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+LEASE_PATH = os.getenv(
+    "PHONE_AGENT_LEASE_PATH",
+    os.path.join(tempfile.gettempdir(), "phone_agent_leases.db"),
+)
+LEASE_TTL = float(os.getenv("PHONE_AGENT_LEASE_TTL", "30"))
+# Longest a task waits for its device before giving up (seconds)
+LEASE_WAIT = float(os.getenv("PHONE_AGENT_LEASE_WAIT", "600"))
+
+# Key of tasks that do not name a device (the backend picks the only one)
+DEFAULT_DEVICE_KEY = "default"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    device_id TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    holder TEXT NOT NULL,
+    acquired_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS waiters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    device_id TEXT NOT NULL,
+    token TEXT NOT NULL UNIQUE,
+    holder TEXT NOT NULL,
+    heartbeat_at REAL NOT NULL
+);
+"""
+
+
+class LeaseTimeoutError(TimeoutError):
+    """Raised when a device could not be leased in time."""
+
+
+class LeaseLostError(RuntimeError):
+    """Raised when a task's device lease expired or was taken over."""
+
+
+class Lease:
+    """
+    A held device lease, renewed by a heartbeat thread until released.
+
+    Use it as a context manager, or call `release()` when the task is done.
+
+    Attributes:
+        device_id: Leased device.
+        token: Unique token of this lease.
+        holder: Human-readable description of the holder.
+        lost: True if the lease expired or was taken over while held.
+    """
+
+    def __init__(
+        self, manager: "LeaseManager", device_id: str, token: str, holder: str
+    ):
+        self.manager = manager
+        self.device_id = device_id
+        self.token = token
+        self.holder = holder
+        self.lost = False
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(
+            target=self._heartbeat_loop, name=f"lease-{device_id}", daemon=True
+        )
+        self._heartbeat.start()
+
+    def renew(self) -> bool:
+        """Extend the lease by the TTL; returns False if it is no longer held."""
+        with self.manager._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE device_id = ? AND token = ?",
+                (time.time() + self.manager.ttl, self.device_id, self.token),
+            )
+            return cursor.rowcount == 1
+
+    def check(self) -> None:
+        """
+        Make sure the lease is still held before driving the device.
+
+        Raises:
+            LeaseLostError: If the lease expired or was taken over.
+        """
+        if self.lost:
+            raise LeaseLostError(
+                f"Lease on device {self.device_id} was lost; another task may "
+                "be driving it"
+            )
+
+    def release(self) -> None:
+        """Give the device back to the next waiting task."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._heartbeat is not threading.current_thread():
+            self._heartbeat.join()
+        with self.manager._transaction() as conn:
+            conn.execute(
+                "DELETE FROM leases WHERE device_id = ? AND token = ?",
+                (self.device_id, self.token),
+            )
+
+    def _heartbeat_loop(self) -> None:
+        """Renew the lease every third of its TTL."""
+        while not self._stop.wait(self.manager.ttl / 3):
+            try:
+                renewed = self.renew()
+            except sqlite3.Error as e:
+                print(f"Lease heartbeat error for {self.device_id}: {e}")
+                continue
+            if not renewed:
+                self.lost = True
+                print(f"Warning: lease on device {self.device_id} was lost")
+                return
+
+    def __enter__(self) -> "Lease":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class LeaseManager:
+    """
+    SQLite-backed device leases shared by all processes using the same file.
+
+    Args:
+        path: SQLite database file.
+        ttl: Seconds a lease (or queued waiter) survives without a heartbeat.
+        poll_interval: Seconds between checks while waiting for a device.
+    """
+
+    def __init__(
+        self,
+        path: str = LEASE_PATH,
+        ttl: float = LEASE_TTL,
+        poll_interval: float = 0.2,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def acquire(
+        self,
+        device_id: str | None,
+        holder: str | None = None,
+        timeout: float | None = LEASE_WAIT,
+    ) -> Lease:
+        """
+        Lease a device, waiting in line behind earlier requests for it.
+
+        Args:
+            device_id: Device to lease (None for the default device).
+            holder: Description of the holder, shown to waiting tasks.
+            timeout: Maximum seconds to wait, or None to wait forever.
+
+        Returns:
+            The held Lease.
+
+        Raises:
+            LeaseTimeoutError: If the device was not free within the timeout.
+        """
+        device_id = device_id or DEFAULT_DEVICE_KEY
+        holder = holder or _default_holder()
+        token = uuid.uuid4().hex
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO waiters (device_id, token, holder, heartbeat_at) "
+                "VALUES (?, ?, ?, ?)",
+                (device_id, token, holder, time.time()),
+            )
+
+        announced = False
+        try:
+            while True:
+                current = self._try_acquire(device_id, token, holder)
+                if current is None:
+                    return Lease(self, device_id, token, holder)
+                if not announced:
+                    print(f"Device {device_id} is busy ({current}), waiting...")
+                    announced = True
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise LeaseTimeoutError(
+                        f"Device {device_id} still leased by {current} "
+                        f"after {timeout:g}s"
+                    )
+                time.sleep(self.poll_interval)
+        except BaseException:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM waiters WHERE token = ?", (token,))
+            raise
+
+    def get_lease(self, device_id: str | None) -> dict[str, Any] | None:
+        """Get the live lease of a device, if any."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT holder, acquired_at, expires_at FROM leases "
+                "WHERE device_id = ? AND expires_at > ?",
+                (device_id or DEFAULT_DEVICE_KEY, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"holder": row[0], "acquired_at": row[1], "expires_at": row[2]}
+
+    def _try_acquire(self, device_id: str, token: str, holder: str) -> str | None:
+        """
+        Take the lease if it is free and this waiter is first in line.
+
+        Returns:
+            None if the lease was taken, otherwise who holds or precedes it.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Forget expired leases and waiters whose process went away
+            conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM waiters WHERE heartbeat_at <= ? AND token != ?",
+                (now - self.ttl, token),
+            )
+            conn.execute(
+                "UPDATE waiters SET heartbeat_at = ? WHERE token = ?", (now, token)
+            )
+
+            row = conn.execute(
+                "SELECT holder FROM leases WHERE device_id = ?", (device_id,)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+
+            first = conn.execute(
+                "SELECT token, holder FROM waiters WHERE device_id = ? "
+                "ORDER BY id LIMIT 1",
+                (device_id,),
+            ).fetchone()
+            if first is not None and first[0] != token:
+                return f"queued: {first[1]}"
+
+            conn.execute("DELETE FROM waiters WHERE token = ?", (token,))
+            conn.execute(
+                "INSERT INTO leases "
+                "(device_id, token, holder, acquired_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (device_id, token, holder, now, now + self.ttl),
+            )
+            return None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction on a fresh connection."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+
+def _default_holder() -> str:
+    """Describe the calling thread, e.g. "host:1234:MainThread"."""
+    thread = threading.current_thread().name
+    return f"{socket.gethostname()}:{os.getpid()}:{thread}"
+
+
+_manager: LeaseManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_lease_manager() -> LeaseManager:
+    """Get the process-wide lease manager (opened on first use)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = LeaseManager()
+        return _manager
+
+
+@contextmanager
+def device_lease(
+    device_id: str | None, holder: str | None = None
+) -> Iterator[Lease | None]:
+    """
+    Hold the lease of a device for the duration of the block.
+
+    Does nothing when leases are disabled (PHONE_AGENT_LEASE=0).
+
+    Args:
+        device_id: Lease key of the device (see DeviceFactory.get_lease_key;
+            None for the default device).
+        holder: Description of the holder, shown to waiting tasks.
+
+    Yields:
+        The held Lease (call `check()` before each step), or None when leases
+        are disabled.
+    """
+    if not LEASES_ENABLED:
+        yield None
+        return
+
+    with get_tracer().span("device.lease"):
+        lease = get_lease_manager().acquire(device_id, holder)
+    with lease:
+        yield lease
@@ -1,5 +1,6 @@
 """Model client module for AI inference."""
 
 from phone_agent.model.client import ModelClient, ModelConfig
+from phone_agent.model.retry import CircuitOpenError, RetryPolicy
 
-__all__ = ["ModelClient", "ModelConfig"]
+__all__ = ["ModelClient", "ModelConfig", "RetryPolicy", "CircuitOpenError"]
@@ -1,13 +1,25 @@
 """Model client for AI inference using OpenAI-compatible API."""
 
+import itertools
 import json
+import queue
+import threading
 import time
 from dataclasses import dataclass, field
-from typing import Any
-
-from openai import OpenAI
+from typing import Any, Iterator
 
 from phone_agent.config.i18n import get_message
+from phone_agent.model.pool import Endpoint, EndpointPool
+from phone_agent.model.retry import RetryPolicy
+from phone_agent.model.stream import (
+    ACTION_MARKERS,
+    ActionCallTracker,
+    MarkerScanner,
+    StreamCallback,
+    print_stream_event,
+)
+from phone_agent.screenshot import Screenshot
+from phone_agent.tracing import get_tracer, traced, traced_sleep
 
 
 @dataclass
@@ -23,6 +35,25 @@ class ModelConfig:
     frequency_penalty: float = 0.2
     extra_body: dict[str, Any] = field(default_factory=dict)
     lang: str = "cn"  # Language for UI messages: 'cn' or 'en'
+    # Stop reading the stream as soon as the action call is complete
+    early_stop_action: bool = True
+    # More endpoints serving the same model; each request goes to the one
+    # with the lowest smoothed time to first token among the healthy ones
+    endpoints: list[str] = field(default_factory=list)
+    # Send a duplicate request to another endpoint when the first has not
+    # produced a token by its p95 time to first token; the first to answer wins
+    hedge_requests: bool = False
+    # Retries of transient errors (connection resets, 429, 5xx) with backoff
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+    # Consecutive transient failures after which an endpoint is not contacted
+    # for breaker_reset_timeout seconds
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+
+    @property
+    def base_urls(self) -> list[str]:
+        """All endpoints: base_url followed by the extra endpoints."""
+        return [self.base_url] + [url for url in self.endpoints if url != self.base_url]
 
 
 @dataclass
@@ -36,6 +67,17 @@ class ModelResponse:
     time_to_first_token: float | None = None  # Time to first token (seconds)
     time_to_thinking_end: float | None = None  # Time to thinking end (seconds)
     total_time: float | None = None  # Total inference time (seconds)
+    endpoint: str | None = None  # Base URL of the endpoint that answered
+
+
+@dataclass
+class _StreamAttempt:
+    """A chat completion stream opened on one endpoint."""
+
+    endpoint: Endpoint
+    stream: Any
+    chunks: Iterator[Any]
+    started: float
 
 
 class ModelClient:
@@ -44,16 +86,36 @@ class ModelClient:
 
     Args:
         config: Model configuration.
+        stream_callback: Optional callback receiving (event, text) while a
+            response streams in; see `StreamCallback`. Defaults to printing
+            the thinking text.
     """
 
-    def __init__(self, config: ModelConfig | None = None):
+    def __init__(
+        self,
+        config: ModelConfig | None = None,
+        stream_callback: StreamCallback | None = None,
+    ):
         self.config = config or ModelConfig()
-        self.client = OpenAI(base_url=self.config.base_url, api_key=self.config.api_key)
+        self.stream_callback = stream_callback or print_stream_event
+        self.pool = EndpointPool(
+            self.config.base_urls,
+            self.config.api_key,
+            breaker_failure_threshold=self.config.breaker_failure_threshold,
+            breaker_reset_timeout=self.config.breaker_reset_timeout,
+        )
+        # Client of the primary endpoint
+        self.client = self.pool.endpoints[0].client
 
+    @traced("model.request")
     def request(self, messages: list[dict[str, Any]]) -> ModelResponse:
         """
         Send a request to the model.
 
+        Transient errors are retried with the same messages according to the
+        config's retry policy, so the caller's context and screenshot are
+        reused rather than captured again.
+
         Args:
             messages: List of message dictionaries in OpenAI format.
 
@@ -62,86 +124,105 @@ class ModelClient:
 
         Raises:
             ValueError: If the response cannot be parsed.
+            CircuitOpenError: If every endpoint is failing; raised at once.
         """
+        policy = self.config.retry_policy
+        retry = 0
+        while True:
+            try:
+                return self._request_once(messages)
+            except Exception as e:
+                if not policy.should_retry(e, retry):
+                    raise
+                delay = policy.get_delay(e, retry)
+                retry += 1
+                print(
+                    f"\nModel request failed ({type(e).__name__}: {e}), "
+                    f"retry {retry}/{policy.max_retries} in {delay:.1f}s"
+                )
+                get_tracer().annotate(retries=retry)
+                traced_sleep(delay, "model.retry_backoff")
+
+    def _request_once(self, messages: list[dict[str, Any]]) -> ModelResponse:
+        """Stream one response from the model."""
         # Start timing
         start_time = time.time()
         time_to_first_token = None
         time_to_thinking_end = None
 
-        stream = self.client.chat.completions.create(
-            messages=messages,
-            model=self.config.model_name,
-            max_tokens=self.config.max_tokens,
-            temperature=self.config.temperature,
-            top_p=self.config.top_p,
-            frequency_penalty=self.config.frequency_penalty,
-            extra_body=self.config.extra_body,
-            stream=True,
-        )
+        attempt = self._open_stream(messages)
+        endpoint_ttft = None
 
         raw_content = ""
-        buffer = ""  # Buffer to hold content that might be part of a marker
-        action_markers = ["finish(message=", "do(action="]
+        scanner = MarkerScanner(ACTION_MARKERS)
         in_action_phase = False  # Track if we've entered the action phase
         first_token_received = False
+        action_start = 0  # Offset of the action marker in raw_content
+        action_end = None  # Length of the complete action call, once known
+        tracker = ActionCallTracker() if self.config.early_stop_action else None
 
-        for chunk in stream:
-            if len(chunk.choices) == 0:
-                continue
-            if chunk.choices[0].delta.content is not None:
+        try:
+            for chunk in attempt.chunks:
+                if len(chunk.choices) == 0:
+                    continue
                 content = chunk.choices[0].delta.content
+                if content is None:
+                    continue
                 raw_content += content
 
                 # Record time to first token
                 if not first_token_received:
                     time_to_first_token = time.time() - start_time
+                    endpoint_ttft = time.time() - attempt.started
                     first_token_received = True
 
-                if in_action_phase:
-                    # Already in action phase, just accumulate content without printing
-                    continue
-
-                buffer += content
-
-                # Check if any marker is fully present in buffer
-                marker_found = False
-                for marker in action_markers:
-                    if marker in buffer:
-                        # Marker found, print everything before it
-                        thinking_part = buffer.split(marker, 1)[0]
-                        print(thinking_part, end="", flush=True)
-                        print()  # Print newline after thinking is complete
-                        in_action_phase = True
-                        marker_found = True
-
-                        # Record time to thinking end
-                        if time_to_thinking_end is None:
-                            time_to_thinking_end = time.time() - start_time
-
-                        break
-
-                if marker_found:
-                    continue  # Continue to collect remaining content
-
-                # Check if buffer ends with a prefix of any marker
-                # If so, don't print yet (wait for more content)
-                is_potential_marker = False
-                for marker in action_markers:
-                    for i in range(1, len(marker)):
-                        if buffer.endswith(marker[:i]):
-                            is_potential_marker = True
-                            break
-                    if is_potential_marker:
-                        break
-
-                if not is_potential_marker:
-                    # Safe to print the buffer
-                    print(buffer, end="", flush=True)
-                    buffer = ""
+                if not in_action_phase:
+                    thinking_part, marker, rest = scanner.feed(content)
+                    if thinking_part:
+                        self.stream_callback("thinking", thinking_part)
+                    if marker is None:
+                        continue
+
+                    in_action_phase = True
+                    time_to_thinking_end = time.time() - start_time
+                    self.stream_callback("thinking_end", "")
+                    content = marker + rest
+                    action_start = len(raw_content) - len(content)
+
+                if tracker is not None:
+                    action_end = tracker.feed(content)
+                if action_end is not None:
+                    # The action is complete: drop the trailing tokens
+                    overshoot = len(raw_content) - (action_start + action_end)
+                    content = content[: len(content) - overshoot]
+                    raw_content = raw_content[: action_start + action_end]
+                self.stream_callback("action", content)
+                if action_end is not None:
+                    break
+        except Exception as e:
+            self.pool.record_failure(attempt.endpoint, e)
+            raise
+        self.pool.record_success(attempt.endpoint, endpoint_ttft)
+
+        if action_end is not None:
+            # Stop the server from generating the rest
+            attempt.stream.close()
+        elif not in_action_phase:
+            # No action marker: release any held-back partial match
+            tail = scanner.flush()
+            if tail:
+                self.stream_callback("thinking", tail)
 
         # Calculate total time
         total_time = time.time() - start_time
 
+        get_tracer().annotate(
+            time_to_first_token=time_to_first_token,
+            time_to_thinking_end=time_to_thinking_end,
+            early_stop=action_end is not None,
+            endpoint=attempt.endpoint.base_url,
+        )
+
         # Parse thinking and action from response
         thinking, action = self._parse_response(raw_content)
 
@@ -171,8 +252,106 @@ class ModelClient:
             time_to_first_token=time_to_first_token,
             time_to_thinking_end=time_to_thinking_end,
             total_time=total_time,
+            endpoint=attempt.endpoint.base_url,
         )
 
+    def _create_stream(self, endpoint: Endpoint, messages: list[dict[str, Any]]):
+        """Open a streaming chat completion on one endpoint."""
+        self.pool.begin(endpoint)
+        try:
+            return endpoint.client.chat.completions.create(
+                messages=messages,
+                model=self.config.model_name,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                top_p=self.config.top_p,
+                frequency_penalty=self.config.frequency_penalty,
+                extra_body=self.config.extra_body,
+                stream=True,
+            )
+        except Exception as e:
+            self.pool.record_failure(endpoint, e)
+            raise
+
+    def _open_stream(self, messages: list[dict[str, Any]]) -> _StreamAttempt:
+        """Open the response stream on the best endpoint, hedging if enabled."""
+        endpoint = self.pool.choose()
+        delay = self.pool.hedge_delay(endpoint) if self.config.hedge_requests else None
+        if delay is None:
+            started = time.time()
+            stream = self._create_stream(endpoint, messages)
+            return _StreamAttempt(endpoint, stream, iter(stream), started)
+        return self._open_hedged_stream(messages, endpoint, delay)
+
+    def _open_hedged_stream(
+        self, messages: list[dict[str, Any]], first: Endpoint, delay: float
+    ) -> _StreamAttempt:
+        """
+        Race the primary endpoint against a hedge started after `delay`.
+
+        Each attempt reads its stream up to the first token in a thread. The
+        first attempt to get there wins; a slower one closes its own stream
+        when its first token arrives, so the server stops generating.
+        """
+        results: queue.Queue = queue.Queue()
+        lock = threading.Lock()
+        winner: list[Endpoint] = []
+
+        def run_attempt(endpoint: Endpoint) -> None:
+            started = time.time()
+            try:
+                stream = self._create_stream(endpoint, messages)
+            except Exception as e:
+                results.put(e)
+                return
+            chunks = iter(stream)
+            received = []
+            try:
+                for chunk in chunks:
+                    received.append(chunk)
+                    if chunk.choices and chunk.choices[0].delta.content is not None:
+                        break
+            except Exception as e:
+                self.pool.record_failure(endpoint, e)
+                results.put(e)
+                return
+
+            with lock:
+                won = not winner
+                if won:
+                    winner.append(endpoint)
+            if won:
+                chunks = itertools.chain(received, chunks)
+                results.put(_StreamAttempt(endpoint, stream, chunks, started))
+            else:
+                stream.close()
+                self.pool.record_success(endpoint, time.time() - started)
+
+        def start(endpoint: Endpoint) -> None:
+            threading.Thread(target=run_attempt, args=(endpoint,), daemon=True).start()
+
+        start(first)
+        pending, hedged = 1, False
+        deadline = time.monotonic() + delay
+        while True:
+            timeout = None if hedged else max(0.0, deadline - time.monotonic())
+            try:
+                result = results.get(timeout=timeout)
+            except queue.Empty:
+                hedged = True
+                second = self.pool.choose(exclude=(first,))
+                if second is not None:
+                    get_tracer().annotate(hedged=True, hedge_endpoint=second.base_url)
+                    start(second)
+                    pending += 1
+                continue
+
+            pending -= 1
+            if isinstance(result, _StreamAttempt):
+                return result
+            if pending == 0 or not hedged:
+                raise result
+
     def _parse_response(self, content: str) -> tuple[str, str]:
         """
         Parse the model response into thinking and action parts.
@@ -226,25 +405,36 @@ class MessageBuilder:
 
     @staticmethod
     def create_user_message(
-        text: str, image_base64: str | None = None
+        text: str,
+        image_base64: str | None = None,
+        screenshot: Screenshot | None = None,
     ) -> dict[str, Any]:
         """
         Create a user message with optional image.
 
         Args:
             text: Text content.
-            image_base64: Optional base64-encoded image.
+            image_base64: Optional base64-encoded PNG image.
+            screenshot: Optional screenshot; its original bytes are base64-encoded
+                here (only once) with their real MIME type.
 
         Returns:
             Message dictionary.
         """
         content = []
 
-        if image_base64:
+        if screenshot is not None:
+            image_url = screenshot.data_url
+        elif image_base64:
+            image_url = f"data:image/png;base64,{image_base64}"
+        else:
+            image_url = None
+
+        if image_url:
             content.append(
                 {
                     "type": "image_url",
-                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
+                    "image_url": {"url": image_url},
                 }
             )
 
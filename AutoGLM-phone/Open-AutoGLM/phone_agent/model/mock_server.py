@@ -0,0 +1,464 @@
+"""Local OpenAI-compatible mock model server for end-to-end benchmarking.
+
+Serves `/v1/chat/completions` (streaming and non-streaming) and `/v1/models`
+with scripted outputs, a configurable time to first token and token rate,
+and optional injected errors, stalls and dropped streams. Point
+`ModelConfig.base_url` at it to measure the agent loop without a real model.
+`/v1/stats` reports requests, injected faults, aborted streams and tokens
+sent.
+
+Usage:
+    python -m phone_agent.model.mock_server --port 8765 --ttft 0.5 --tps 40
+    python -m phone_agent.model.mock_server --script script.json --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+DEFAULT_OUTPUT = '<think>模拟思考过程。</think><answer>finish(message="done")</answer>'
+
+_CURRENT_APP_PATTERN = re.compile(r'"current_app":\s*"([^"]*)"')
+
+# Summary of turns compressed into an action log (phone_agent.context), merged
+# into the first user message: its entries are numbered by step, and trimmed
+# entries are counted in an "omitted" line
+_PREVIOUS_STEPS_HEADER = "** Previous Steps **"
+_LOGGED_STEP_PATTERN = re.compile(r"^(\d+)\. ", re.MULTILINE)
+_OMITTED_STEPS_PATTERN = re.compile(r"^\((\d+) earlier steps omitted\)$", re.MULTILINE)
+
+
+@dataclass
+class ScriptRule:
+    """
+    Scripted output for requests matching a screen.
+
+    Attributes:
+        output: Response text, or a list of texts returned in turn.
+        app: Match the `current_app` of the last screen info.
+        text: Match a substring of the last user message text.
+        step: Match the step number (count of user messages, plus the steps
+            compressed into the action log of a token-budgeted context).
+    """
+
+    output: str | list[str]
+    app: str | None = None
+    text: str | None = None
+    step: int | None = None
+    _calls: int = field(default=0, repr=False)
+
+    def matches(self, app: str | None, text: str, step: int) -> bool:
+        """Whether the rule applies to a request."""
+        if self.app is not None and app != self.app:
+            return False
+        if self.text is not None and self.text not in text:
+            return False
+        return self.step is None or step == self.step
+
+    def next_output(self) -> str:
+        """Get the rule's output, cycling through lists."""
+        if isinstance(self.output, str):
+            return self.output
+        output = self.output[self._calls % len(self.output)]
+        self._calls += 1
+        return output
+
+
+@dataclass
+class MockBehavior:
+    """
+    Timing and fault injection of the mock server.
+
+    Attributes:
+        ttft: Seconds before the first token.
+        tokens_per_second: Token rate after the first token (0 = no delay).
+        chars_per_token: Characters per streamed token chunk.
+        error_rate: Probability of answering with `error_status` instead.
+        error_status: HTTP status of injected errors.
+        stall_rate: Probability of a stream pausing once mid-way.
+        stall_seconds: Length of such a pause.
+        drop_rate: Probability of closing a stream mid-way without [DONE].
+        seed: Optional seed making the injected faults reproducible.
+    """
+
+    ttft: float = 0.3
+    tokens_per_second: float = 50.0
+    chars_per_token: int = 3
+    error_rate: float = 0.0
+    error_status: int = 500
+    stall_rate: float = 0.0
+    stall_seconds: float = 5.0
+    drop_rate: float = 0.0
+    seed: int | None = None
+
+
+class MockModelServer:
+    """
+    Threaded HTTP server speaking the OpenAI chat-completions protocol.
+
+    Args:
+        host: Address to bind.
+        port: Port to bind (0 picks a free port).
+        rules: Scripted outputs, checked in order.
+        default_output: Output when no rule matches.
+        behavior: Timing and fault injection.
+
+    Example:
+        >>> server = MockModelServer(port=0).start()
+        >>> config = ModelConfig(base_url=server.base_url)
+        >>> server.stop()
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        rules: list[ScriptRule] | None = None,
+        default_output: str = DEFAULT_OUTPUT,
+        behavior: MockBehavior | None = None,
+    ):
+        self.rules = rules or []
+        self.default_output = default_output
+        self.behavior = behavior or MockBehavior()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "stalls": 0,
+            "drops": 0,
+            "aborted": 0,
+            "tokens_sent": 0,
+        }
+        self._rng = random.Random(self.behavior.seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """The `/v1` base URL to put in ModelConfig."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockModelServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="mock-model-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted."""
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def load_script(self, path: str) -> None:
+        """
+        Load scripted outputs from a JSON file.
+
+        Rules are checked in order; a list output is returned in turn.
+        Format:
+            {
+              "default": "<think>…</think><answer>finish(message=…)</answer>",
+              "rules": [
+                {"app": "System Home",
+                 "output": "<think>…</think><answer>do(action=…)</answer>"},
+                {"step": 3, "output": ["…", "…"]}
+              ]
+            }
+        """
+        with open(path, encoding="utf-8") as f:
+            script = json.load(f)
+        self.default_output = script.get("default", self.default_output)
+        self.rules = [ScriptRule(**rule) for rule in script.get("rules", [])]
+
+    def choose_output(self, messages: list[dict[str, Any]]) -> str:
+        """Pick the scripted output for a conversation."""
+        user_messages = [m for m in messages if m.get("role") == "user"]
+        text = _message_text(user_messages[-1]) if user_messages else ""
+        match = _CURRENT_APP_PATTERN.search(text)
+        app = match.group(1) if match else None
+        step = _step_number(user_messages)
+
+        with self._lock:
+            for rule in self.rules:
+                if rule.matches(app, text, step):
+                    return rule.next_output()
+        return self.default_output
+
+    def roll(self, probability: float) -> bool:
+        """Draw a fault with the given probability."""
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < probability
+
+    def get_stats(self) -> dict[str, int]:
+        """Get a copy of the request statistics."""
+        with self._lock:
+            return dict(self.stats)
+
+    def count(self, stat: str, amount: int = 1) -> None:
+        """Increase a statistics counter."""
+        with self._lock:
+            self.stats[stat] += amount
+
+
+def _step_number(user_messages: list[dict[str, Any]]) -> int:
+    """Get the step a conversation is at, counting compressed turns."""
+    if not user_messages:
+        return 0
+    step = len(user_messages)
+    first = _message_text(user_messages[0])
+    if _PREVIOUS_STEPS_HEADER in first:
+        summary = first.split(_PREVIOUS_STEPS_HEADER, 1)[1].split("\n\n", 1)[0]
+        logged = _LOGGED_STEP_PATTERN.findall(summary)
+        omitted = _OMITTED_STEPS_PATTERN.search(summary)
+        # Log entries keep their step number, so the last one counts all
+        # compressed steps, trimmed ones included
+        if logged:
+            step += int(logged[-1])
+        elif omitted:
+            step += int(omitted.group(1))
+    return step
+
+
+def _message_text(message: dict[str, Any]) -> str:
+    """Concatenate the text parts of a chat message."""
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part.get("text", "") for part in content or [] if part.get("type") == "text"
+    )
+
+
+def _make_handler(server: MockModelServer) -> type[BaseHTTPRequestHandler]:
+    """Create the request handler class bound to a server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def handle(self):
+            try:
+                super().handle()
+            except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+                # The client closed a kept-alive connection, e.g. after an
+                # early-stopped stream; socketserver would print a traceback
+                self.close_connection = True
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send_json(
+                    200, {"object": "list", "data": [{"id": "mock", "object": "model"}]}
+                )
+            elif self.path.rstrip("/").endswith("/stats"):
+                self._send_json(200, server.get_stats())
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            server.count("requests")
+            behavior = server.behavior
+            if server.roll(behavior.error_rate):
+                server.count("errors")
+                self._send_json(
+                    behavior.error_status,
+                    {"error": {"message": "injected error", "type": "mock_error"}},
+                )
+                return
+
+            output = server.choose_output(body.get("messages", []))
+            model = body.get("model", "mock")
+            time.sleep(behavior.ttft)
+            if body.get("stream"):
+                self._stream(output, model, behavior)
+            else:
+                self._complete(output, model)
+
+        def _complete(self, output: str, model: str) -> None:
+            tokens = len(_chunks(output, server.behavior.chars_per_token))
+            server.count("tokens_sent", tokens)
+            self._send_json(
+                200,
+                {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": output},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 0,
+                        "completion_tokens": tokens,
+                        "total_tokens": tokens,
+                    },
+                },
+            )
+
+        def _stream(self, output: str, model: str, behavior: MockBehavior) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            chunks = _chunks(output, behavior.chars_per_token)
+            stall_at = len(chunks) // 2 if server.roll(behavior.stall_rate) else -1
+            drop_at = len(chunks) // 2 if server.roll(behavior.drop_rate) else -1
+            interval = (
+                1.0 / behavior.tokens_per_second if behavior.tokens_per_second else 0
+            )
+            completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+            try:
+                for index, text in enumerate(chunks):
+                    if index == drop_at:
+                        server.count("drops")
+                        self.close_connection = True
+                        return
+                    if index == stall_at:
+                        server.count("stalls")
+                        time.sleep(behavior.stall_seconds)
+                    elif index and interval:
+                        time.sleep(interval)
+                    self._send_event(completion_id, model, {"content": text}, None)
+                    server.count("tokens_sent")
+                self._send_event(completion_id, model, {}, "stop")
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stopped reading, e.g. after a complete action
+                server.count("aborted")
+                self.close_connection = True
+
+        def _send_event(
+            self, completion_id: str, model: str, delta: dict, finish: str | None
+        ) -> None:
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            payload = json.dumps(event, ensure_ascii=False)
+            self._write_chunk(f"data: {payload}\n\n".encode("utf-8"))
+
+        def _write_chunk(self, data: bytes) -> None:
+            """Write one HTTP/1.1 chunk; empty data ends the body."""
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def _send_json(self, status: int, payload: dict) -> None:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    """Split text into token-sized chunks."""
+    size = max(1, size)
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Local OpenAI-compatible mock model server",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python -m phone_agent.model.mock_server
+  python -m phone_agent.model.mock_server --ttft 1.0 --tps 20 --script script.json
+  python -m phone_agent.model.mock_server --error-rate 0.1 --stall-rate 0.05
+        """,
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--script", help="JSON file with scripted outputs")
+    parser.add_argument(
+        "--ttft", type=float, default=0.3, help="Time to first token in seconds"
+    )
+    parser.add_argument(
+        "--tps", type=float, default=50.0, help="Tokens per second (0 = unlimited)"
+    )
+    parser.add_argument(
+        "--chars-per-token", type=int, default=3, help="Characters per token"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests that fail"
+    )
+    parser.add_argument(
+        "--error-status", type=int, default=500, help="HTTP status of injected errors"
+    )
+    parser.add_argument(
+        "--stall-rate", type=float, default=0.0, help="Share of streams that stall"
+    )
+    parser.add_argument(
+        "--stall-seconds", type=float, default=5.0, help="Length of a stall"
+    )
+    parser.add_argument(
+        "--drop-rate", type=float, default=0.0, help="Share of streams cut mid-way"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Fault injection seed")
+    args = parser.parse_args()
+
+    server = MockModelServer(
+        host=args.host,
+        port=args.port,
+        behavior=MockBehavior(
+            ttft=args.ttft,
+            tokens_per_second=args.tps,
+            chars_per_token=args.chars_per_token,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            stall_rate=args.stall_rate,
+            stall_seconds=args.stall_seconds,
+            drop_rate=args.drop_rate,
+            seed=args.seed,
+        ),
+    )
+    if args.script:
+        server.load_script(args.script)
+
+    print(f"Mock model server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
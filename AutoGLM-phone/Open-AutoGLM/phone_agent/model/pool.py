@@ -0,0 +1,211 @@
+"""Pool of equivalent model endpoints with latency-aware routing."""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from openai import OpenAI
+
+from phone_agent.model.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    is_transient_error,
+)
+from phone_agent.tracing import percentile
+
+
+@dataclass
+class Endpoint:
+    """
+    One OpenAI-compatible endpoint and its observed performance.
+
+    Attributes:
+        base_url: API base URL.
+        client: OpenAI client bound to the endpoint.
+        ewma_ttft: Smoothed time to first token in seconds (None until the
+            first response).
+        error_rate: Smoothed share of failed requests (0 to 1).
+        last_failure: Time of the last failure (time.time()), if any.
+        in_flight: Requests currently open on the endpoint.
+        ttft_samples: Recent times to first token, for percentiles.
+        breaker: Circuit breaker refusing requests while the endpoint is down.
+    """
+
+    base_url: str
+    client: OpenAI = field(repr=False)
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker, repr=False)
+    ewma_ttft: float | None = None
+    error_rate: float = 0.0
+    last_failure: float | None = None
+    in_flight: int = 0
+    ttft_samples: deque = field(default_factory=lambda: deque(maxlen=100), repr=False)
+
+
+class EndpointPool:
+    """
+    Route requests to the fastest healthy endpoint.
+
+    An endpoint is unhealthy while its error rate is above `max_error_rate`
+    and it failed less than `cooldown` seconds ago; after the cooldown it is
+    tried again. Endpoints without measurements are tried first. Endpoints
+    whose circuit breaker is open are skipped altogether.
+
+    Args:
+        base_urls: Endpoint base URLs, in order of preference.
+        api_key: API key shared by the endpoints.
+        alpha: EWMA weight of the newest sample.
+        max_error_rate: Error rate above which an endpoint is avoided.
+        cooldown: Seconds an unhealthy endpoint is avoided after a failure.
+        min_hedge_samples: TTFT samples an endpoint needs before its p95 is
+            trusted as a hedging delay.
+        breaker_failure_threshold: Consecutive transient failures that open
+            an endpoint's circuit.
+        breaker_reset_timeout: Seconds an open circuit refuses requests.
+    """
+
+    def __init__(
+        self,
+        base_urls: list[str],
+        api_key: str = "EMPTY",
+        alpha: float = 0.2,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30.0,
+        min_hedge_samples: int = 10,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_timeout: float = 30.0,
+    ):
+        if not base_urls:
+            raise ValueError("An endpoint pool needs at least one base URL")
+        # Retries are left to the caller's RetryPolicy, so that every failure
+        # reaches the statistics and the circuit breaker
+        self.endpoints = [
+            Endpoint(
+                url,
+                OpenAI(base_url=url, api_key=api_key, max_retries=0),
+                CircuitBreaker(breaker_failure_threshold, breaker_reset_timeout),
+            )
+            for url in base_urls
+        ]
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.min_hedge_samples = min_hedge_samples
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def is_healthy(self, endpoint: Endpoint, now: float | None = None) -> bool:
+        """Whether requests should be routed to an endpoint."""
+        if endpoint.error_rate <= self.max_error_rate or endpoint.last_failure is None:
+            return True
+        return (now or time.time()) - endpoint.last_failure >= self.cooldown
+
+    def choose(self, exclude: tuple[Endpoint, ...] = ()) -> Endpoint | None:
+        """
+        Pick the endpoint for the next request.
+
+        Args:
+            exclude: Endpoints not to pick (e.g. the one being hedged).
+
+        Returns:
+            The fastest healthy endpoint; if none is healthy, the one that
+            failed longest ago. None if every endpoint is excluded or, when
+            some are excluded, refused by its circuit breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit of every endpoint is open.
+        """
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            now = time.time()
+
+            def rank(endpoint: Endpoint) -> tuple:
+                if self.is_healthy(endpoint, now):
+                    ttft = endpoint.ewma_ttft
+                    return (0, -1.0 if ttft is None else ttft, endpoint.in_flight)
+                return (1, endpoint.last_failure or 0.0, endpoint.in_flight)
+
+            for endpoint in sorted(candidates, key=rank):
+                if endpoint.breaker.try_acquire():
+                    return endpoint
+
+        if not candidates or exclude:
+            return None
+        raise CircuitOpenError(
+            "Model endpoint circuit open after repeated failures: "
+            + ", ".join(e.base_url for e in candidates)
+        )
+
+    def begin(self, endpoint: Endpoint) -> None:
+        """Count a request opened on an endpoint."""
+        with self._lock:
+            endpoint.in_flight += 1
+
+    def record_success(self, endpoint: Endpoint, ttft: float | None) -> None:
+        """
+        Record a finished request.
+
+        Args:
+            endpoint: Endpoint that served it.
+            ttft: Time to first token in seconds, or None if no token came.
+        """
+        with self._lock:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            endpoint.error_rate *= 1 - self.alpha
+            endpoint.breaker.record_success()
+            if ttft is None:
+                return
+            endpoint.ttft_samples.append(ttft)
+            if endpoint.ewma_ttft is None:
+                endpoint.ewma_ttft = ttft
+            else:
+                endpoint.ewma_ttft += self.alpha * (ttft - endpoint.ewma_ttft)
+
+    def record_failure(self, endpoint: Endpoint, error: BaseException) -> None:
+        """
+        Record a failed request.
+
+        Only transient errors count against the endpoint; a rejected request
+        (e.g. 400) shows the endpoint is up.
+        """
+        with self._lock:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            if not is_transient_error(error):
+                endpoint.breaker.record_success()
+                return
+            endpoint.breaker.record_failure()
+            endpoint.error_rate += self.alpha * (1 - endpoint.error_rate)
+            endpoint.last_failure = time.time()
+
+    def hedge_delay(self, endpoint: Endpoint) -> float | None:
+        """
+        Get how long to wait for a first token before hedging.
+
+        Returns:
+            The endpoint's p95 time to first token, or None if there are too
+            few samples (or no other endpoint) to hedge.
+        """
+        with self._lock:
+            if len(self.endpoints) < 2:
+                return None
+            samples = list(endpoint.ttft_samples)
+        if len(samples) < self.min_hedge_samples:
+            return None
+        return percentile(samples, 95)
+
+    def get_stats(self) -> list[dict]:
+        """Get a snapshot of every endpoint's measurements."""
+        with self._lock:
+            return [
+                {
+                    "base_url": e.base_url,
+                    "ewma_ttft": e.ewma_ttft,
+                    "error_rate": e.error_rate,
+                    "in_flight": e.in_flight,
+                    "healthy": self.is_healthy(e),
+                    "circuit": e.breaker.state,
+                }
+                for e in self.endpoints
+            ]
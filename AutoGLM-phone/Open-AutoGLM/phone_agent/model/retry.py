@@ -0,0 +1,151 @@
+"""Retry policy and circuit breaker for model requests."""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import openai
+
+# HTTP statuses worth retrying: timeouts, rate limits and server errors
+TRANSIENT_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without contacting the model when every endpoint's circuit is open."""
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Whether a failed model request may succeed if sent again.
+
+    Connection resets, timeouts, 429 and 5xx responses are transient; other
+    errors (bad request, authentication, unparseable output) are not.
+    """
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in TRANSIENT_STATUS_CODES or error.status_code >= 500
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff for transient model errors.
+
+    Attributes:
+        max_retries: Retries after the first attempt (0 disables retrying).
+        base_delay: Delay before the first retry in seconds.
+        max_delay: Upper bound of a single delay in seconds.
+        multiplier: Growth of the delay per retry.
+        jitter: Random share (0 to 1) taken off each delay, so clients that
+            failed together do not retry together.
+    """
+
+    max_retries: int = 2
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+
+    def should_retry(self, error: BaseException, retry: int) -> bool:
+        """Whether to retry after `error`, with `retry` retries already done."""
+        return retry < self.max_retries and is_transient_error(error)
+
+    def get_delay(self, error: BaseException, retry: int) -> float:
+        """
+        Get the delay before a retry, honouring the server's Retry-After.
+
+        Args:
+            error: Error of the failed attempt.
+            retry: Number of retries already done.
+        """
+        delay = min(self.max_delay, self.base_delay * self.multiplier**retry)
+        delay *= 1 - random.uniform(0, self.jitter)
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Fail fast on an endpoint that keeps failing.
+
+    After `failure_threshold` consecutive transient failures the circuit
+    opens and requests are refused for `reset_timeout` seconds. Then one
+    probe request is let through (half-open): success closes the circuit,
+    failure opens it again.
+
+    Args:
+        failure_threshold: Consecutive failures that open the circuit.
+        reset_timeout: Seconds the circuit stays open before a probe.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: CLOSED, OPEN or HALF_OPEN."""
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def try_acquire(self) -> bool:
+        """
+        Ask to send a request.
+
+        Returns:
+            True if the request may go out (claiming the probe when half-open).
+        """
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a transient failure, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if now - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+
+def _retry_after(error: BaseException) -> float | None:
+    """Get the Retry-After delay of an HTTP error response, in seconds."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
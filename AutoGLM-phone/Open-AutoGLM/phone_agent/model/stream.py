@@ -0,0 +1,189 @@
+"""Incremental parsing helpers for streamed model output."""
+
+import ast
+from collections import deque
+from typing import Callable
+
+# Markers that end the thinking part of a response and start the action
+ACTION_MARKERS = ("finish(message=", "do(action=")
+
+# Receives (event, text) while a response streams in. Events are "thinking"
+# (a piece of thinking text), "thinking_end" (empty text) and "action" (a
+# piece of the action call, the first one starting with its marker).
+StreamCallback = Callable[[str, str], None]
+
+
+def print_stream_event(event: str, text: str) -> None:
+    """Default stream callback: echo the thinking text to stdout."""
+    if event == "thinking":
+        print(text, end="", flush=True)
+    elif event == "thinking_end":
+        print()
+
+
+class MarkerScanner:
+    """
+    Finds the first action marker in streamed text in a single pass.
+
+    An Aho-Corasick automaton over the markers advances one state per
+    character, so each chunk is scanned once no matter how long the thinking
+    part grows. Text is released as soon as it cannot be the start of a
+    marker; only the characters of a partial match are held back.
+
+    Args:
+        markers: Marker strings to look for.
+
+    Example:
+        >>> scanner = MarkerScanner(ACTION_MARKERS)
+        >>> scanner.feed("Tap it. do(ac")
+        ('Tap it. ', None, '')
+        >>> scanner.feed('tion="Tap"')
+        ('', 'do(action=', '"Tap"')
+    """
+
+    def __init__(self, markers: tuple[str, ...] = ACTION_MARKERS):
+        # State 0 is the root; _prefix[s] is the text that leads to state s
+        self._goto: list[dict[str, int]] = [{}]
+        self._prefix = [""]
+        self._match: list[str | None] = [None]
+        for marker in markers:
+            state = 0
+            for char in marker:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._prefix.append(self._prefix[state] + char)
+                    self._match.append(None)
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._match[state] = marker
+
+        # Failure links, breadth first: the longest proper suffix of a state's
+        # prefix that is itself a state
+        self._fail = [0] * len(self._goto)
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._match[child] is None:
+                    self._match[child] = self._match[self._fail[child]]
+                pending.append(child)
+
+        self._state = 0
+
+    def feed(self, text: str) -> tuple[str, str | None, str]:
+        """
+        Consume the next chunk.
+
+        Args:
+            text: Newly streamed text.
+
+        Returns:
+            Tuple of (text that precedes any marker and is safe to release,
+            the marker found or None, the rest of the chunk after the marker).
+        """
+        held = self._prefix[self._state]
+        state = self._state
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            marker = self._match[state]
+            if marker is not None:
+                self._state = 0
+                consumed = held + text[: index + 1]
+                return consumed[: -len(marker)], marker, text[index + 1 :]
+
+        self._state = state
+        released = held + text
+        return released[: len(released) - len(self._prefix[state])], None, ""
+
+    def flush(self) -> str:
+        """Release the held-back partial match at the end of the stream."""
+        held = self._prefix[self._state]
+        self._state = 0
+        return held
+
+
+class ActionCallTracker:
+    """
+    Detects when a streamed `do(...)` / `finish(...)` call is complete.
+
+    Feed the action text chunk by chunk, starting at the action marker. The
+    tracker follows bracket depth and string literals in a single pass; when
+    the outer call closes, the candidate is confirmed with `ast.parse` so that
+    stray quotes or parentheses inside messages never cut the action short.
+
+    Example:
+        >>> tracker = ActionCallTracker()
+        >>> tracker.feed('do(action="Tap", elem')
+        >>> tracker.feed('ent=[500, 300])</answer>')
+        36
+    """
+
+    def __init__(self):
+        self._parts: list[str] = []
+        self._length = 0
+        self._depth = 0
+        self._quote: str | None = None
+        self._escaped = False
+
+    def feed(self, text: str) -> int | None:
+        """
+        Consume the next piece of action text.
+
+        Args:
+            text: Newly streamed text.
+
+        Returns:
+            Length of the complete call within all text fed so far, or None
+            while the call is still open.
+        """
+        offset = self._length
+        self._parts.append(text)
+        self._length += len(text)
+
+        for index, char in enumerate(text):
+            if self._quote is not None:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == self._quote:
+                    self._quote = None
+            elif char in "\"'":
+                self._quote = char
+            elif char in "([{":
+                self._depth += 1
+            elif char in ")]}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    end = offset + index + 1
+                    if is_complete_call("".join(self._parts)[:end]):
+                        return end
+        return None
+
+
+def is_complete_call(text: str) -> bool:
+    """
+    Check whether text is exactly one well-formed `do(...)`/`finish(...)` call.
+
+    Uses the same newline escaping as `parse_action`, so anything accepted
+    here parses there too.
+    """
+    text = text.strip()
+    text = text.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError:
+        return False
+    call = tree.body
+    return (
+        isinstance(call, ast.Call)
+        and isinstance(call.func, ast.Name)
+        and call.func.id in ("do", "finish")
+    )
@@ -0,0 +1,88 @@
+"""Parallel capture of the screen state at the start of each agent step."""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable
+
+from phone_agent.screenshot import Screenshot, create_fallback_screenshot
+
+# Workers of one agent's pool: the two calls of a step, plus headroom for
+# calls that overran the previous deadline and keep a worker busy until they
+# return
+OBSERVE_WORKERS = 4
+
+
+def new_observe_executor() -> ThreadPoolExecutor:
+    """
+    Create the thread pool an agent observes its device with.
+
+    Each agent owns its pool, so concurrent agents (fleet, benchmark) never
+    queue behind each other's device calls. Idle workers exit once the pool
+    is garbage collected along with its agent.
+    """
+    return ThreadPoolExecutor(
+        max_workers=OBSERVE_WORKERS, thread_name_prefix="phone-observe"
+    )
+
+
+def observe_screen(
+    capture_screenshot: Callable[[], Screenshot],
+    get_current_app: Callable[[], str],
+    timeout: float,
+    fallback_size: tuple[int, int] = (1080, 2400),
+    executor: ThreadPoolExecutor | None = None,
+) -> tuple[Screenshot, str]:
+    """
+    Take the screenshot and query the foreground app concurrently.
+
+    Both are independent device round-trips, so the step waits only for the
+    slower one. They share one deadline: a call still running when it
+    expires is abandoned and replaced by its fallback.
+
+    Args:
+        capture_screenshot: Captures the current screen.
+        get_current_app: Returns the foreground app name.
+        timeout: Deadline in seconds for both calls together.
+        fallback_size: Size (width, height) of the fallback screenshot.
+        executor: The calling agent's pool (see new_observe_executor). A
+            one-off pool is used when omitted.
+
+    Returns:
+        Tuple of (screenshot, current app). On timeout the screenshot is a
+        black fallback image and the app is "System Home".
+
+    Raises:
+        Exception: Any error raised by one of the calls, as when called
+            directly.
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = new_observe_executor()
+
+    # Run each call in a copy of the caller's context so tracing spans stay
+    # attached to the current task and step
+    screenshot_future = executor.submit(
+        contextvars.copy_context().run, capture_screenshot
+    )
+    app_future = executor.submit(contextvars.copy_context().run, get_current_app)
+    wait([screenshot_future, app_future], timeout=timeout)
+    if own_executor:
+        # Overrunning calls finish in the background
+        executor.shutdown(wait=False)
+
+    if screenshot_future.done():
+        screenshot = screenshot_future.result()
+    else:
+        screenshot_future.cancel()
+        print(f"Screenshot timed out after {timeout}s, using fallback image")
+        width, height = fallback_size
+        screenshot = create_fallback_screenshot(False, width=width, height=height)
+
+    if app_future.done():
+        current_app = app_future.result()
+    else:
+        app_future.cancel()
+        print(f"Current app query timed out after {timeout}s")
+        current_app = "System Home"
+
+    return screenshot, current_app
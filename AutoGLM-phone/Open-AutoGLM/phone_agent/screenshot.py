@@ -0,0 +1,288 @@
+"""Screenshot type shared by all device backends."""
+
+import base64
+import threading
+import uuid
+from dataclasses import dataclass, field
+from functools import lru_cache
+from io import BytesIO
+
+from PIL import Image
+
+from phone_agent.config.image import ModelImageConfig
+from phone_agent.tracing import get_tracer
+
+
+@dataclass
+class Screenshot:
+    """
+    Represents a captured screenshot.
+
+    The encoded image is kept exactly as the device sent it (no decode or
+    re-encode). The base64 form is produced lazily the first time it is
+    needed, e.g. when building the model request, and cached afterwards.
+
+    Attributes:
+        data: Encoded image bytes (PNG, JPEG, ...) as received from the device.
+        width: Screen width in pixels.
+        height: Screen height in pixels.
+        is_sensitive: Whether the capture was blocked by a secure screen.
+        mime_type: MIME type of `data`.
+    """
+
+    data: bytes = field(repr=False)
+    width: int
+    height: int
+    is_sensitive: bool = False
+    mime_type: str = "image/png"
+    _base64_data: str | None = field(default=None, repr=False, compare=False)
+    _image: Image.Image | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def base64_data(self) -> str:
+        """Base64-encoded image data, computed on first access."""
+        if self._base64_data is None:
+            self._base64_data = base64.b64encode(self.data).decode("utf-8")
+        return self._base64_data
+
+    @property
+    def data_url(self) -> str:
+        """The image as a `data:` URL for OpenAI-compatible image inputs."""
+        return f"data:{self.mime_type};base64,{self.base64_data}"
+
+    def open_image(self) -> Image.Image:
+        """
+        Get the screenshot as a PIL image.
+
+        Returns the already decoded frame when the screenshot was built from
+        pixels on the host, otherwise lazily opens the encoded bytes. Callers
+        must not modify the returned image in place.
+        """
+        if self._image is not None:
+            return self._image
+        return Image.open(BytesIO(self.data))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, is_sensitive: bool = False) -> "Screenshot":
+        """
+        Create a screenshot from encoded image bytes.
+
+        Only the image header is parsed to get the dimensions and format;
+        the pixel data is never decoded.
+
+        Args:
+            data: Encoded image bytes.
+            is_sensitive: Whether the screen is marked as sensitive.
+
+        Returns:
+            Screenshot wrapping the original bytes.
+        """
+        width, height, mime_type = _read_image_header(data)
+        return cls(
+            data=data,
+            width=width,
+            height=height,
+            is_sensitive=is_sensitive,
+            mime_type=mime_type,
+        )
+
+    @classmethod
+    def from_image(
+        cls,
+        image: Image.Image,
+        is_sensitive: bool = False,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> "Screenshot":
+        """
+        Create a screenshot from a frame decoded on the host (e.g. raw framebuffer).
+
+        The frame is encoded as a fast, lightly compressed PNG and kept in memory
+        so later stages (model image encoding, settle detection) can reuse the
+        pixels without decoding again.
+
+        Args:
+            image: Decoded frame.
+            is_sensitive: Whether the screen is marked as sensitive.
+            width: Screen width if the frame is scaled, otherwise the frame width.
+            height: Screen height if the frame is scaled, otherwise the frame height.
+
+        Returns:
+            Screenshot wrapping the encoded PNG and the decoded frame.
+        """
+        buffered = BytesIO()
+        image.save(buffered, format="PNG", compress_level=1)
+        frame_width, frame_height = image.size
+        return cls(
+            data=buffered.getvalue(),
+            width=width or frame_width,
+            height=height or frame_height,
+            is_sensitive=is_sensitive,
+            _image=image,
+        )
+
+    @classmethod
+    def from_base64(
+        cls,
+        base64_data: str,
+        width: int | None = None,
+        height: int | None = None,
+        is_sensitive: bool = False,
+    ) -> "Screenshot":
+        """
+        Create a screenshot from base64 data, e.g. from a JSON API response.
+
+        The given base64 string is kept and reused as-is for the model request.
+
+        Args:
+            base64_data: Base64-encoded image.
+            width: Screen width if known, otherwise read from the image header.
+            height: Screen height if known, otherwise read from the image header.
+            is_sensitive: Whether the screen is marked as sensitive.
+
+        Returns:
+            Screenshot wrapping the decoded bytes and the original base64 string.
+        """
+        data = base64.b64decode(base64_data)
+        header_width, header_height, mime_type = _read_image_header(data)
+        return cls(
+            data=data,
+            width=width or header_width,
+            height=height or header_height,
+            is_sensitive=is_sensitive,
+            mime_type=mime_type,
+            _base64_data=base64_data,
+        )
+
+
+def create_fallback_screenshot(
+    is_sensitive: bool, width: int = 1080, height: int = 2400
+) -> Screenshot:
+    """
+    Create a black fallback image when screenshot fails.
+
+    Args:
+        is_sensitive: Whether the failure was due to sensitive content.
+        width: Fallback screen width.
+        height: Fallback screen height.
+
+    Returns:
+        Screenshot object with black image.
+    """
+    # Counted as a fallback on the enclosing span (screenshot or observation)
+    get_tracer().annotate(fallback_screenshot=True)
+    return Screenshot(
+        data=_black_png(width, height),
+        width=width,
+        height=height,
+        is_sensitive=is_sensitive,
+    )
+
+
+class RemoteCaptureFiles:
+    """
+    On-device files of pull-mode captures (ADB pull mode, HDC).
+
+    Each capture writes to its own file, so concurrent captures never read
+    each other's image. Rather than an extra `rm` round trip after every pull,
+    the files already pulled from a device are removed by the shell command
+    of its next capture; at most one stale file per device is left behind.
+
+    Args:
+        directory: Directory on the device.
+        extension: File extension, e.g. ".png".
+    """
+
+    def __init__(self, directory: str, extension: str):
+        self.directory = directory
+        self.extension = extension
+        self._pulled: dict[str | None, list[str]] = {}
+        self._lock = threading.Lock()
+
+    def new_path(self) -> str:
+        """Get a fresh path for a capture."""
+        return f"{self.directory}/phone_agent_{uuid.uuid4().hex}{self.extension}"
+
+    def capture_command(self, device_id: str | None, command: str) -> str:
+        """Prefix a capture's shell command with the removal of pulled files."""
+        with self._lock:
+            stale = self._pulled.pop(device_id, [])
+        if not stale:
+            return command
+        return f"rm -f {' '.join(stale)}; {command}"
+
+    def mark_pulled(self, device_id: str | None, path: str) -> None:
+        """Queue a pulled (or failed) capture's file for removal."""
+        with self._lock:
+            self._pulled.setdefault(device_id, []).append(path)
+
+
+@lru_cache(maxsize=4)
+def _black_png(width: int, height: int) -> bytes:
+    """Encode a black PNG once per size; fallbacks are frequent on secure screens."""
+    black_img = Image.new("RGB", (width, height), color="black")
+    buffered = BytesIO()
+    black_img.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def _read_image_header(data: bytes) -> tuple[int, int, str]:
+    """Read (width, height, mime type) from the image header without decoding."""
+    # Image.open() is lazy: it only parses the header until load() is called
+    with Image.open(BytesIO(data)) as img:
+        width, height = img.size
+        mime_type = Image.MIME.get(img.format or "", "image/png")
+    return width, height, mime_type
+
+
+def prepare_model_image(screenshot: Screenshot, config: ModelImageConfig) -> Screenshot:
+    """
+    Encode a screenshot for the model according to the image configuration.
+
+    The returned screenshot describes the uploaded image only (its own size and
+    format). Actions must keep using the original screenshot's width/height:
+    the model answers in relative 0-1000 coordinates, so mapping them onto the
+    device size stays exact whatever resolution the model saw.
+
+    Args:
+        screenshot: Screenshot as captured from the device.
+        config: Model image configuration (format, quality, max long edge).
+
+    Returns:
+        The original screenshot when no transcoding is needed, otherwise a new
+        screenshot holding the re-encoded image.
+    """
+    if config.is_passthrough or screenshot.is_sensitive:
+        return screenshot
+
+    target_format = config.format
+    if target_format == "original":
+        target_format = screenshot.mime_type.split("/")[-1]
+
+    # Opening is lazy: only the header is read until pixels are needed
+    img = screenshot.open_image()
+    width, height = img.size
+    long_edge = max(width, height)
+    needs_resize = 0 < config.max_long_edge < long_edge
+
+    if not needs_resize and screenshot.mime_type == f"image/{target_format}":
+        return screenshot
+
+    if needs_resize:
+        scale = config.max_long_edge / long_edge
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        # Let JPEG decoders downscale while decoding, then finish with a
+        # good filter
+        img.draft("RGB", size)
+        img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    if target_format in ("jpeg", "webp") and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    buffered = BytesIO()
+    save_kwargs = {}
+    if target_format in ("jpeg", "webp"):
+        save_kwargs["quality"] = config.quality
+    img.save(buffered, format=target_format.upper(), **save_kwargs)
+
+    return Screenshot.from_bytes(buffered.getvalue())
@@ -0,0 +1,87 @@
+"""Adaptive screen-settle detection used instead of fixed post-action sleeps."""
+
+import time
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+from phone_agent.config.timing import SettleTimingConfig
+from phone_agent.screenshot import Screenshot
+
+
+def wait_for_screen_settle(
+    capture: Callable[[], Image.Image | Screenshot],
+    max_wait: float,
+    config: SettleTimingConfig,
+) -> bool:
+    """
+    Wait until the screen stops changing, or at most `max_wait` seconds.
+
+    Frames are captured with `capture`, reduced to small grayscale thumbnails and
+    compared with a mean absolute difference. The wait ends once
+    `config.stable_polls` consecutive comparisons are below
+    `config.diff_threshold`.
+
+    Args:
+        capture: Callable returning the current frame, ideally a cheap
+            low-resolution image (a full screenshot also works).
+        max_wait: Upper bound for the wait in seconds (the fixed delay it replaces).
+        config: Adaptive settle configuration.
+
+    Returns:
+        True if the screen settled, False if the wait ran into `max_wait`
+        (or polling failed). The last captured frame is the settled screen
+        only when True.
+    """
+    deadline = time.monotonic() + max_wait
+
+    # Give the device a moment to start reacting before the first poll, so two
+    # identical pre-action frames are not mistaken for a settled screen.
+    time.sleep(min(config.min_wait, max_wait))
+
+    previous = None
+    stable = 0
+    settled = False
+    while time.monotonic() < deadline:
+        try:
+            frame = _thumbnail(capture(), config.sample_size)
+        except Exception as e:
+            print(f"Screen settle check failed, falling back to fixed delay: {e}")
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            break
+
+        if previous is not None and frame.shape == previous.shape:
+            if _frame_difference(previous, frame) <= config.diff_threshold:
+                stable += 1
+                if stable >= config.stable_polls:
+                    settled = True
+                    break
+            else:
+                stable = 0
+        previous = frame
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(config.poll_interval, remaining))
+
+    return settled
+
+
+def _thumbnail(frame: Image.Image | Screenshot, sample_size: int) -> np.ndarray:
+    """Reduce a frame into a small grayscale array for comparison."""
+    img = frame.open_image() if isinstance(frame, Screenshot) else frame
+    width, height = img.size
+    scale = sample_size / max(width, height)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    # JPEG decoders can downscale while decoding; a no-op for PNG
+    img.draft("L", size)
+    small = img.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+    small = small.convert("L")
+    return np.asarray(small, dtype=np.float32) / 255.0
+
+
+def _frame_difference(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute difference between two normalized frames."""
+    return float(np.mean(np.abs(a - b)))
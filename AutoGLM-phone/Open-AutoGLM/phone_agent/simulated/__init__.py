@@ -0,0 +1,64 @@
+"""Simulated device that replays recorded screens, for offline load testing."""
+
+from phone_agent.simulated.device import (
+    SimulatedDevice,
+    back,
+    clear_text,
+    detect_and_set_adb_keyboard,
+    double_tap,
+    get_current_app,
+    get_device,
+    get_screen_graph,
+    get_screenshot,
+    home,
+    launch_app,
+    list_devices,
+    long_press,
+    reset_devices,
+    restore_keyboard,
+    set_screen_graph,
+    swipe,
+    tap,
+    type_text,
+)
+from phone_agent.simulated.graph import (
+    LatencyModel,
+    Screen,
+    ScreenGraph,
+    Transition,
+    default_screen_graph,
+    load_screen_graph,
+)
+
+__all__ = [
+    # Screenshot
+    "get_screenshot",
+    # Input
+    "type_text",
+    "clear_text",
+    "detect_and_set_adb_keyboard",
+    "restore_keyboard",
+    # Device control
+    "get_current_app",
+    "tap",
+    "swipe",
+    "back",
+    "home",
+    "double_tap",
+    "long_press",
+    "launch_app",
+    # Simulation
+    "SimulatedDevice",
+    "get_device",
+    "list_devices",
+    "reset_devices",
+    "set_screen_graph",
+    "get_screen_graph",
+    # Screen graphs
+    "ScreenGraph",
+    "Screen",
+    "Transition",
+    "LatencyModel",
+    "load_screen_graph",
+    "default_screen_graph",
+]
@@ -0,0 +1,263 @@
+"""Simulated device that replays a recorded screen graph."""
+
+import os
+import random
+import threading
+from dataclasses import dataclass, field
+
+from phone_agent.config.timing import TIMING_CONFIG
+from phone_agent.screenshot import Screenshot
+from phone_agent.simulated.graph import (
+    ScreenGraph,
+    default_screen_graph,
+    load_screen_graph,
+)
+from phone_agent.tracing import traced_sleep
+
+# Path of the screen graph JSON loaded on first use
+SIM_GRAPH_PATH = os.getenv("PHONE_AGENT_SIM_GRAPH")
+
+
+@dataclass
+class SimulatedDevice:
+    """State of one simulated phone: its current screen and typed text."""
+
+    device_id: str
+    screen: str
+    rng: random.Random
+    typed_text: str = ""
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+_graph: ScreenGraph | None = None
+_devices: dict[str, SimulatedDevice] = {}
+_devices_lock = threading.Lock()
+
+
+def set_screen_graph(graph: ScreenGraph | str) -> None:
+    """
+    Replace the replayed screen graph and reset all devices to its start.
+
+    Args:
+        graph: A ScreenGraph or the path of a graph JSON file.
+    """
+    global _graph
+    if isinstance(graph, str):
+        graph = load_screen_graph(graph)
+    with _devices_lock:
+        _graph = graph
+        _devices.clear()
+
+
+def get_screen_graph() -> ScreenGraph:
+    """Get the replayed screen graph, loading PHONE_AGENT_SIM_GRAPH on first use."""
+    global _graph
+    with _devices_lock:
+        if _graph is None:
+            _graph = (
+                load_screen_graph(SIM_GRAPH_PATH)
+                if SIM_GRAPH_PATH
+                else default_screen_graph()
+            )
+        return _graph
+
+
+def get_device(device_id: str | None = None) -> SimulatedDevice:
+    """
+    Get the state of a simulated device, creating it on its start screen.
+
+    Every device ID is an independent phone, so concurrent agents can share
+    one graph without affecting each other.
+    """
+    graph = get_screen_graph()
+    device_id = device_id or "simulated"
+    with _devices_lock:
+        device = _devices.get(device_id)
+        if device is None:
+            seed = None if graph.seed is None else f"{graph.seed}:{device_id}"
+            device = SimulatedDevice(device_id, graph.start, random.Random(seed))
+            _devices[device_id] = device
+        return device
+
+
+def list_devices() -> list[str]:
+    """List the simulated devices created so far."""
+    with _devices_lock:
+        return list(_devices)
+
+
+def get_screenshot(device_id: str | None = None, timeout: int = 10) -> Screenshot:
+    """
+    Get the current screen of a simulated device.
+
+    Args:
+        device_id: Simulated device ID.
+        timeout: Unused; kept for interface compatibility.
+
+    Returns:
+        Screenshot of the current screen, after the sampled latency.
+    """
+    device = get_device(device_id)
+    _wait("screenshot", device)
+    return Screenshot.from_bytes(get_screen_graph().screens[device.screen].image)
+
+
+def get_current_app(device_id: str | None = None) -> str:
+    """Get the app of the current screen, after the sampled latency."""
+    device = get_device(device_id)
+    _wait("current_app", device)
+    return get_screen_graph().screens[device.screen].app
+
+
+def tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """Tap at the specified coordinates."""
+    _transition(device_id, "tap", point=(x, y))
+    _sleep(delay, TIMING_CONFIG.device.default_tap_delay)
+
+
+def double_tap(
+    x: int, y: int, device_id: str | None = None, delay: float | None = None
+) -> None:
+    """Double tap at the specified coordinates."""
+    _transition(device_id, "double_tap", point=(x, y))
+    _sleep(delay, TIMING_CONFIG.device.default_double_tap_delay)
+
+
+def long_press(
+    x: int,
+    y: int,
+    duration_ms: int = 3000,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """Long press at the specified coordinates."""
+    _transition(device_id, "long_press", point=(x, y))
+    _sleep(delay, TIMING_CONFIG.device.default_long_press_delay)
+
+
+def swipe(
+    start_x: int,
+    start_y: int,
+    end_x: int,
+    end_y: int,
+    duration_ms: int | None = None,
+    device_id: str | None = None,
+    delay: float | None = None,
+) -> None:
+    """Swipe from start to end; transitions match the start point and direction."""
+    dx, dy = end_x - start_x, end_y - start_y
+    if abs(dx) > abs(dy):
+        direction = "right" if dx > 0 else "left"
+    else:
+        direction = "down" if dy > 0 else "up"
+    _transition(device_id, "swipe", point=(start_x, start_y), direction=direction)
+    _sleep(delay, TIMING_CONFIG.device.default_swipe_delay)
+
+
+def back(device_id: str | None = None, delay: float | None = None) -> None:
+    """Press the back button."""
+    _transition(device_id, "back")
+    _sleep(delay, TIMING_CONFIG.device.default_back_delay)
+
+
+def home(device_id: str | None = None, delay: float | None = None) -> None:
+    """Press home; goes to the start screen unless a transition says otherwise."""
+    if not _transition(device_id, "home"):
+        _move(get_device(device_id), get_screen_graph().start)
+    _sleep(delay, TIMING_CONFIG.device.default_home_delay)
+
+
+def launch_app(
+    app_name: str, device_id: str | None = None, delay: float | None = None
+) -> bool:
+    """
+    Launch an app.
+
+    Follows a matching "launch" transition, otherwise jumps to the first
+    screen recorded for the app.
+
+    Returns:
+        True if the app is part of the graph, False otherwise.
+    """
+    if not _transition(device_id, "launch", app=app_name):
+        screen = next(
+            (s for s in get_screen_graph().screens.values() if s.app == app_name),
+            None,
+        )
+        if screen is None:
+            return False
+        _move(get_device(device_id), screen.name)
+
+    _sleep(delay, TIMING_CONFIG.device.default_launch_delay)
+    return True
+
+
+def type_text(text: str, device_id: str | None = None) -> None:
+    """Type text into the current screen."""
+    device = get_device(device_id)
+    with device.lock:
+        device.typed_text += text
+    _transition(device_id, "type", text=text)
+
+
+def clear_text(device_id: str | None = None) -> None:
+    """Clear the typed text."""
+    device = get_device(device_id)
+    with device.lock:
+        device.typed_text = ""
+    _wait("input", device)
+
+
+def detect_and_set_adb_keyboard(device_id: str | None = None) -> str:
+    """No keyboard to switch on a simulated device; returns an empty IME."""
+    return ""
+
+
+def restore_keyboard(ime: str, device_id: str | None = None) -> None:
+    """No keyboard to restore on a simulated device."""
+
+
+def reset_devices() -> None:
+    """Forget all simulated devices; they restart on the start screen."""
+    with _devices_lock:
+        _devices.clear()
+
+
+def _wait(operation: str, device: SimulatedDevice) -> None:
+    """Sleep for a latency sampled from the operation's model."""
+    model = get_screen_graph().latency_for(operation)
+    with device.lock:
+        latency = model.sample(device.rng)
+    if latency > 0:
+        traced_sleep(latency, f"simulated.{operation}")
+
+
+def _transition(device_id: str | None, action: str, **call) -> bool:
+    """
+    Deliver an input event: sample the input latency, then follow the first
+    matching transition of the current screen.
+
+    Returns:
+        True if a transition matched, False if the screen stays the same.
+    """
+    device = get_device(device_id)
+    _wait("input", device)
+    with device.lock:
+        next_screen = get_screen_graph().next_screen(device.screen, action, **call)
+        if next_screen is None:
+            return False
+        device.screen = next_screen
+        return True
+
+
+def _move(device: SimulatedDevice, screen: str) -> None:
+    """Put a device on a screen."""
+    with device.lock:
+        device.screen = screen
+
+
+def _sleep(delay: float | None, default_delay: float) -> None:
+    """Post-action delay, like the real backends."""
+    traced_sleep(delay if delay is not None else default_delay)
@@ -0,0 +1,277 @@
+"""Recorded screen graphs and latency models for the simulated device."""
+
+import json
+import math
+import os
+import random
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any
+
+from PIL import Image
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+# Operations whose latency can be configured in the graph's "latency" section
+LATENCY_OPERATIONS = ("screenshot", "current_app", "input")
+
+
+@dataclass
+class LatencyModel:
+    """
+    Random latency of one simulated device operation.
+
+    Attributes:
+        distribution: One of LATENCY_DISTRIBUTIONS.
+        value: Latency of the "fixed" distribution.
+        low: Lower bound of "uniform".
+        high: Upper bound of "uniform".
+        mean: Mean of "normal" and "exponential".
+        stddev: Standard deviation of "normal".
+        median: Median of "lognormal".
+        sigma: Shape (log-space standard deviation) of "lognormal".
+    """
+
+    distribution: str = "fixed"
+    value: float = 0.0
+    low: float = 0.0
+    high: float = 0.0
+    mean: float = 0.0
+    stddev: float = 0.0
+    median: float = 0.0
+    sigma: float = 0.0
+
+    def __post_init__(self):
+        if self.distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution: {self.distribution} "
+                f"(expected one of {LATENCY_DISTRIBUTIONS})"
+            )
+        # Reject parameters sample() cannot use, instead of failing mid-run
+        if self.distribution == "fixed" and self.value < 0:
+            raise ValueError(f"fixed latency needs value >= 0, got {self.value}")
+        if self.distribution == "uniform" and not 0 <= self.low <= self.high:
+            raise ValueError(
+                f"uniform latency needs 0 <= low <= high, "
+                f"got low={self.low}, high={self.high}"
+            )
+        if self.distribution == "normal" and self.stddev < 0:
+            raise ValueError(f"normal latency needs stddev >= 0, got {self.stddev}")
+        if self.distribution == "lognormal" and (self.median <= 0 or self.sigma < 0):
+            raise ValueError(
+                f"lognormal latency needs median > 0 and sigma >= 0, "
+                f"got median={self.median}, sigma={self.sigma}"
+            )
+        if self.distribution == "exponential" and self.mean < 0:
+            raise ValueError(f"exponential latency needs mean >= 0, got {self.mean}")
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds (never negative)."""
+        if self.distribution == "uniform":
+            latency = rng.uniform(self.low, self.high)
+        elif self.distribution == "normal":
+            latency = rng.gauss(self.mean, self.stddev)
+        elif self.distribution == "lognormal":
+            latency = rng.lognormvariate(math.log(self.median), self.sigma)
+        elif self.distribution == "exponential":
+            latency = rng.expovariate(1.0 / self.mean) if self.mean > 0 else 0.0
+        else:
+            latency = self.value
+        return max(0.0, latency)
+
+
+@dataclass
+class Transition:
+    """
+    Edge of the screen graph: an action that leads to another screen.
+
+    Attributes:
+        action: Device call, one of "tap", "double_tap", "long_press",
+            "swipe", "back", "home", "launch" or "type".
+        to: Name of the next screen.
+        region: Optional [x1, y1, x2, y2] in device pixels the (start)
+            coordinate must fall into.
+        direction: Optional swipe direction ("up", "down", "left", "right").
+        app: App name a "launch" must match.
+        text: Text a "type" must match.
+    """
+
+    action: str
+    to: str
+    region: list[int] | None = None
+    direction: str | None = None
+    app: str | None = None
+    text: str | None = None
+
+    def matches(
+        self,
+        action: str,
+        point: tuple[int, int] | None = None,
+        direction: str | None = None,
+        app: str | None = None,
+        text: str | None = None,
+    ) -> bool:
+        """Whether this transition applies to the given device call."""
+        if action != self.action:
+            return False
+        if self.region is not None:
+            if point is None:
+                return False
+            x1, y1, x2, y2 = self.region
+            if not (x1 <= point[0] <= x2 and y1 <= point[1] <= y2):
+                return False
+        if self.direction is not None and direction != self.direction:
+            return False
+        if self.app is not None and app != self.app:
+            return False
+        return self.text is None or text == self.text
+
+
+@dataclass
+class Screen:
+    """
+    One recorded screen.
+
+    Attributes:
+        name: Unique screen name.
+        image: Encoded screenshot (PNG or JPEG).
+        app: Foreground app name reported on this screen.
+        transitions: Outgoing edges, checked in order.
+    """
+
+    name: str
+    image: bytes = field(repr=False)
+    app: str = "System Home"
+    transitions: list[Transition] = field(default_factory=list)
+
+
+@dataclass
+class ScreenGraph:
+    """
+    A recorded app session: screens plus the actions that connect them.
+
+    Attributes:
+        screens: Screens by name.
+        start: Name of the screen every device starts on (and "home" leads
+            to unless a transition says otherwise).
+        latency: Latency model per operation (see LATENCY_OPERATIONS).
+        seed: Optional seed making the latencies reproducible.
+    """
+
+    screens: dict[str, Screen]
+    start: str
+    latency: dict[str, LatencyModel] = field(default_factory=dict)
+    seed: int | None = None
+
+    def __post_init__(self):
+        if self.start not in self.screens:
+            raise ValueError(f"Start screen not in graph: {self.start}")
+        for screen in self.screens.values():
+            for transition in screen.transitions:
+                if transition.to not in self.screens:
+                    raise ValueError(
+                        f"Screen {screen.name} leads to unknown screen {transition.to}"
+                    )
+
+    def next_screen(self, current: str, action: str, **call: Any) -> str | None:
+        """
+        Find the screen an action leads to.
+
+        Args:
+            current: Name of the current screen.
+            action: Device call (see Transition.action).
+            **call: Call details matched against transitions (point,
+                direction, app, text).
+
+        Returns:
+            Name of the next screen, or None if no transition matches.
+        """
+        for transition in self.screens[current].transitions:
+            if transition.matches(action, **call):
+                return transition.to
+        return None
+
+    def latency_for(self, operation: str) -> LatencyModel:
+        """Get the latency model of an operation (zero if not configured)."""
+        return self.latency.get(operation) or LatencyModel()
+
+
+def load_screen_graph(path: str) -> ScreenGraph:
+    """
+    Load a screen graph from a JSON file.
+
+    Image paths in the file are relative to the file's directory. Format:
+
+        {
+          "start": "home",
+          "seed": 42,
+          "latency": {
+            "screenshot": {"distribution": "lognormal", "median": 0.3, "sigma": 0.4},
+            "current_app": {"distribution": "uniform", "low": 0.02, "high": 0.1},
+            "input": {"distribution": "fixed", "value": 0.05}
+          },
+          "screens": {
+            "home": {
+              "image": "home.png",
+              "app": "System Home",
+              "transitions": [
+                {"action": "launch", "app": "微信", "to": "wechat"},
+                {"action": "tap", "region": [60, 1800, 260, 2000], "to": "wechat"}
+              ]
+            },
+            "wechat": {"image": "wechat.png", "app": "微信",
+                       "transitions": [{"action": "back", "to": "home"}]}
+          }
+        }
+
+    Args:
+        path: Path to the graph JSON file.
+
+    Returns:
+        The loaded ScreenGraph.
+
+    Raises:
+        ValueError: If the graph references unknown screens or distributions,
+            or a latency model has invalid parameters.
+    """
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    screens = {}
+    for name, screen_spec in spec["screens"].items():
+        with open(os.path.join(base_dir, screen_spec["image"]), "rb") as f:
+            image = f.read()
+        screens[name] = Screen(
+            name=name,
+            image=image,
+            app=screen_spec.get("app", "System Home"),
+            transitions=[Transition(**t) for t in screen_spec.get("transitions", [])],
+        )
+
+    latency = {}
+    for operation, model_spec in spec.get("latency", {}).items():
+        if operation not in LATENCY_OPERATIONS:
+            raise ValueError(
+                f"Unknown latency operation: {operation} "
+                f"(expected one of {LATENCY_OPERATIONS})"
+            )
+        try:
+            latency[operation] = LatencyModel(**model_spec)
+        except ValueError as e:
+            raise ValueError(f"Invalid latency for {operation}: {e}") from e
+
+    return ScreenGraph(
+        screens=screens,
+        start=spec.get("start", next(iter(screens))),
+        latency=latency,
+        seed=spec.get("seed"),
+    )
+
+
+def default_screen_graph() -> ScreenGraph:
+    """A single black home screen with no latency, used when nothing is loaded."""
+    buffer = BytesIO()
+    Image.new("RGB", (1080, 2400), color="black").save(buffer, format="PNG")
+    home = Screen(name="home", image=buffer.getvalue())
+    return ScreenGraph(screens={"home": home}, start="home")
@@ -0,0 +1,389 @@
+"""Stand-ins for the real device endpoints, backed by simulated devices.
+
+The adb and accessibility backends only talk to a phone through a server:
+the adb server's smart-socket protocol, or the HTTP API of the Accessibility
+Service App. These stand-ins serve both protocols from the simulated screen
+graph, so the real backend code (protocol, parsing, connection handling) can
+be benchmarked at any concurrency without a phone.
+
+Usage:
+    >>> server = ADBServerStandIn().start()
+    >>> set_adb_transport("socket")
+    >>> set_adb_server(port=server.port)
+    >>> agent = PhoneAgent(agent_config=AgentConfig(device_id="sim-1"))
+"""
+
+import base64
+import io
+import shlex
+import socket
+import socketserver
+import struct
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from phone_agent.config.apps import APP_PACKAGES, PACKAGE_APP_NAMES
+from phone_agent.simulated import device as simulated
+
+# Package reported for screens whose app has no known package
+LAUNCHER_PACKAGE = "com.android.launcher3"
+
+# Serial used for `host:transport-any`
+DEFAULT_SERIAL = "standin"
+
+# Errors of a client that went away mid-request; not worth a traceback
+_DISCONNECT_ERRORS = (ConnectionResetError, BrokenPipeError, ConnectionAbortedError)
+
+
+def _package_of(app: str) -> str:
+    """Get the package the device reports for an app name."""
+    return APP_PACKAGES.get(app, LAUNCHER_PACKAGE)
+
+
+class ADBServerStandIn:
+    """
+    adb server stand-in serving simulated devices over the smart-socket protocol.
+
+    Supports what the adb backend uses with the socket transport: the host
+    services `host:devices`, `host:devices-l` and `host:transport[-any]`,
+    and on a device `shell:`, `exec:` and `sync:` file pulls. Shell commands
+    are interpreted as the matching simulated device calls (screencap, input,
+    keyevents, monkey launches, ADB Keyboard broadcasts, focus queries).
+    Every serial is its own simulated device.
+
+    Args:
+        host: Address to listen on.
+        port: Port to listen on (0 picks a free port).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = socketserver.ThreadingTCPServer(
+            (host, port), _make_adb_handler(self), bind_and_activate=False
+        )
+        self._server.daemon_threads = True
+        self._server.allow_reuse_address = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self.host, self.port = self._server.server_address[:2]
+        # Files written by `screencap -p <path>`, per serial
+        self.files: dict[tuple[str, str], bytes] = {}
+        self.serials: set[str] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "ADBServerStandIn":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="adb-standin", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def run_command(self, serial: str, command: str) -> bytes:
+        """Run a shell command string on a simulated device."""
+        with self._lock:
+            self.serials.add(serial)
+        output = b""
+        for part in command.split(";"):
+            part = part.strip()
+            if part:
+                output += self._run_one(serial, part)
+        return output
+
+    def _run_one(self, serial: str, command: str) -> bytes:
+        """Run one command of a shell string."""
+        if command.startswith("dumpsys window"):
+            app = simulated.get_current_app(serial)
+            return f"  mCurrentFocus=Window{{1 u0 {_package_of(app)}/.Main}}\n".encode()
+
+        args = shlex.split(command)
+        name, rest = args[0], args[1:]
+        if name == "screencap":
+            return self._screencap(serial, rest)
+        if name == "rm":
+            with self._lock:
+                for path in rest:
+                    self.files.pop((serial, path), None)
+        elif name == "input":
+            _input(serial, rest)
+        elif name == "monkey" and "-p" in rest:
+            package = rest[rest.index("-p") + 1]
+            app = PACKAGE_APP_NAMES.get(package)
+            if app is None or not simulated.launch_app(app, serial, delay=0):
+                return b"** No activities found to run, monkey aborted.\n"
+        elif name == "am" and "ADB_INPUT_B64" in rest:
+            text = base64.b64decode(rest[rest.index("msg") + 1]).decode("utf-8")
+            simulated.type_text(text, serial)
+        elif name == "am" and "ADB_CLEAR_TEXT" in rest:
+            simulated.clear_text(serial)
+        elif name == "settings" and rest[-1:] == ["default_input_method"]:
+            # Already on ADB Keyboard, so the backend never switches
+            return b"com.android.adbkeyboard/.AdbIME\n"
+        return b""
+
+    def _screencap(self, serial: str, args: list[str]) -> bytes:
+        """`screencap [-p] [path]`: PNG or raw framebuffer, to stdout or a file."""
+        screenshot = simulated.get_screenshot(serial)
+        if "-p" not in args:
+            image = screenshot.open_image().convert("RGBA")
+            header = struct.pack("<IIII", image.width, image.height, 1, 0)
+            return header + image.tobytes()
+
+        data = screenshot.data
+        if screenshot.mime_type != "image/png":
+            buffer = io.BytesIO()
+            screenshot.open_image().save(buffer, format="PNG")
+            data = buffer.getvalue()
+        paths = [a for a in args if a != "-p"]
+        if not paths:
+            return data
+        with self._lock:
+            self.files[(serial, paths[0])] = data
+        return b""
+
+
+def _input(serial: str, args: list[str]) -> None:
+    """`input tap|swipe|keyevent ...` on a simulated device."""
+    if args[:1] == ["tap"]:
+        simulated.tap(int(args[1]), int(args[2]), serial, delay=0)
+    elif args[:1] == ["swipe"]:
+        x1, y1, x2, y2 = (int(v) for v in args[1:5])
+        if (x1, y1) == (x2, y2):
+            simulated.long_press(x1, y1, device_id=serial, delay=0)
+        else:
+            simulated.swipe(x1, y1, x2, y2, device_id=serial, delay=0)
+    elif args[:1] == ["keyevent"]:
+        if args[1] in ("4", "KEYCODE_BACK"):
+            simulated.back(serial, delay=0)
+        elif args[1] in ("3", "KEYCODE_HOME"):
+            simulated.home(serial, delay=0)
+
+
+def _make_adb_handler(
+    server: ADBServerStandIn,
+) -> type[socketserver.BaseRequestHandler]:
+    """Create the smart-socket handler class bound to a stand-in."""
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            try:
+                self._serve()
+            except (*_DISCONNECT_ERRORS, socket.timeout):
+                pass
+
+        def _serve(self):
+            serial = None
+            while True:
+                request = self._read_request()
+                if request is None:
+                    return
+                if request.startswith("host:transport"):
+                    serial = request.partition("host:transport:")[2] or DEFAULT_SERIAL
+                    self._okay()
+                    continue
+                if request in ("host:devices", "host:devices-l"):
+                    with server._lock:
+                        serials = sorted(server.serials) or [DEFAULT_SERIAL]
+                    lines = "".join(f"{s}\tdevice\n" for s in serials).encode()
+                    self._okay()
+                    self.request.sendall(b"%04x" % len(lines) + lines)
+                    return
+                if serial is None:
+                    self._fail(f"unsupported host service: {request}")
+                    return
+                service, _, command = request.partition(":")
+                if service in ("shell", "exec"):
+                    self._okay()
+                    self.request.sendall(server.run_command(serial, command))
+                    return
+                if service == "sync":
+                    self._okay()
+                    self._sync(serial)
+                    return
+                self._fail(f"unsupported device service: {request}")
+                return
+
+        def _sync(self, serial: str) -> None:
+            """Answer sync packets until QUIT: only RECV (pull) is supported."""
+            while True:
+                header = self._read_exactly(8)
+                if header is None:
+                    return
+                packet_id, length = struct.unpack("<4sI", header)
+                payload = self._read_exactly(length) or b""
+                if packet_id != b"RECV":
+                    return
+                with server._lock:
+                    data = server.files.get((serial, payload.decode("utf-8")))
+                if data is None:
+                    message = b"No such file or directory"
+                    self.request.sendall(struct.pack("<4sI", b"FAIL", len(message)))
+                    self.request.sendall(message)
+                    return
+                for offset in range(0, len(data), 64 * 1024):
+                    chunk = data[offset : offset + 64 * 1024]
+                    self.request.sendall(struct.pack("<4sI", b"DATA", len(chunk)))
+                    self.request.sendall(chunk)
+                self.request.sendall(struct.pack("<4sI", b"DONE", 0))
+
+        def _read_request(self) -> str | None:
+            length = self._read_exactly(4)
+            if length is None:
+                return None
+            payload = self._read_exactly(int(length, 16))
+            return None if payload is None else payload.decode("utf-8")
+
+        def _read_exactly(self, size: int) -> bytes | None:
+            buffer = bytearray()
+            while len(buffer) < size:
+                chunk = self.request.recv(size - len(buffer))
+                if not chunk:
+                    return None
+                buffer += chunk
+            return bytes(buffer)
+
+        def _okay(self) -> None:
+            self.request.sendall(b"OKAY")
+
+        def _fail(self, message: str) -> None:
+            payload = message.encode("utf-8")
+            self.request.sendall(b"FAIL" + b"%04x" % len(payload) + payload)
+
+    return Handler
+
+
+class AccessibilityStandIn:
+    """
+    Accessibility Service App stand-in serving one simulated device over HTTP.
+
+    The accessibility backend addresses a phone by IP on a fixed port, so
+    each stand-in listens on its own address; on Linux any 127.0.0.x works.
+
+    Args:
+        host: Address to listen on; also the simulated device ID.
+        port: HTTP port (the backend's DEFAULT_PORT).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080):
+        self.device_id = host
+        self._httpd = ThreadingHTTPServer((host, port), _make_http_handler(self))
+        self._httpd.daemon_threads = True
+        self.host, self.port = self._httpd.server_address[:2]
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "AccessibilityStandIn":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            name=f"accessibility-standin-{self.host}",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def perform(self, params: dict[str, str]) -> bool:
+        """Run an `/action` request on the simulated device."""
+        device_id = self.device_id
+        action = params.get("type")
+
+        def point(x: str = "x", y: str = "y") -> tuple[int, int]:
+            return int(params[x]), int(params[y])
+
+        if action == "tap":
+            simulated.tap(*point(), device_id, delay=0)
+        elif action == "double_tap":
+            simulated.double_tap(*point(), device_id, delay=0)
+        elif action == "long_press":
+            simulated.long_press(*point(), device_id=device_id, delay=0)
+        elif action == "swipe":
+            simulated.swipe(
+                *point("x1", "y1"), *point("x2", "y2"), device_id=device_id, delay=0
+            )
+        elif action == "global" and params.get("code") == "back":
+            simulated.back(device_id, delay=0)
+        elif action == "global" and params.get("code") == "home":
+            simulated.home(device_id, delay=0)
+        elif action == "launch":
+            app = PACKAGE_APP_NAMES.get(params.get("package", ""))
+            return app is not None and simulated.launch_app(app, device_id, delay=0)
+        elif action == "input":
+            simulated.type_text(params.get("text", ""), device_id)
+        elif action == "clear":
+            simulated.clear_text(device_id)
+        else:
+            return False
+        return True
+
+
+def _make_http_handler(
+    server: AccessibilityStandIn,
+) -> type[BaseHTTPRequestHandler]:
+    """Create the HTTP handler class bound to a stand-in."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def handle(self):
+            try:
+                super().handle()
+            except _DISCONNECT_ERRORS:
+                pass
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            path = url.path.strip("/")
+            params = dict(urllib.parse.parse_qsl(url.query))
+            if path == "ping":
+                self._send(200, b"pong")
+            elif path == "screenshot":
+                screenshot = simulated.get_screenshot(server.device_id)
+                self._send(
+                    200,
+                    screenshot.data,
+                    screenshot.mime_type,
+                    {"X-Width": screenshot.width, "X-Height": screenshot.height},
+                )
+            elif path == "info/current_package":
+                app = simulated.get_current_app(server.device_id)
+                self._send(200, _package_of(app).encode())
+            elif path == "action":
+                if server.perform(params):
+                    self._send(200, b"ok")
+                else:
+                    self._send(400, f"unsupported action: {params}".encode())
+            else:
+                self._send(404, b"not found")
+
+        def _send(
+            self,
+            status: int,
+            body: bytes,
+            content_type: str = "text/plain",
+            headers: dict | None = None,
+        ) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, str(value))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+__all__ = ["ADBServerStandIn", "AccessibilityStandIn"]
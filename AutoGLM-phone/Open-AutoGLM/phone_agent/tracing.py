@@ -0,0 +1,348 @@
+"""Per-step latency tracing with JSON Lines and Chrome trace export.
+
+Spans are recorded for each task and step of the agent: the model request,
+screenshots, current-app queries, device actions and fixed sleeps. Tracing
+is off by default; set PHONE_AGENT_TRACE=1 to record spans and have
+`PhoneAgent.run` write `<task_id>.jsonl` and `<task_id>.trace.json` files to
+PHONE_AGENT_TRACE_DIR after each task. The `.trace.json` files open in
+chrome://tracing or https://ui.perfetto.dev.
+
+At most PHONE_AGENT_TRACE_MAX_SPANS spans are kept in memory (oldest are
+dropped first), so spans that are never exported, e.g. outside any task or
+finishing after their task was exported, cannot pile up.
+"""
+
+import functools
+import itertools
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+TRACING_ENABLED = os.getenv("PHONE_AGENT_TRACE", "false").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+TRACE_DIR = os.getenv("PHONE_AGENT_TRACE_DIR", "traces")
+TRACE_MAX_SPANS = int(os.getenv("PHONE_AGENT_TRACE_MAX_SPANS", "50000"))
+
+# Exported tasks remembered, so spans finishing after the export are dropped
+_EXPORTED_TASKS_KEPT = 1024
+
+# Task, step and innermost open span of the current context. Context
+# variables follow the code into worker threads started with
+# `contextvars.copy_context().run`.
+_current_task: ContextVar[str | None] = ContextVar("trace_task", default=None)
+_current_step: ContextVar[int | None] = ContextVar("trace_step", default=None)
+_current_span: ContextVar["Span | None"] = ContextVar("trace_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed operation."""
+
+    name: str
+    span_id: int
+    parent_id: int | None
+    task_id: str | None
+    step: int | None
+    thread_id: int
+    start: float  # Wall-clock start (seconds since the epoch)
+    duration: float | None = None  # Seconds, None while the span is open
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the span to a JSON-serialisable dictionary."""
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "task_id": self.task_id,
+            "step": self.step,
+            "thread_id": self.thread_id,
+            "start": self.start,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_chrome_event(self, pid: int) -> dict[str, Any]:
+        """Convert the span to a Chrome trace "complete" event."""
+        args = dict(self.attributes)
+        args.update(task_id=self.task_id, step=self.step)
+        if self.error is not None:
+            args["error"] = self.error
+        return {
+            "name": self.name,
+            "cat": self.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": self.start * 1e6,
+            "dur": (self.duration or 0.0) * 1e6,
+            "pid": pid,
+            "tid": self.thread_id,
+            "args": args,
+        }
+
+
+class Tracer:
+    """
+    Records spans and exports them per task.
+
+    Listeners added with `add_listener` receive every finished span, e.g. to
+    feed metrics, whether or not recording is enabled. With recording
+    disabled and no listeners, `span` does nothing beyond yielding None, so
+    the instrumented code paths cost next to nothing.
+
+    Args:
+        enabled: Whether spans are recorded for export.
+        max_spans: Most spans kept in memory; the oldest are dropped first.
+
+    Example:
+        >>> tracer = Tracer()
+        >>> with tracer.task() as task_id, tracer.step(1):
+        ...     with tracer.span("device.tap", x=100, y=200):
+        ...         pass
+        >>> tracer.export_chrome_trace("trace.json", task_id)
+    """
+
+    def __init__(self, enabled: bool = True, max_spans: int = TRACE_MAX_SPANS):
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        # Insertion-ordered set of exported task IDs
+        self._exported: dict[str, None] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._listeners: list[Callable[[Span], None]] = []
+
+    @property
+    def active(self) -> bool:
+        """Whether spans are created at all (recording or listeners)."""
+        return self.enabled or bool(self._listeners)
+
+    def add_listener(self, listener: Callable[[Span], None]) -> None:
+        """Call `listener` with every finished span."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Span], None]) -> None:
+        """Stop calling a listener added with `add_listener`."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """
+        Time the enclosed block as a child of the current span.
+
+        Args:
+            name: Span name, "<category>.<operation>" (e.g. "device.tap").
+            **attributes: Extra values stored with the span.
+
+        Yields:
+            The open Span, or None if tracing is inactive.
+        """
+        if not self.active:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent else None,
+            task_id=_current_task.get(),
+            step=_current_step.get(),
+            thread_id=threading.get_ident(),
+            start=time.time(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            _current_span.reset(token)
+            if self.enabled:
+                with self._lock:
+                    if span.task_id not in self._exported:
+                        self._spans.append(span)
+            for listener in list(self._listeners):
+                try:
+                    listener(span)
+                except Exception as e:
+                    print(f"Trace listener failed: {e}")
+
+    @contextmanager
+    def task(self, task_id: str | None = None) -> Iterator[str]:
+        """
+        Attribute all spans of the enclosed block to one task.
+
+        Args:
+            task_id: Task identifier. Generated with `new_task_id` if None.
+
+        Yields:
+            The task identifier.
+        """
+        if task_id is None:
+            task_id = new_task_id()
+        token = _current_task.set(task_id)
+        try:
+            with self.span("task"):
+                yield task_id
+        finally:
+            _current_task.reset(token)
+
+    @contextmanager
+    def step(self, step: int) -> Iterator[Span | None]:
+        """
+        Attribute all spans of the enclosed block to one agent step.
+
+        Args:
+            step: Step number within the task.
+
+        Yields:
+            The step span, or None if tracing is inactive.
+        """
+        token = _current_step.set(step)
+        try:
+            with self.span("agent.step") as span:
+                yield span
+        finally:
+            _current_step.reset(token)
+
+    def annotate(self, **attributes: Any) -> None:
+        """Add attributes to the innermost open span, if any."""
+        span = _current_span.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    def spans(self, task_id: str | None = None) -> list[Span]:
+        """
+        Get the finished spans, oldest first.
+
+        Args:
+            task_id: Only return spans of this task. All spans if None.
+        """
+        with self._lock:
+            spans = list(self._spans)
+        if task_id is not None:
+            spans = [span for span in spans if span.task_id == task_id]
+        return sorted(spans, key=lambda span: span.start)
+
+    def clear(self, task_id: str | None = None) -> None:
+        """Drop the finished spans of one task, or all of them if None."""
+        with self._lock:
+            if task_id is None:
+                self._spans.clear()
+            else:
+                self._spans = deque(
+                    (s for s in self._spans if s.task_id != task_id),
+                    maxlen=self.max_spans,
+                )
+
+    def export_jsonl(self, path: str, task_id: str | None = None) -> None:
+        """Write spans as JSON Lines, one span per line."""
+        with open(path, "w", encoding="utf-8") as f:
+            for span in self.spans(task_id):
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False) + "\n")
+
+    def export_chrome_trace(self, path: str, task_id: str | None = None) -> None:
+        """Write spans in the Chrome trace-event format."""
+        pid = os.getpid()
+        events = [span.to_chrome_event(pid) for span in self.spans(task_id)]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"traceEvents": events, "displayTimeUnit": "ms"},
+                f,
+                ensure_ascii=False,
+            )
+
+    def export_task(self, task_id: str, trace_dir: str = TRACE_DIR) -> None:
+        """
+        Write a task's spans to `trace_dir` in both formats and drop them.
+
+        Spans of the task that finish later (e.g. abandoned observation calls)
+        are not recorded.
+
+        Args:
+            task_id: Task identifier.
+            trace_dir: Output directory, created if missing.
+        """
+        if not self.enabled:
+            return
+        os.makedirs(trace_dir, exist_ok=True)
+        base = os.path.join(trace_dir, task_id)
+        self.export_jsonl(f"{base}.jsonl", task_id)
+        self.export_chrome_trace(f"{base}.trace.json", task_id)
+        with self._lock:
+            self._exported[task_id] = None
+            if len(self._exported) > _EXPORTED_TASKS_KEPT:
+                del self._exported[next(iter(self._exported))]
+        self.clear(task_id)
+
+
+def new_task_id() -> str:
+    """Generate a unique task identifier that sorts by start time."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+# Global tracer instance
+_tracer = Tracer(enabled=TRACING_ENABLED)
+
+
+def get_tracer() -> Tracer:
+    """Get the global tracer."""
+    return _tracer
+
+
+def set_tracing_enabled(enabled: bool) -> None:
+    """Turn recording of spans on or off for the global tracer."""
+    _tracer.enabled = enabled
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list, e.g. of span durations."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator recording every call of a function as a span.
+
+    Args:
+        name: Span name, "<category>.<operation>".
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = get_tracer()
+            if not tracer.active:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_sleep(seconds: float, name: str = "sleep") -> None:
+    """Sleep like `time.sleep`, recording the wait as a span."""
+    with get_tracer().span(name, seconds=seconds):
+        time.sleep(seconds)
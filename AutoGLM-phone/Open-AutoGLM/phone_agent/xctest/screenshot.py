@@ -1,24 +1,14 @@
 """Screenshot utilities for capturing iOS device screen."""
 
-import base64
 import os
 import subprocess
 import tempfile
 import uuid
-from dataclasses import dataclass
 from io import BytesIO
 
 from PIL import Image
 
-
-@dataclass
-class Screenshot:
-    """Represents a captured screenshot."""
-
-    base64_data: str
-    width: int
-    height: int
-    is_sensitive: bool = False
+from phone_agent.screenshot import Screenshot, create_fallback_screenshot
 
 
 def get_screenshot(
@@ -83,17 +73,8 @@ def _get_screenshot_wda(
             base64_data = data.get("value", "")
 
             if base64_data:
-                # Decode to get dimensions
-                img_data = base64.b64decode(base64_data)
-                img = Image.open(BytesIO(img_data))
-                width, height = img.size
-
-                return Screenshot(
-                    base64_data=base64_data,
-                    width=width,
-                    height=height,
-                    is_sensitive=False,
-                )
+                # Dimensions come from the image header; WDA's base64 is reused as-is
+                return Screenshot.from_base64(base64_data)
 
     except ImportError:
         print("Note: requests library not installed. Install: pip install requests")
@@ -131,20 +112,14 @@ def _get_screenshot_idevice(
         )
 
         if result.returncode == 0 and os.path.exists(temp_path):
-            # Read and encode image
-            img = Image.open(temp_path)
-            width, height = img.size
-
-            buffered = BytesIO()
-            img.save(buffered, format="PNG")
-            base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+            # Read image bytes as-is (no decode / re-encode)
+            with open(temp_path, "rb") as f:
+                screenshot = Screenshot.from_bytes(f.read())
 
             # Cleanup
             os.remove(temp_path)
 
-            return Screenshot(
-                base64_data=base64_data, width=width, height=height, is_sensitive=False
-            )
+            return screenshot
 
     except FileNotFoundError:
         print(
@@ -167,19 +142,7 @@ def _create_fallback_screenshot(is_sensitive: bool) -> Screenshot:
         Screenshot object with black image.
     """
     # Default iPhone screen size (iPhone 14 Pro)
-    default_width, default_height = 1179, 2556
-
-    black_img = Image.new("RGB", (default_width, default_height), color="black")
-    buffered = BytesIO()
-    black_img.save(buffered, format="PNG")
-    base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-
-    return Screenshot(
-        base64_data=base64_data,
-        width=default_width,
-        height=default_height,
-        is_sensitive=is_sensitive,
-    )
+    return create_fallback_screenshot(is_sensitive, width=1179, height=2556)
 
 
 def save_screenshot(
@@ -197,8 +160,7 @@ def save_screenshot(
         True if successful, False otherwise.
     """
     try:
-        img_data = base64.b64decode(screenshot.base64_data)
-        img = Image.open(BytesIO(img_data))
+        img = Image.open(BytesIO(screenshot.data))
         img.save(file_path)
         return True
     except Exception as e:
@@ -224,7 +186,12 @@ def get_screenshot_png(
     """
     screenshot = get_screenshot(wda_url, session_id, device_id)
 
+    if screenshot.mime_type == "image/png":
+        return screenshot.data
+
     try:
-        return base64.b64decode(screenshot.base64_data)
+        buffered = BytesIO()
+        Image.open(BytesIO(screenshot.data)).save(buffered, format="PNG")
+        return buffered.getvalue()
     except Exception:
         return None
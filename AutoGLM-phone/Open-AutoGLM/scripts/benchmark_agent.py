@@ -0,0 +1,401 @@
+"""Benchmark the PhoneAgent loop on fixed scenarios.
+
+Runs scripted tasks with N agents in parallel and reports steps per second,
+CPU time per step, peak RSS and per-phase latency percentiles (from the
+tracing spans), optionally against a saved baseline.
+
+Every device and the model are stand-ins, so no phone or GPU is needed:
+- simulated: the in-process simulated device replays the scenario screens;
+- adb: the real ADB backend (socket transport) talks to an adb server
+  stand-in serving simulated devices;
+- accessibility: the real accessibility backend talks to one HTTP stand-in
+  per agent, each on its own loopback address (127.0.0.2, 127.0.0.3, ...;
+  Linux routes all of 127.0.0.0/8, other systems need loopback aliases).
+The model is a local mock server unless --base-url is given.
+
+Each concurrency level runs in a fresh process, so its peak RSS is its own
+and its CPU time excludes the mock model server and the device stand-ins,
+which run in the parent process. With the simulated backend the device
+simulation itself (mostly sleeps) runs in the measured process.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from phone_agent import PhoneAgent
+from phone_agent.adb import set_adb_server, set_adb_transport
+from phone_agent.agent import AgentConfig
+from phone_agent.device_factory import DeviceType, set_device_type
+from phone_agent.model import ModelConfig
+from phone_agent.model.mock_server import MockBehavior, MockModelServer, ScriptRule
+from phone_agent.simulated import (
+    Screen,
+    ScreenGraph,
+    Transition,
+    reset_devices,
+    set_screen_graph,
+)
+from phone_agent.simulated.graph import LatencyModel
+from phone_agent.simulated.standins import AccessibilityStandIn, ADBServerStandIn
+from phone_agent.tracing import get_tracer, percentile
+
+BACKENDS = ("simulated", "adb", "accessibility")
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+RSS_PER_MB = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+# Spans reported as phases of a step
+PHASES = (
+    "agent.step",
+    "agent.observe",
+    "device.screenshot",
+    "device.current_app",
+    "device.settle_frame",
+    "agent.encode_image",
+    "model.request",
+    "action.execute",
+)
+
+# Fixed scenarios: the model output of each step, in order
+SCENARIOS = {
+    "search": [
+        '<think>打开微信。</think><answer>do(action="Launch", app="微信")</answer>',
+        "<think>点击搜索框。</think>"
+        '<answer>do(action="Tap", element=[500, 80])</answer>',
+        '<think>输入关键词。</think><answer>do(action="Type", text="天气")</answer>',
+        '<think>返回上一页。</think><answer>do(action="Back")</answer>',
+        '<think>任务完成。</think><answer>finish(message="done")</answer>',
+    ],
+    "scroll": [
+        '<think>打开微信。</think><answer>do(action="Launch", app="微信")</answer>',
+        '<think>向上滑动。</think><answer>do(action="Swipe", start=[500, 800], '
+        "end=[500, 200])</answer>",
+        '<think>向上滑动。</think><answer>do(action="Swipe", start=[500, 800], '
+        "end=[500, 200])</answer>",
+        '<think>回到桌面。</think><answer>do(action="Home")</answer>',
+        '<think>任务完成。</think><answer>finish(message="done")</answer>',
+    ],
+}
+
+
+def build_screen_graph(screenshot_ms: float) -> ScreenGraph:
+    """Screens the built-in scenarios walk through, as a simulated device."""
+
+    def png(color: str) -> bytes:
+        buffer = io.BytesIO()
+        Image.new("RGB", (1080, 2400), color=color).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    screens = {
+        "home": Screen("home", png("white"), "System Home"),
+        "chats": Screen(
+            "chats",
+            png("green"),
+            "微信",
+            [
+                Transition("tap", "search", region=[0, 0, 1080, 400]),
+                Transition("swipe", "chats", direction="up"),
+            ],
+        ),
+        "search": Screen(
+            "search",
+            png("gray"),
+            "微信",
+            [Transition("type", "results"), Transition("back", "chats")],
+        ),
+        "results": Screen(
+            "results", png("blue"), "微信", [Transition("back", "chats")]
+        ),
+    }
+    screens["home"].transitions.append(Transition("launch", "chats", app="微信"))
+    latency = {
+        "screenshot": LatencyModel("lognormal", median=screenshot_ms / 1000, sigma=0.3),
+        "current_app": LatencyModel("lognormal", median=0.02, sigma=0.3),
+        "input": LatencyModel("lognormal", median=0.02, sigma=0.3),
+    }
+    return ScreenGraph(screens, "home", latency, seed=0)
+
+
+def accessibility_hosts(count: int) -> list[str]:
+    """Loopback addresses of the accessibility stand-ins, one per agent."""
+    return [f"127.0.0.{index + 2}" for index in range(count)]
+
+
+def run_level(
+    backend: str,
+    concurrency: int,
+    tasks_per_worker: int,
+    scenario: str,
+    model_config: ModelConfig,
+    screenshot_ms: float,
+    adb_port: int | None,
+) -> dict:
+    """
+    Run `concurrency` agents in parallel and summarise the spans.
+
+    Meant to run in a fresh process (see run_level_isolated): peak RSS is
+    process-wide.
+    """
+    set_device_type(DeviceType(backend))
+    if backend == "simulated":
+        set_screen_graph(build_screen_graph(screenshot_ms))
+        reset_devices()
+    elif backend == "adb":
+        set_adb_transport("socket")
+        set_adb_server(port=adb_port)
+    device_ids = (
+        accessibility_hosts(concurrency)
+        if backend == "accessibility"
+        else [f"bench-{index}" for index in range(concurrency)]
+    )
+    durations: dict[str, list[float]] = defaultdict(list)
+    lock = threading.Lock()
+
+    def on_span(span) -> None:
+        if span.name in PHASES:
+            with lock:
+                durations[span.name].append(span.duration * 1000)
+
+    steps = [0]
+    errors = [0]
+
+    def worker(index: int) -> None:
+        for _ in range(tasks_per_worker):
+            agent = PhoneAgent(
+                model_config,
+                AgentConfig(
+                    max_steps=len(SCENARIOS[scenario]) + 2,
+                    device_id=device_ids[index],
+                    verbose=False,
+                ),
+            )
+            agent.model_client.stream_callback = lambda event, text: None
+            try:
+                agent.run(scenario)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+            with lock:
+                steps[0] += agent.step_count
+
+    tracer = get_tracer()
+    tracer.add_listener(on_span)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            threads = [
+                threading.Thread(target=worker, args=(i,)) for i in range(concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        tracer.remove_listener(on_span)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    total_steps = max(steps[0], 1)
+    return {
+        "backend": backend,
+        "concurrency": concurrency,
+        "scenario": scenario,
+        "steps": steps[0],
+        "errors": errors[0],
+        "steps_per_second": steps[0] / wall,
+        "cpu_ms_per_step": cpu * 1000 / total_steps,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / RSS_PER_MB,
+        "phases": {
+            name: {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for name, values in durations.items()
+        },
+    }
+
+
+def run_level_isolated(*args) -> dict:
+    """Run a level (see run_level) in a fresh process and return its summary."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_level, *args).result()
+
+
+def row_key(row: dict) -> tuple:
+    return row["backend"], row["concurrency"], row["scenario"]
+
+
+def print_results(results: list[dict], baseline: list[dict] | None) -> None:
+    """Print one table per run, with deltas against the baseline if given."""
+    previous = {row_key(row): row for row in baseline or []}
+
+    def fmt(value: float, old: float | None) -> str:
+        if old is None or old == 0:
+            return f"{value:>10.1f}{'':>9}"
+        return f"{value:>10.1f}{(value - old) / old * 100:>+8.0f}%"
+
+    for row in results:
+        old = previous.get(row_key(row))
+        print()
+        print(
+            f"{row['backend']} x{row['concurrency']} ({row['scenario']}): "
+            f"{row['steps']} steps, {row['errors']} errors"
+        )
+        print(f"{'metric':<22}{'value':>10}{'vs base':>9}")
+        print("-" * 41)
+        for metric in ("steps_per_second", "cpu_ms_per_step", "peak_rss_mb"):
+            print(f"{metric:<22}{fmt(row[metric], old and old[metric])}")
+        print(
+            f"{'phase (ms)':<22}"
+            + "".join(f"{p:>10}{'':>9}" for p in ("p50", "p95", "p99"))
+        )
+        for phase in PHASES:
+            stats = row["phases"].get(phase)
+            if stats is None:
+                continue
+            old_stats = old["phases"].get(phase, {}) if old else {}
+            print(
+                f"{phase:<22}"
+                + "".join(
+                    fmt(stats[p], old_stats.get(p)) for p in ("p50", "p95", "p99")
+                )
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the PhoneAgent loop on fixed scenarios",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/benchmark_agent.py
+  python scripts/benchmark_agent.py --concurrency 1 8 32 --save-baseline base.json
+  python scripts/benchmark_agent.py --baseline base.json
+  python scripts/benchmark_agent.py --backends simulated adb accessibility
+
+Devices are stand-ins replaying the scenario screens with sampled latencies:
+the simulated backend in-process, adb and accessibility through their real
+backends talking to local stand-in servers. The model is a local mock
+server unless --base-url is given.
+        """,
+    )
+
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=BACKENDS,
+        default=["simulated"],
+        help="Device backends to sweep (default: simulated)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        nargs="+",
+        type=int,
+        default=[1, 4, 16],
+        help="Numbers of parallel agents to sweep (default: 1 4 16)",
+    )
+    parser.add_argument(
+        "--scenario", choices=sorted(SCENARIOS), default="search", help="Scenario"
+    )
+    parser.add_argument(
+        "--tasks-per-worker", type=int, default=3, help="Tasks run by each agent"
+    )
+    parser.add_argument(
+        "--screenshot-ms",
+        type=float,
+        default=150.0,
+        help="Median stand-in screenshot latency (default: 150)",
+    )
+    parser.add_argument(
+        "--base-url", type=str, default=None, help="Use this model endpoint instead"
+    )
+    parser.add_argument("--model", type=str, default="mock", help="Model name")
+    parser.add_argument(
+        "--ttft", type=float, default=0.3, help="Mock time to first token (seconds)"
+    )
+    parser.add_argument(
+        "--tps", type=float, default=50.0, help="Mock tokens per second"
+    )
+    parser.add_argument("--baseline", type=str, help="Baseline JSON to compare with")
+    parser.add_argument("--save-baseline", type=str, help="Write results as baseline")
+
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        rules = [
+            ScriptRule(output=output, step=step)
+            for step, output in enumerate(SCENARIOS[args.scenario], start=1)
+        ]
+        server = MockModelServer(
+            port=0,
+            rules=rules,
+            behavior=MockBehavior(ttft=args.ttft, tokens_per_second=args.tps),
+        ).start()
+        base_url = server.base_url
+
+    model_config = ModelConfig(
+        base_url=base_url,
+        api_key=os.getenv("PHONE_AGENT_API_KEY", "EMPTY"),
+        model_name=args.model,
+    )
+    # Device stand-ins serve the graph from this process
+    set_screen_graph(build_screen_graph(args.screenshot_ms))
+    standins = []
+    adb_port = None
+    if "adb" in args.backends:
+        adb_server = ADBServerStandIn().start()
+        standins.append(adb_server)
+        adb_port = adb_server.port
+    if "accessibility" in args.backends:
+        for host in accessibility_hosts(max(args.concurrency)):
+            standins.append(AccessibilityStandIn(host).start())
+
+    results = []
+    try:
+        for backend in args.backends:
+            for level in args.concurrency:
+                print(f"Running {backend} x{level}...", flush=True)
+                results.append(
+                    run_level_isolated(
+                        backend,
+                        level,
+                        args.tasks_per_worker,
+                        args.scenario,
+                        model_config,
+                        args.screenshot_ms,
+                        adb_port,
+                    )
+                )
+    finally:
+        for standin in standins:
+            standin.stop()
+        if server is not None:
+            server.stop()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline to {args.save_baseline}")
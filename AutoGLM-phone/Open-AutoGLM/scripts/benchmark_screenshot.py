@@ -0,0 +1,69 @@
+import argparse
+import statistics
+import time
+
+from phone_agent.adb.screenshot import (
+    SCREENSHOT_MODES,
+    get_screenshot,
+    set_screenshot_mode,
+)
+from phone_agent.tracing import percentile
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark ADB screenshot capture modes on a connected device",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/benchmark_screenshot.py
+  python scripts/benchmark_screenshot.py --device-id emulator-5554 --runs 20
+  python scripts/benchmark_screenshot.py --modes exec-out raw
+        """,
+    )
+
+    parser.add_argument(
+        "--device-id", type=str, default=None, help="ADB device ID (default: first)"
+    )
+
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=SCREENSHOT_MODES,
+        default=list(SCREENSHOT_MODES),
+        help="Capture modes to compare (default: all)",
+    )
+
+    parser.add_argument(
+        "--runs", type=int, default=10, help="Timed captures per mode (default: 10)"
+    )
+
+    parser.add_argument(
+        "--warmup", type=int, default=2, help="Untimed captures per mode (default: 2)"
+    )
+
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'KB':>10}  size")
+    print("-" * 62)
+
+    for mode in args.modes:
+        set_screenshot_mode(mode, device_id=args.device_id)
+        for _ in range(args.warmup):
+            get_screenshot(args.device_id)
+
+        timings = []
+        screenshot = None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            screenshot = get_screenshot(args.device_id)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        print(
+            f"{mode:<10}"
+            f"{statistics.mean(timings):>10.1f}"
+            f"{percentile(timings, 50):>10.1f}"
+            f"{percentile(timings, 95):>10.1f}"
+            f"{len(screenshot.data) / 1024:>10.1f}"
+            f"  {screenshot.width}x{screenshot.height}"
+            f"{' (sensitive)' if screenshot.is_sensitive else ''}"
+        )
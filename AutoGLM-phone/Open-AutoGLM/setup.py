@@ -31,6 +31,7 @@ setup(
     python_requires=">=3.10",
     install_requires=[
         "Pillow>=12.0.0",
+        "numpy>=1.21.0",
         "openai>=2.9.0",
         "requests>=2.31.0",
     ],
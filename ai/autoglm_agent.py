@@ -4,6 +4,8 @@ import os
 from typing import Optional, List, Dict, Any, Callable
 from pathlib import Path
 
+from utils import metrics
+
 
 class AutoGLMAgent:
     """AutoGLM智能手机控制Agent（B模式）"""
@@ -15,6 +17,7 @@ class AutoGLMAgent:
         self._initialized = False
         self._execution_log: List[Dict[str, Any]] = []
         self._step_callback: Optional[Callable[[str], None]] = None
+        self._frame_source = None  # scrcpy 画面帧截图源（投屏开启时使用）
         
         # 设置环境变量（与 run.sh 保持一致）
         os.environ["PHONE_AGENT_BASE_URL"] = "https://open.bigmodel.cn/api/paas/v4"
@@ -36,12 +39,23 @@ class AutoGLMAgent:
             from phone_agent import PhoneAgent
             from phone_agent.model import ModelConfig
             from phone_agent.agent import AgentConfig
-            from phone_agent.device_factory import set_device_type, DeviceType
+            from phone_agent.device_factory import set_device_type, set_screenshot_provider, DeviceType
+            from phone_agent.frame_source import FrameSource
+            from phone_agent.tracing import get_tracer
+            
+            # 截图、模型、动作等耗时通过追踪 span 汇总到 /metrics
+            tracer = get_tracer()
+            tracer.remove_listener(metrics.observe_span)
+            tracer.add_listener(metrics.observe_span)
             
             # 设置使用 Accessibility 方法
             set_device_type(DeviceType.ACCESSIBILITY)
             print(f"[AutoGLMAgent] 使用 Accessibility 方法连接设备")
             
+            # 投屏开启时直接使用 scrcpy 最新帧作为截图，省去截图往返
+            self._frame_source = FrameSource(device_id=f"{self.device_ip}:{self.adb_port}")
+            set_screenshot_provider(self._frame_source)
+            
             # 配置模型（从环境变量读取）
             model_config = ModelConfig(
                 base_url=os.getenv("PHONE_AGENT_BASE_URL", "https://open.bigmodel.cn/api/paas/v4"),
@@ -75,6 +89,16 @@ class AutoGLMAgent:
             traceback.print_exc()
             return False
     
+    def on_frame(self, frame) -> None:
+        """接收 scrcpy 解码后的画面帧（BGR numpy 数组），供 Agent 截图使用"""
+        if self._frame_source is not None:
+            self._frame_source.push_frame(frame)
+    
+    def on_stream_stopped(self) -> None:
+        """投屏停止后丢弃旧帧，Agent 回退到设备截图"""
+        if self._frame_source is not None:
+            self._frame_source.reset()
+    
     def set_step_callback(self, callback: Callable[[str], None]):
         """设置步骤回调函数，用于实时显示执行进度"""
         self._step_callback = callback
@@ -98,7 +122,10 @@ class AutoGLMAgent:
                 self._step_callback(f"🤖 调用AI模型分析任务: {instruction}")
             
             # 调用实际的AutoGLM执行逻辑
-            message = self._phone_agent.run(instruction)
+            try:
+                message = self._phone_agent.run(instruction)
+            finally:
+                metrics.TASK_STEPS.observe(self._phone_agent.step_count)
             
             if self._step_callback:
                 self._step_callback(f"✅ 任务执行完成")
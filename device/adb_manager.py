@@ -13,8 +13,8 @@ class ADBManager:
     def connect(self, ip: str, port: int = 5555) -> bool:
         """连接到设备"""
         try:
-            cmd = f"adb connect {ip}:{port}"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            cmd = ["adb", "connect", f"{ip}:{port}"]
+            result = subprocess.run(cmd, capture_output=True, text=True)
             
             if "connected" in result.stdout.lower():
                 self.device_id = f"{ip}:{port}"
@@ -35,8 +35,8 @@ class ADBManager:
             return False
         
         try:
-            cmd = f"adb disconnect {self.device_id}"
-            subprocess.run(cmd, shell=True, capture_output=True)
+            cmd = ["adb", "disconnect", self.device_id]
+            subprocess.run(cmd, capture_output=True)
             self._connected = False
             print(f"[ADB] 已断开: {self.device_id}")
             return True
@@ -51,9 +51,9 @@ class ADBManager:
             return None
         
         try:
-            device_arg = f"-s {self.device_id}" if self.device_id else ""
-            cmd = f"adb {device_arg} shell {command}"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            # command 作为单个参数交给设备端 shell 解析，本地不再经过 /bin/sh
+            cmd = self._adb_prefix() + ["shell", command]
+            result = subprocess.run(cmd, capture_output=True, text=True)
             return result.stdout.strip()
         except Exception as e:
             print(f"[ADB] 命令执行失败: {e}")
@@ -95,8 +95,8 @@ class ADBManager:
     def list_devices(self) -> List[str]:
         """列出所有连接的设备"""
         try:
-            cmd = "adb devices"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            cmd = ["adb", "devices"]
+            result = subprocess.run(cmd, capture_output=True, text=True)
             
             devices = []
             for line in result.stdout.split('\n')[1:]:  # 跳过第一行标题
@@ -115,9 +115,8 @@ class ADBManager:
             return False
         
         try:
-            device_arg = f"-s {self.device_id}" if self.device_id else ""
-            cmd = f"adb {device_arg} install -r {apk_path}"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            cmd = self._adb_prefix() + ["install", "-r", apk_path]
+            result = subprocess.run(cmd, capture_output=True, text=True)
             
             return "Success" in result.stdout
         except Exception as e:
@@ -130,9 +129,8 @@ class ADBManager:
             return False
         
         try:
-            device_arg = f"-s {self.device_id}" if self.device_id else ""
-            cmd = f"adb {device_arg} push {local_path} {remote_path}"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            cmd = self._adb_prefix() + ["push", local_path, remote_path]
+            result = subprocess.run(cmd, capture_output=True, text=True)
             
             return result.returncode == 0
         except Exception as e:
@@ -145,15 +143,20 @@ class ADBManager:
             return False
         
         try:
-            device_arg = f"-s {self.device_id}" if self.device_id else ""
-            cmd = f"adb {device_arg} pull {remote_path} {local_path}"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            cmd = self._adb_prefix() + ["pull", remote_path, local_path]
+            result = subprocess.run(cmd, capture_output=True, text=True)
             
             return result.returncode == 0
         except Exception as e:
             print(f"[ADB] 拉取文件失败: {e}")
             return False
     
+    def _adb_prefix(self) -> List[str]:
+        """adb 命令前缀（带 -s 设备号）"""
+        if self.device_id:
+            return ["adb", "-s", self.device_id]
+        return ["adb"]
+    
     @property
     def is_connected(self) -> bool:
         """是否已连接"""
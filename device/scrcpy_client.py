@@ -13,10 +13,11 @@ class ScrcpyMonitorThread(QThread):
     status_signal = Signal(str)    # 状态信号
     error_signal = Signal(str)     # 错误信号
     
-    def __init__(self, device_ip: str, adb_port: int = 40661):
+    def __init__(self, device_ip: str, adb_port: int = 40661, frame_listener=None):
         super().__init__()
         self.device_ip = device_ip
         self.adb_port = adb_port
+        self.frame_listener = frame_listener  # 原始帧回调（如 AutoGLMAgent.on_frame）
         self.client = None
         self._running = False
         self.device_name = f"{device_ip}:{adb_port}"
@@ -64,6 +65,8 @@ class ScrcpyMonitorThread(QThread):
     def on_frame(self, frame):
         """处理接收到的帧"""
         if frame is not None and self._running:
+            if self.frame_listener:
+                self.frame_listener(frame)
             try:
                 # frame是numpy数组，格式为BGR
                 if isinstance(frame, np.ndarray):
@@ -0,0 +1,184 @@
+"""Prometheus 指标 - 以文本格式通过 /metrics 暴露"""
+import math
+import threading
+from typing import Dict, List, Sequence
+
+
+class Counter:
+    """只增不减的计数器"""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def collect(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {_format_value(self._value)}",
+        ]
+
+
+class Gauge:
+    """可增可减的瞬时值"""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def collect(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self._value)}",
+        ]
+
+
+class Histogram:
+    """分桶直方图（累计桶 + 总和 + 次数）"""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = sorted(buckets)
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum {_format_value(total)}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+
+def _format_value(value: float) -> str:
+    """按 Prometheus 文本格式输出数值"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# 秒级延迟的通用分桶
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SCREENSHOT_SECONDS = Histogram(
+    "autoglm_screenshot_seconds", "截图耗时（秒）", LATENCY_BUCKETS
+)
+MODEL_TTFT_SECONDS = Histogram(
+    "autoglm_model_ttft_seconds", "模型首 Token 延迟（秒）", LATENCY_BUCKETS
+)
+MODEL_TOTAL_SECONDS = Histogram(
+    "autoglm_model_total_seconds", "模型推理总耗时（秒）", LATENCY_BUCKETS
+)
+ACTION_SECONDS = Histogram(
+    "autoglm_action_seconds", "动作执行耗时（秒，含动作后等待）", LATENCY_BUCKETS
+)
+TASK_STEPS = Histogram(
+    "autoglm_task_steps", "每个任务的执行步数", (1, 2, 3, 5, 10, 20, 50, 100)
+)
+FALLBACK_SCREENSHOTS = Counter(
+    "autoglm_fallback_screenshots_total", "截图失败后使用黑屏兜底的次数"
+)
+PARSE_FAILURES = Counter(
+    "autoglm_parse_failures_total", "模型输出无法解析为动作的次数"
+)
+MODEL_ERRORS = Counter(
+    "autoglm_model_errors_total", "模型请求失败的次数"
+)
+SOCKET_CLIENTS = Gauge(
+    "autoglm_socket_clients", "当前连接的 WebSocket 客户端数"
+)
+STREAM_FPS = Gauge(
+    "autoglm_stream_fps", "投屏每秒推送的帧数"
+)
+
+REGISTRY = [
+    SCREENSHOT_SECONDS,
+    MODEL_TTFT_SECONDS,
+    MODEL_TOTAL_SECONDS,
+    ACTION_SECONDS,
+    TASK_STEPS,
+    FALLBACK_SCREENSHOTS,
+    PARSE_FAILURES,
+    MODEL_ERRORS,
+    SOCKET_CLIENTS,
+    STREAM_FPS,
+]
+
+
+def observe_span(span) -> None:
+    """
+    phone_agent 追踪监听器：把结束的 span 换算成指标
+
+    通过 phone_agent.tracing.get_tracer().add_listener(observe_span) 注册。
+    """
+    attributes: Dict = span.attributes
+    if span.name == "device.screenshot":
+        SCREENSHOT_SECONDS.observe(span.duration)
+    elif span.name == "model.request":
+        if span.error is not None:
+            MODEL_ERRORS.inc()
+        else:
+            MODEL_TOTAL_SECONDS.observe(span.duration)
+            if attributes.get("time_to_first_token") is not None:
+                MODEL_TTFT_SECONDS.observe(attributes["time_to_first_token"])
+    elif span.name == "action.execute":
+        ACTION_SECONDS.observe(span.duration)
+
+    if attributes.get("fallback_screenshot"):
+        FALLBACK_SCREENSHOTS.inc()
+    if attributes.get("parse_error"):
+        PARSE_FAILURES.inc()
+
+
+def render_metrics() -> str:
+    """生成 Prometheus 文本格式（0.0.4）的全部指标"""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
@@ -13,13 +13,14 @@ import threading
 import io
 from contextlib import redirect_stdout
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
 
 # 导入项目模块
 from utils.config import load_config
 from utils.logger import setup_logger
+from utils import metrics
 from ai.normal_chat import NormalChatAI
 from ai.autoglm_agent import AutoGLMAgent
 from device.adb_manager import ADBManager
@@ -103,10 +104,17 @@ def get_status():
     })
 
 
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus 指标"""
+    return Response(metrics.render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 @socketio.on('connect')
 def handle_connect():
     """客户端连接"""
     logger.info(f"客户端已连接: {request.sid}")
+    metrics.SOCKET_CLIENTS.inc()
     emit('status', {'message': '已连接到服务器'})
 
 
@@ -114,6 +122,7 @@ def handle_connect():
 def handle_disconnect():
     """客户端断开"""
     logger.info(f"客户端已断开: {request.sid}")
+    metrics.SOCKET_CLIENTS.dec()
 
 
 @socketio.on('switch_mode')
@@ -256,6 +265,10 @@ def scrcpy_stream_worker():
         logger.info("正在连接 scrcpy server...")
         client.start(threaded=True)
         
+        # 最新帧同时作为 AutoGLM 的截图来源
+        if autoglm_agent:
+            client.add_listener('frame', autoglm_agent.on_frame)
+        
         # 等待连接
         time.sleep(2)
         
@@ -265,6 +278,9 @@ def scrcpy_stream_worker():
         
         logger.info("scrcpy 连接成功，开始推流")
         frame_count = 0
+        # 每秒统计一次推流帧率
+        fps_window_start = time.monotonic()
+        fps_window_frames = 0
         
         while client.alive:
             try:
@@ -282,9 +298,16 @@ def scrcpy_stream_worker():
                     socketio.emit('screen_frame', {'frame': img_base64})
                     
                     frame_count += 1
+                    fps_window_frames += 1
                     if frame_count % 100 == 0:
                         logger.info(f"已推送 {frame_count} 帧")
                 
+                elapsed = time.monotonic() - fps_window_start
+                if elapsed >= 1.0:
+                    metrics.STREAM_FPS.set(fps_window_frames / elapsed)
+                    fps_window_start = time.monotonic()
+                    fps_window_frames = 0
+                
                 # 60 FPS（尽可能流畅）
                 time.sleep(1.0 / 60)
                 
@@ -293,6 +316,9 @@ def scrcpy_stream_worker():
                 time.sleep(0.5)
         
         logger.info("scrcpy 客户端已停止")
+        metrics.STREAM_FPS.set(0)
+        if autoglm_agent:
+            autoglm_agent.on_stream_stopped()
         
     except ImportError:
         logger.error("未安装 scrcpy 客户端库，请运行: pip install git+https://github.com/leng-yue/py-scrcpy-client.git")